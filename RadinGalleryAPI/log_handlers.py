@@ -0,0 +1,50 @@
+# This file contains the JSON formatter and sampling filter referenced from
+# the LOGGING settings.
+
+import json
+import logging
+import random
+
+# Attributes every LogRecord has; anything else was passed with `extra`
+RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line, with the `extra` fields of the call as keys.
+    """
+
+    def format(self, record):
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        data.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a `rate` fraction of the records below `min_level` logged
+    under the `name` logger (all loggers if empty). Records at or above
+    `min_level` (warnings and errors by default) and records of other
+    loggers are always kept.
+    """
+
+    def __init__(self, name="", rate=1.0, min_level="WARNING"):
+        super().__init__(name)
+        self.rate = rate
+        self.min_level = logging.getLevelName(min_level)
+
+    def filter(self, record):
+        if record.levelno >= self.min_level or not super().filter(record):
+            return True
+        return random.random() < self.rate
@@ -0,0 +1,55 @@
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    PageNumberPagination,
+)
+from rest_framework.settings import api_settings
+
+
+class PageNumberOrCursorPagination(BasePagination):
+    """
+    Page-number pagination by default, keyset (cursor) pagination when the
+    request carries a `cursor` parameter; `?cursor=` starts from the first page.
+
+    Cursor pages don't run COUNT(*) or OFFSET, so their latency stays flat
+    however deep the client goes. `ordering` should match an index.
+    """
+
+    ordering = "-created_at"
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+
+    def get_paginator(self, request):
+        if self.cursor_query_param in request.query_params:
+            paginator = CursorPagination()
+            paginator.ordering = self.ordering
+            paginator.cursor_query_param = self.cursor_query_param
+        else:
+            paginator = PageNumberPagination()
+        paginator.page_size = self.page_size
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return PageNumberPagination().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        cursor = CursorPagination()
+        cursor.cursor_query_param = self.cursor_query_param
+        return PageNumberPagination().get_schema_operation_parameters(
+            view
+        ) + cursor.get_schema_operation_parameters(view)
+
+
+class NewestFirstPagination(PageNumberOrCursorPagination):
+    ordering = "-created_at"
+
+
+class OldestFirstPagination(PageNumberOrCursorPagination):
+    ordering = "created_at"
@@ -0,0 +1,86 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import F, TextField, Value
+from django.db.models.functions import Coalesce
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+WORD_RE = re.compile(r"\w+")
+
+
+def supports_full_text_search(queryset):
+    return connections[queryset.db].vendor == "postgresql"
+
+
+def build_search_vector(weighted_fields):
+    """
+    Combined tsvector for a [(field, weight), ...] list, e.g.
+    [("name", "A"), ("description", "B")]. NULL fields count as empty.
+    """
+    vector = None
+    for field, weight in weighted_fields:
+        part = SearchVector(
+            Coalesce(F(field), Value(""), output_field=TextField()),
+            weight=weight,
+            config=settings.FULL_TEXT_SEARCH_CONFIG,
+        )
+        vector = part if vector is None else vector + part
+    return vector
+
+
+def update_search_vector(queryset, weighted_fields, field="search_vector"):
+    """
+    Recompute the search vector column of every row in `queryset` with one
+    UPDATE. Does nothing on databases without full-text search.
+    """
+    if not supports_full_text_search(queryset):
+        return 0
+    return queryset.update(**{field: build_search_vector(weighted_fields)})
+
+
+def build_search_query(terms):
+    """
+    Prefix query matching rows that contain every term, e.g. "lap pro" ->
+    'lap':* & 'pro':*. Returns None when the terms hold no searchable words.
+    """
+    words = [word for term in terms for word in WORD_RE.findall(term)]
+    if not words:
+        return None
+    return SearchQuery(
+        " & ".join(f"'{word}':*" for word in words),
+        search_type="raw",
+        config=settings.FULL_TEXT_SEARCH_CONFIG,
+    )
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    `?search=` backed by a maintained tsvector column on PostgreSQL.
+
+    Views opt in by naming the column in `search_vector_field`. Matching
+    rows are ranked (best first) unless the client asked for an explicit
+    `?ordering=`. On other databases, or on views without the column, it
+    behaves like SearchFilter over `search_fields`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        vector_field = getattr(view, "search_vector_field", None)
+        terms = self.get_search_terms(request)
+        if not terms or vector_field is None or not supports_full_text_search(queryset):
+            return super().filter_queryset(request, queryset, view)
+
+        query = build_search_query(terms)
+        if query is None:
+            return queryset.none()
+
+        queryset = queryset.filter(**{vector_field: query})
+        if api_settings.ORDERING_PARAM in request.query_params:
+            return queryset
+
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        return queryset.annotate(
+            search_rank=SearchRank(F(vector_field), query)
+        ).order_by("-search_rank", *ordering)
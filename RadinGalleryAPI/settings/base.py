@@ -2,6 +2,7 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from celery.schedules import crontab
 from decouple import config
 
 # ---------------------------------------------------------
@@ -53,6 +54,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "authentication.middleware.SessionActivityMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -127,6 +129,43 @@ CACHES = {
     }
 }
 
+# Seconds a cached public catalog response is kept (see products/cache.py)
+CATALOG_CACHE_TIMEOUT = 60 * 5
+
+# Rendered category trees (see categories/cache.py); entries are versioned, so they
+# can live long. The in-process LRU keeps this many trees per worker.
+CATEGORY_TREE_CACHE_TIMEOUT = 60 * 60 * 24
+CATEGORY_TREE_LOCAL_CACHE_SIZE = 64
+
+# ---------------------------------------------------------
+# Search
+# ---------------------------------------------------------
+# Text search configuration used for the search vectors (see RadinGalleryAPI/search.py).
+# "simple" only lowercases, so it works for any language without stemming.
+FULL_TEXT_SEARCH_CONFIG = "simple"
+
+# ---------------------------------------------------------
+# Reviews
+# ---------------------------------------------------------
+# Latest comments embedded per review by ?include=comments on the review list
+REVIEW_EMBEDDED_COMMENTS = 3
+# Largest list of ids accepted by one bulk moderation request
+REVIEW_MODERATION_MAX_IDS = 1000
+# Reviews changed by one filtered bulk moderation request (repeat it for more),
+# locked and updated this many per transaction
+REVIEW_MODERATION_MAX_FILTERED = 10000
+REVIEW_MODERATION_BATCH_SIZE = 500
+
+
+# ---------------------------------------------------------
+# Checkout
+# ---------------------------------------------------------
+# Fail fast (NOWAIT) when another checkout holds an inventory row lock
+CHECKOUT_STOCK_LOCK_NOWAIT = True
+
+# Reserve SKUs flagged with `fast_stock` against Redis counters instead of row locks
+FAST_STOCK_ENABLED = False
+
 
 # ---------------------------------------------------------
 # Authentication & User Model
@@ -175,18 +214,22 @@ MEDIA_ROOT = Path(BASE_DIR).parent / "media"
 # ---------------------------------------------------------
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "authentication.authentication.CachedJWTAuthentication",
     ],
     # Swagger UI
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
-    # Throttling
+    # Throttling: views pick a scope with `throttle_scope`, the others are
+    # throttled as "user" or "anon" (see RadinGalleryAPI/throttling.py)
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.UserRateThrottle",
-        "rest_framework.throttling.AnonRateThrottle",
+        "RadinGalleryAPI.throttling.GCRARateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "user": "20/min",
         "anon": "10/min",
+        "catalog": "120/min",
+        "auth": "10/min",
+        "otp": "5/min",
+        "password_reset": "5/hour",
     },
     # Filtering
     "DEFAULT_FILTER_BACKENDS": [
@@ -205,6 +248,13 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
 }
 
+# User snapshots resolved by CachedJWTAuthentication (see authentication/user_cache.py).
+# Saves invalidate Redis right away; the per-process copies expire after
+# USER_CACHE_LOCAL_TIMEOUT seconds.
+USER_CACHE_TIMEOUT = 60 * 15
+USER_CACHE_LOCAL_TIMEOUT = 5
+USER_CACHE_LOCAL_SIZE = 1024
+
 
 # ---------------------------------------------------------
 # DRF Spectacular (Swagger) Settings
@@ -218,6 +268,12 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DEFAULT_FROM_EMAIL = "no-reply@example.com"
 EMAIL_VERIFICATION_TOKEN_EXPIRY = 1
 
+# Tokens and OTPs in Redis (see authentication/token_store.py). Bumping the
+# version invalidates every stored token; an OTP is dropped after this many
+# wrong guesses.
+AUTH_TOKEN_KEY_VERSION = 1
+OTP_MAX_ATTEMPTS = 5
+
 
 # ---------------------------------------------------------
 # Default primary key field type
@@ -239,6 +295,39 @@ INSTALLED_APPS += [
     "django_celery_results",
 ]
 
+# Results are pruned in batches by authentication.tasks.prune_expired_rows_task;
+# None disables Celery's own backend_cleanup, which deletes them in one statement
+CELERY_RESULT_EXPIRES = None
+
+# Periodic tasks (run with `celery -A RadinGalleryAPI beat`)
+CELERY_BEAT_SCHEDULE = {
+    "flush-fast-stock-deltas": {
+        "task": "cart.tasks.flush_fast_stock_deltas",
+        "schedule": 10.0,
+    },
+    "flush-review-vote-deltas": {
+        "task": "reviews.tasks.flush_review_vote_deltas",
+        "schedule": 10.0,
+    },
+    "flush-session-activity": {
+        "task": "authentication.tasks.flush_session_activity_task",
+        "schedule": 60.0,
+    },
+    "reconcile-product-ratings": {
+        "task": "reviews.tasks.reconcile_product_ratings_task",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    "prune-expired-rows": {
+        "task": "authentication.tasks.prune_expired_rows_task",
+        "schedule": crontab(hour=4, minute=0),
+    },
+}
+
+# Expired rows pruning (see authentication/maintenance.py): rows deleted per
+# statement, and how long Celery task results are kept
+MAINTENANCE_DELETE_BATCH_SIZE = 1000
+MAINTENANCE_TASK_RESULT_RETENTION = timedelta(days=7)
+
 
 # ---------------------------------------------------------
 # LOGGING
@@ -255,10 +344,21 @@ LOGGING = {
             "format": "{levelname} {message}",
             "style": "{",
         },
+        "json": {
+            "()": "RadinGalleryAPI.log_handlers.JSONFormatter",
+        },
+    },
+    "filters": {
+        # High-volume auth events: keep 10% of INFO/DEBUG, every warning/error
+        "sample_auth": {
+            "()": "RadinGalleryAPI.log_handlers.SamplingFilter",
+            "name": "authentication",
+            "rate": 0.1,
+        },
     },
     "handlers": {
         "file": {
-            "level": "DEBUG",
+            "level": "INFO",
             "class": "logging.FileHandler",
             "filename": os.path.join(BASE_DIR, "debug.log"),
             "formatter": "verbose",
@@ -270,12 +370,12 @@ LOGGING = {
     "loggers": {
         "django": {
             "handlers": ["file"],
-            "level": "DEBUG",
+            "level": "WARNING",
             "propagate": False,
         },
         "authentication": {
             "handlers": ["file"],
-            "level": "DEBUG",
+            "level": "INFO",
             "propagate": False,
         },
         "console": {
@@ -1 +1,31 @@
 from .base import *
+
+DEBUG = False
+
+# Structured logs to stdout. Auth INFO events are sampled; warnings and
+# errors are always kept.
+LOGGING["handlers"] = {
+    "console": {
+        "level": "INFO",
+        "class": "logging.StreamHandler",
+        "stream": "ext://sys.stdout",
+        "formatter": "json",
+        "filters": ["sample_auth"],
+    },
+    "null": {
+        "class": "logging.NullHandler",
+    },
+}
+LOGGING["loggers"] = {
+    "django": {
+        "handlers": ["console"],
+        "level": "INFO",
+        "propagate": False,
+    },
+    "authentication": {
+        "handlers": ["console"],
+        "level": "INFO",
+        "propagate": False,
+    },
+}
+LOGGING["root"] = {"handlers": ["console"], "level": "WARNING"}
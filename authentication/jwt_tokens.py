@@ -0,0 +1,24 @@
+# This file contains helpers around the simplejwt token blacklist.
+
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+
+def blacklist_user_tokens(user):
+    """
+    Blacklist every unexpired refresh token issued to the user with one
+    bulk insert. Returns the number of tokens blacklisted.
+    """
+    token_ids = OutstandingToken.objects.filter(
+        user=user,
+        expires_at__gt=timezone.now(),
+        blacklistedtoken__isnull=True,
+    ).values_list("id", flat=True)
+    blacklisted = BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(token_id=token_id) for token_id in token_ids],
+        ignore_conflicts=True,
+    )
+    return len(blacklisted)
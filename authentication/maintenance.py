@@ -0,0 +1,75 @@
+# This file contains the pruning of expired JWT blacklist and Celery result rows.
+
+import logging
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from django_celery_results.models import GroupResult, TaskResult
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+logger = logging.getLogger(__name__)
+
+
+def delete_in_batches(queryset, batch_size=None, pause=0):
+    """
+    Delete the rows of `queryset` in id ranges of at most `batch_size` rows.
+    Every range is its own short statement, so no lock is held for the whole
+    prune; `pause` seconds are slept between ranges. Returns the number of
+    rows deleted, cascades included.
+    """
+    batch_size = batch_size or settings.MAINTENANCE_DELETE_BATCH_SIZE
+    queryset = queryset.order_by("id")
+    deleted = 0
+    start = None
+    while True:
+        remaining = queryset if start is None else queryset.filter(id__gt=start)
+        # Upper bound of the next range: the batch_size-th matching id
+        ids = list(remaining.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        count, _ = remaining.filter(id__lte=ids[-1]).delete()
+        deleted += count
+        start = ids[-1]
+        if len(ids) < batch_size:
+            return deleted
+        if pause:
+            time.sleep(pause)
+
+
+def expired_tokens():
+    # Deleting an outstanding token cascades to its BlacklistedToken row
+    return OutstandingToken.objects.filter(expires_at__lte=timezone.now())
+
+
+def expired_task_results():
+    cutoff = timezone.now() - settings.MAINTENANCE_TASK_RESULT_RETENTION
+    return TaskResult.objects.filter(date_done__lt=cutoff)
+
+
+def expired_group_results():
+    cutoff = timezone.now() - settings.MAINTENANCE_TASK_RESULT_RETENTION
+    return GroupResult.objects.filter(date_done__lt=cutoff)
+
+
+# {name: callable returning the expired rows}, pruned in this order
+PRUNERS = {
+    "jwt_tokens": expired_tokens,
+    "celery_task_results": expired_task_results,
+    "celery_group_results": expired_group_results,
+}
+
+
+def prune_expired_rows(names=None, batch_size=None, pause=0):
+    """
+    Prune the expired rows of the given PRUNERS (all by default).
+    Returns {name: {"deleted": rows, "seconds": duration}}.
+    """
+    report = {}
+    for name in names or PRUNERS:
+        started = time.monotonic()
+        deleted = delete_in_batches(PRUNERS[name](), batch_size, pause)
+        seconds = round(time.monotonic() - started, 3)
+        report[name] = {"deleted": deleted, "seconds": seconds}
+        logger.info("Pruned %s expired %s rows in %.3fs", deleted, name, seconds)
+    return report
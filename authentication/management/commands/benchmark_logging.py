@@ -0,0 +1,89 @@
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from RadinGalleryAPI.log_handlers import SamplingFilter
+
+FORMAT = "{levelname} {asctime} {module} {message}"
+
+
+def log_request(logger, user_id, ttl):
+    # The log calls of one OTP round trip of the auth helpers
+    logger.info("Storing OTP for user %s with TTL %s", user_id, ttl)
+    logger.info("OTP verification for user %s: %s", user_id, "ok")
+    logger.info("Deleting OTP for user %s", user_id)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the per-request logging overhead of the auth flows with the "
+        "debug.log FileHandler, with and without sampling. Both pipelines get "
+        "the same log calls."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=20000)
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument(
+            "--sample-rate",
+            type=float,
+            default=0.1,
+            help="Fraction of auth INFO records kept by the sampled pipeline",
+        )
+
+    def make_logger(self, name, handler):
+        handler.setFormatter(logging.Formatter(FORMAT, style="{"))
+        logger = logging.getLogger(f"benchmark_logging.{name}")
+        logger.handlers = [handler]
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        return logger
+
+    def run(self, logger, requests, threads):
+        def worker(count):
+            for i in range(count):
+                log_request(logger, i, 300)
+
+        per_thread = requests // threads
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(worker, [per_thread] * threads))
+        elapsed = time.perf_counter() - start
+        return elapsed / (per_thread * threads) * 1e6
+
+    def handle(self, *args, **options):
+        requests, threads = options["requests"], options["threads"]
+        with tempfile.TemporaryDirectory() as directory:
+            full = self.make_logger(
+                "full",
+                logging.FileHandler(os.path.join(directory, "full.log")),
+            )
+            sampled_handler = logging.FileHandler(
+                os.path.join(directory, "sampled.log")
+            )
+            sampled_handler.addFilter(SamplingFilter(rate=options["sample_rate"]))
+            sampled = self.make_logger("sampled", sampled_handler)
+
+            try:
+                full_us = self.run(full, requests, threads)
+                sampled_us = self.run(sampled, requests, threads)
+            finally:
+                for logger in (full, sampled):
+                    for handler in logger.handlers:
+                        handler.close()
+                    logger.handlers = []
+
+        self.stdout.write(
+            f"{requests} requests on {threads} threads, logging cost per request:"
+        )
+        self.stdout.write(f"  FileHandler:              {full_us:.1f} us")
+        self.stdout.write(
+            f"  FileHandler, sampled {options['sample_rate']:.0%}: {sampled_us:.1f} us"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Sampling speedup: {full_us / sampled_us:.1f}x")
+        )
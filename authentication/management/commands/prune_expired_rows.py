@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from authentication.maintenance import PRUNERS, prune_expired_rows
+
+
+class Command(BaseCommand):
+    help = "Prune expired JWT tokens and Celery results in bounded batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            help=f"Tables to prune, default all of: {', '.join(PRUNERS)}",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Rows deleted per statement (default MAINTENANCE_DELETE_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between batches",
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options["names"]) - set(PRUNERS)
+        if unknown:
+            raise CommandError(f"Unknown tables: {', '.join(sorted(unknown))}")
+
+        report = prune_expired_rows(
+            options["names"], options["batch_size"], options["pause"]
+        )
+        for name, result in report.items():
+            self.stdout.write(
+                f"{name}: deleted {result['deleted']} rows in {result['seconds']}s"
+            )
+        self.stdout.write(self.style.SUCCESS("Pruning finished."))
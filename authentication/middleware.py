@@ -0,0 +1,40 @@
+# This file contains the middleware recording the activity of sessions.
+
+import logging
+
+from django.contrib.auth import SESSION_KEY
+from redis.exceptions import RedisError
+
+from .session_activity import record_session_activity
+
+logger = logging.getLogger(__name__)
+
+
+class SessionActivityMiddleware:
+    """
+    Record the last activity and device of logged-in sessions in Redis.
+    The flush task upserts them into SessionInfo in batches, so requests
+    never write to the database for it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        session = getattr(request, "session", None)
+        if session is None or session.session_key is None:
+            return response
+        # The user logged in to the session; API views may authenticate the
+        # request by token instead, which is not session activity
+        user_id = session.get(SESSION_KEY)
+        if user_id is None:
+            return response
+
+        device = request.META.get("HTTP_USER_AGENT", "")[:100] or None
+        try:
+            record_session_activity(session.session_key, int(user_id), device)
+        except RedisError:
+            logger.warning("Could not record activity of a session", exc_info=True)
+        return response
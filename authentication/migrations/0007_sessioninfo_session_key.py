@@ -0,0 +1,40 @@
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_session_keys(apps, schema_editor):
+    # The session foreign key column holds the session key
+    SessionInfo = apps.get_model("authentication", "SessionInfo")
+    db_alias = schema_editor.connection.alias
+    SessionInfo.objects.using(db_alias).update(session_key=F("session_id"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0006_remove_user_otp_code_remove_user_otp_expiry_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sessioninfo",
+            name="session_key",
+            field=models.CharField(max_length=40, null=True),
+        ),
+        migrations.AddField(
+            model_name="sessioninfo",
+            name="created_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(copy_session_keys, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="sessioninfo",
+            name="session",
+        ),
+        migrations.AlterField(
+            model_name="sessioninfo",
+            name="session_key",
+            field=models.CharField(max_length=40, unique=True),
+        ),
+    ]
@@ -1,6 +1,5 @@
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.contrib.sessions.models import Session
 from django.db import models
 from django.utils.timezone import now
 
@@ -19,9 +18,9 @@ class User(AbstractUser):
 
 
 class SessionInfo(models.Model):
-    session = models.OneToOneField(
-        Session, on_delete=models.CASCADE, related_name="info"
-    )
+    # A key of the configured session store (cache sessions have no rows),
+    # upserted from the activity recorded in Redis, see session_activity.py
+    session_key = models.CharField(max_length=40, unique=True)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -30,6 +29,7 @@ class SessionInfo(models.Model):
     )
     device = models.CharField(max_length=100, null=True, blank=True)
     location = models.CharField(max_length=100, null=True, blank=True)
+    created_at = models.DateTimeField(default=now)
     last_activity = models.DateTimeField(default=now)
 
     def __str__(self):
@@ -0,0 +1,200 @@
+# This file contains the Redis-buffered session activity behind SessionInfo.
+
+import json
+from importlib import import_module
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import SessionInfo, User
+
+REDIS_CLIENT = settings.REDIS_INSTANCE
+
+# Latest activity of every session not yet flushed, {session_key: json}
+ACTIVITY_KEY = "auth:sessions:activity"
+# Per-user sets of those session keys, so new sessions can be listed
+USER_SESSIONS_KEY = "auth:sessions:user:{user_id}"
+
+# Reads the pending activity and clears it in one step for the flush task
+POP_ACTIVITY_SCRIPT = REDIS_CLIENT.register_script("""
+    local activity = redis.call('HGETALL', KEYS[1])
+    redis.call('DEL', KEYS[1])
+    return activity
+    """)
+
+
+def get_session_store():
+    return import_module(settings.SESSION_ENGINE).SessionStore
+
+
+def record_session_activity(session_key, user_id, device=None):
+    """
+    Remember the latest activity of a session in one round trip. Only the
+    newest entry per session is kept until the next flush.
+    """
+    activity = {
+        "user_id": user_id,
+        "device": device,
+        "last_activity": timezone.now().isoformat(),
+    }
+    user_sessions_key = USER_SESSIONS_KEY.format(user_id=user_id)
+    pipe = REDIS_CLIENT.pipeline(transaction=False)
+    pipe.hset(ACTIVITY_KEY, session_key, json.dumps(activity))
+    pipe.sadd(user_sessions_key, session_key)
+    pipe.expire(user_sessions_key, settings.SESSION_COOKIE_AGE)
+    pipe.execute()
+
+
+def decode_activity(value):
+    activity = json.loads(value)
+    activity["last_activity"] = parse_datetime(activity["last_activity"])
+    return activity
+
+
+def get_user_sessions(user):
+    """
+    The user's sessions as {session_key: info dict}, merging the flushed
+    SessionInfo rows with the activity still pending in Redis.
+    """
+    rows = SessionInfo.objects.filter(user=user).values(
+        "session_key", "device", "location", "created_at", "last_activity"
+    )
+    sessions = {row.pop("session_key"): row for row in rows}
+
+    pending_keys = REDIS_CLIENT.smembers(USER_SESSIONS_KEY.format(user_id=user.pk))
+    keys = list(set(sessions) | set(pending_keys))
+    values = REDIS_CLIENT.hmget(ACTIVITY_KEY, keys) if keys else []
+    for session_key, value in zip(keys, values):
+        if value is None:
+            continue
+        activity = decode_activity(value)
+        if activity["user_id"] != user.pk:
+            continue
+        session = sessions.setdefault(
+            session_key,
+            {"location": None, "created_at": activity["last_activity"]},
+        )
+        session["device"] = activity["device"] or session.get("device")
+        session["last_activity"] = activity["last_activity"]
+    return sessions
+
+
+def has_session(user, session_key):
+    """
+    Whether the session belongs to the user, flushed or still pending.
+    """
+    if SessionInfo.objects.filter(user=user, session_key=session_key).exists():
+        return True
+    return bool(
+        REDIS_CLIENT.sismember(USER_SESSIONS_KEY.format(user_id=user.pk), session_key)
+    )
+
+
+def delete_stored_sessions(session_keys):
+    """
+    Delete sessions from the configured session store; cache sessions are
+    deleted in one round trip.
+    """
+    store_class = get_session_store()
+    if settings.SESSION_ENGINE == "django.contrib.sessions.backends.cache":
+        caches[settings.SESSION_CACHE_ALIAS].delete_many(
+            [store_class.cache_key_prefix + session_key for session_key in session_keys]
+        )
+        return
+    store = store_class()
+    for session_key in session_keys:
+        store.delete(session_key)
+
+
+def forget_sessions(user, session_keys):
+    """
+    End the given sessions of the user: delete them from the session store,
+    their SessionInfo rows and their pending activity.
+    """
+    session_keys = list(session_keys)
+    if not session_keys:
+        return
+    delete_stored_sessions(session_keys)
+    SessionInfo.objects.filter(user=user, session_key__in=session_keys).delete()
+
+    pipe = REDIS_CLIENT.pipeline(transaction=False)
+    pipe.hdel(ACTIVITY_KEY, *session_keys)
+    pipe.srem(USER_SESSIONS_KEY.format(user_id=user.pk), *session_keys)
+    pipe.execute()
+
+
+def forget_all_sessions(user):
+    """
+    End every session of the user with a single DELETE of their SessionInfo
+    rows. Returns the number of sessions ended.
+    """
+    user_sessions_key = USER_SESSIONS_KEY.format(user_id=user.pk)
+    session_keys = set(
+        SessionInfo.objects.filter(user=user).values_list("session_key", flat=True)
+    )
+    session_keys |= REDIS_CLIENT.smembers(user_sessions_key)
+    if not session_keys:
+        return 0
+
+    delete_stored_sessions(session_keys)
+    # SessionInfo has no dependents or signals, so this is one set-based DELETE
+    SessionInfo.objects.filter(user=user).delete()
+
+    pipe = REDIS_CLIENT.pipeline(transaction=False)
+    pipe.hdel(ACTIVITY_KEY, *session_keys)
+    pipe.delete(user_sessions_key)
+    pipe.execute()
+    return len(session_keys)
+
+
+def flush_session_activity(batch_size=500):
+    """
+    Upsert the pending activity into SessionInfo in batches. Entries of a
+    failed flush are put back unless newer activity was recorded meanwhile.
+    Returns the number of sessions written.
+    """
+    flat = POP_ACTIVITY_SCRIPT(keys=[ACTIVITY_KEY])
+    pending = dict(zip(flat[::2], flat[1::2]))
+    if not pending:
+        return 0
+
+    try:
+        activities = {key: decode_activity(value) for key, value in pending.items()}
+        existing_users = set(
+            User.objects.filter(
+                pk__in={activity["user_id"] for activity in activities.values()}
+            ).values_list("pk", flat=True)
+        )
+        infos = [
+            SessionInfo(
+                session_key=session_key,
+                user_id=activity["user_id"],
+                device=activity["device"],
+                created_at=activity["last_activity"],
+                last_activity=activity["last_activity"],
+            )
+            for session_key, activity in activities.items()
+            if activity["user_id"] in existing_users
+        ]
+        SessionInfo.objects.bulk_create(
+            infos,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["session_key"],
+            update_fields=["user", "device", "last_activity"],
+        )
+    except Exception:
+        pipe = REDIS_CLIENT.pipeline(transaction=False)
+        for session_key, value in pending.items():
+            pipe.hsetnx(ACTIVITY_KEY, session_key, value)
+        pipe.execute()
+        raise
+
+    # Flushed sessions are listed from their rows from now on
+    pipe = REDIS_CLIENT.pipeline(transaction=False)
+    for info in infos:
+        pipe.srem(USER_SESSIONS_KEY.format(user_id=info.user_id), info.session_key)
+    pipe.execute()
+    return len(infos)
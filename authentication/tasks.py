@@ -1,6 +1,9 @@
 from celery import shared_task
 from django.core.mail import send_mail
 
+from .maintenance import prune_expired_rows
+from .session_activity import flush_session_activity
+
 
 @shared_task
 def send_otp_via_email(subject, message, from_email, recipient_list):
@@ -24,3 +27,15 @@ def send_verification_email(subject, message, from_email, recipient_list):
 @shared_task
 def send_reset_password_email(subject, message, from_email, recipient_list):
     send_mail(subject, message, from_email, recipient_list)
+
+
+@shared_task
+def flush_session_activity_task():
+    # Upserts the session activity buffered in Redis into SessionInfo
+    return flush_session_activity()
+
+
+@shared_task
+def prune_expired_rows_task():
+    # Nightly batched cleanup of expired JWT tokens and Celery results
+    return prune_expired_rows()
@@ -5,7 +5,7 @@ from django.urls import reverse
 from rest_framework import status
 
 from authentication.models import User
-from authentication.utils_otp_and_tokens import store_otp_for_user
+from authentication.utils_otp_and_tokens import get_otp_for_user, store_otp_for_user
 
 
 @pytest.fixture
@@ -114,6 +114,21 @@ def test_verify_otp_invalid(authenticated_client):
     assert response.data["error"] == "Invalid or expired OTP."
 
 
+def test_verify_otp_locked_after_failed_attempts(authenticated_client, settings):
+    """Test the OTP stops working after too many wrong guesses."""
+    client, user = authenticated_client
+    store_otp_for_user(user.id, "123456", ttl=300)
+    url = reverse("verify_otp")
+
+    for _ in range(settings.OTP_MAX_ATTEMPTS - 1):
+        response = client.post(url, {"otp": "654321"}, format="json")
+        assert response.data["error"] == "Invalid or expired OTP."
+    response = client.post(url, {"otp": "654321"}, format="json")
+    assert response.data["error"] == "Too many invalid attempts. Request a new OTP."
+
+    assert get_otp_for_user(user.id) is None
+
+
 def test_disable_2fa_success(authenticated_client):
     """Test disabling 2FA successfully."""
     client, user = authenticated_client
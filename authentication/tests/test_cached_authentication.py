@@ -0,0 +1,86 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from authentication.authentication import CachedJWTAuthentication
+from authentication.user_cache import get_user_cache_key, local_users
+from RadinGalleryAPI.local_cache import LocalLRUCache
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    """Test suite for the cached JWT user resolution."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, db):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword", email="test@example.com"
+        )
+        token = AccessToken.for_user(self.user)
+        self.request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+        self.authentication = CachedJWTAuthentication()
+
+    def test_user_is_resolved_without_query_once_cached(
+        self, django_assert_num_queries
+    ):
+        """Test only the first request loads the user from the database."""
+        with django_assert_num_queries(1):
+            user, _ = self.authentication.authenticate(self.request)
+        assert user.pk == self.user.pk
+
+        # Redis only, then the process cache only
+        local_users.clear()
+        with django_assert_num_queries(0):
+            user, _ = self.authentication.authenticate(self.request)
+        with django_assert_num_queries(0):
+            user, _ = self.authentication.authenticate(self.request)
+        assert user.is_authenticated
+        assert user.username == "testuser"
+
+    def test_other_fields_are_loaded_on_access(self, django_assert_num_queries):
+        """Test fields outside the snapshot are deferred, not missing."""
+        user, _ = self.authentication.authenticate(self.request)
+        with django_assert_num_queries(1):
+            assert user.check_password("testpassword")
+
+    def test_saving_user_invalidates_snapshot(self, django_capture_on_commit_callbacks):
+        """Test a deactivated user is rejected right after the save."""
+        self.authentication.authenticate(self.request)
+        assert cache.get(get_user_cache_key(self.user.pk)) is not None
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        assert cache.get(get_user_cache_key(self.user.pk)) is None
+
+        with pytest.raises(AuthenticationFailed):
+            self.authentication.authenticate(self.request)
+
+    def test_deleted_user_is_rejected(self, django_capture_on_commit_callbacks):
+        """Test a deleted user's token no longer authenticates."""
+        self.authentication.authenticate(self.request)
+        with django_capture_on_commit_callbacks(execute=True):
+            self.user.delete()
+
+        with pytest.raises(AuthenticationFailed):
+            self.authentication.authenticate(self.request)
+
+
+def test_local_cache_entries_expire():
+    """Test entries of a cache with a timeout stop being served."""
+    local = LocalLRUCache(maxsize=2, timeout=0)
+    local.set("key", "value")
+    assert local.get("key") is None
+
+    local = LocalLRUCache(maxsize=2)
+    for key in ["a", "b", "c"]:
+        local.set(key, key)
+    assert local.get("a") is None
+    assert local.get("c") == "c"
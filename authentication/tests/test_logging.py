@@ -0,0 +1,32 @@
+import json
+import logging
+
+from RadinGalleryAPI.log_handlers import JSONFormatter, SamplingFilter
+
+
+def make_record(
+    name="authentication.views", level=logging.INFO, msg="User %s", args=(1,)
+):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_sampling_filter_keeps_warnings_and_other_loggers():
+    """Test only INFO records of the sampled logger are dropped."""
+    sampling = SamplingFilter(name="authentication", rate=0)
+
+    assert not sampling.filter(make_record())
+    assert sampling.filter(make_record(level=logging.WARNING))
+    assert sampling.filter(make_record(name="django.request"))
+    assert SamplingFilter(name="authentication", rate=1).filter(make_record())
+
+
+def test_json_formatter_includes_extra_fields():
+    """Test records are rendered as one JSON object with their extras."""
+    record = make_record()
+    record.user_id = 1
+
+    data = json.loads(JSONFormatter().format(record))
+    assert data["message"] == "User 1"
+    assert data["level"] == "INFO"
+    assert data["logger"] == "authentication.views"
+    assert data["user_id"] == 1
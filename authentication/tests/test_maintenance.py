@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.utils import timezone
+from django_celery_results.models import GroupResult, TaskResult
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from authentication.maintenance import delete_in_batches, prune_expired_rows
+
+
+@pytest.fixture
+def user(db):
+    return get_user_model().objects.create_user(
+        username="testuser", email="testuser@example.com", password="testpassword"
+    )
+
+
+def issue_tokens(user, count, expired=False, blacklisted=False):
+    tokens = [RefreshToken.for_user(user) for _ in range(count)]
+    if blacklisted:
+        for token in tokens:
+            token.blacklist()
+    if expired:
+        OutstandingToken.objects.filter(
+            jti__in=[token["jti"] for token in tokens]
+        ).update(expires_at=timezone.now() - timedelta(hours=1))
+    return tokens
+
+
+def create_task_results(count, age):
+    TaskResult.objects.bulk_create(
+        [TaskResult(task_id=f"task-{age.days}-{i}") for i in range(count)]
+    )
+    TaskResult.objects.filter(task_id__startswith=f"task-{age.days}-").update(
+        date_done=timezone.now() - age
+    )
+
+
+@pytest.mark.django_db
+def test_prune_expired_tokens_keeps_valid_ones(user):
+    """Expired tokens and their blacklist rows go, valid ones stay."""
+    issue_tokens(user, 3, expired=True)
+    issue_tokens(user, 2, expired=True, blacklisted=True)
+    valid = issue_tokens(user, 2)
+    valid_blacklisted = issue_tokens(user, 1, blacklisted=True)
+
+    report = prune_expired_rows(["jwt_tokens"], batch_size=2)
+
+    # Five outstanding tokens plus the two blacklist rows cascaded from them
+    assert report["jwt_tokens"]["deleted"] == 7
+    assert report["jwt_tokens"]["seconds"] >= 0
+    assert set(OutstandingToken.objects.values_list("jti", flat=True)) == {
+        token["jti"] for token in valid + valid_blacklisted
+    }
+    assert BlacklistedToken.objects.get().token.jti == valid_blacklisted[0]["jti"]
+
+
+@pytest.mark.django_db
+def test_prune_expired_task_results(settings):
+    """Celery results older than the retention are pruned."""
+    settings.MAINTENANCE_TASK_RESULT_RETENTION = timedelta(days=7)
+    create_task_results(5, timedelta(days=30))
+    create_task_results(2, timedelta(days=1))
+    GroupResult.objects.create(group_id="old-group")
+    GroupResult.objects.update(date_done=timezone.now() - timedelta(days=30))
+
+    report = prune_expired_rows(["celery_task_results", "celery_group_results"])
+
+    assert report["celery_task_results"]["deleted"] == 5
+    assert report["celery_group_results"]["deleted"] == 1
+    assert TaskResult.objects.count() == 2
+    assert not GroupResult.objects.exists()
+
+
+@pytest.mark.django_db
+def test_delete_in_batches_bounds_every_statement(user, django_assert_num_queries):
+    """Each range deletes at most batch_size rows."""
+    issue_tokens(user, 5, expired=True)
+
+    # Per range: read its ids, collect the rows, then delete their blacklist
+    # rows and them; the last range is short, so no extra read follows
+    with django_assert_num_queries(4 * 3):
+        deleted = delete_in_batches(
+            OutstandingToken.objects.filter(user=user), batch_size=2
+        )
+
+    assert deleted == 5
+    assert not OutstandingToken.objects.exists()
+
+
+@pytest.mark.django_db
+def test_prune_expired_rows_command(user, capsys):
+    """The command prunes every table and reports what it removed."""
+    issue_tokens(user, 2, expired=True)
+    create_task_results(1, timedelta(days=30))
+
+    call_command("prune_expired_rows", "--batch-size", "1")
+
+    output = capsys.readouterr().out
+    assert "jwt_tokens: deleted 2 rows" in output
+    assert "celery_task_results: deleted 1 rows" in output
+    assert "celery_group_results: deleted 0 rows" in output
+    assert not OutstandingToken.objects.exists()
+    assert not TaskResult.objects.exists()
@@ -1,8 +1,18 @@
-from unittest.mock import patch
-
 import pytest
-
+from django.conf import settings
+from django.test import override_settings
+
+from authentication.token_store import (
+    INVALID,
+    LOCKED,
+    MISSING,
+    VERIFIED,
+    TokenStore,
+    otp_codes,
+)
 from authentication.utils_otp_and_tokens import (
+    consume_password_reset_token,
+    consume_verification_token,
     delete_otp_for_user,
     delete_password_reset_token,
     delete_verification_token,
@@ -12,119 +22,105 @@ from authentication.utils_otp_and_tokens import (
     store_otp_for_user,
     store_password_reset_token,
     store_verification_token,
+    verify_otp_for_user,
 )
 
-
-@pytest.fixture
-def mock_redis():
-    """Mock the Redis functions used in the utils."""
-    with patch("authentication.utils_otp_and_tokens.save_to_redis") as mock_save, patch(
-        "authentication.utils_otp_and_tokens.get_from_redis"
-    ) as mock_get, patch(
-        "authentication.utils_otp_and_tokens.delete_from_redis"
-    ) as mock_delete:
-        yield mock_save, mock_get, mock_delete
+REDIS = settings.REDIS_INSTANCE
 
 
-def test_store_and_retrieve_otp(mock_redis):
-    """Test storing and retrieving an OTP from Redis."""
-    mock_save, mock_get, mock_delete = mock_redis
-
-    user_id = 1
-    otp = "123456"
-    ttl = 300
-
-    # Simulate successful retrieval
-    mock_get.return_value = otp
-
-    # Store OTP
-    store_otp_for_user(user_id, otp, ttl)
-    mock_save.assert_called_once_with(f"auth:otp:{user_id}", otp, ttl=ttl)
+@pytest.fixture
+def store():
+    """A token store in its own namespace, cleaned up after the test."""
+    store = TokenStore("test_token", ttl=60, max_attempts=3)
+    yield store
+    for key in REDIS.scan_iter("auth:*:test_token:*"):
+        REDIS.delete(key)
 
-    # Retrieve OTP
-    retrieved_otp = get_otp_for_user(user_id)
-    mock_get.assert_called_once_with(f"auth:otp:{user_id}")
-    assert retrieved_otp == otp, "Retrieved OTP does not match the stored value"
 
+def test_store_and_retrieve_otp():
+    """Test storing, retrieving and deleting an OTP."""
+    store_otp_for_user(1, "123456", ttl=300)
+    assert get_otp_for_user(1) == "123456"
+    assert 0 < REDIS.ttl(otp_codes.get_key(1)) <= 300
 
-def test_delete_otp(mock_redis):
-    """Test deleting an OTP from Redis."""
-    mock_save, mock_get, mock_delete = mock_redis
+    delete_otp_for_user(1)
+    assert get_otp_for_user(1) is None
 
-    user_id = 1
 
-    # Delete OTP
-    delete_otp_for_user(user_id)
-    mock_delete.assert_called_once_with(f"auth:otp:{user_id}")
+def test_verify_otp_consumes_it():
+    """Test a matching OTP is verified once and then gone."""
+    store_otp_for_user(1, "123456")
+    assert verify_otp_for_user(1, "123456") == VERIFIED
+    assert verify_otp_for_user(1, "123456") == MISSING
 
 
-def test_store_and_retrieve_verification_token(mock_redis):
-    """Test storing and retrieving a verification token from Redis."""
-    mock_save, mock_get, mock_delete = mock_redis
+def test_verification_token_is_single_use():
+    """Test a verification token can only be consumed once."""
+    store_verification_token("verification_token", 1, ttl=3600)
+    assert get_user_id_by_verification_token("verification_token") == "1"
 
-    token = "verification_token"
-    user_id = 1
-    ttl = 3600
+    assert consume_verification_token("verification_token") == "1"
+    assert consume_verification_token("verification_token") is None
 
-    # Simulate successful retrieval
-    mock_get.return_value = str(user_id)
+    store_verification_token("verification_token", 1)
+    delete_verification_token("verification_token")
+    assert get_user_id_by_verification_token("verification_token") is None
 
-    # Store verification token
-    store_verification_token(token, user_id, ttl)
-    mock_save.assert_called_once_with(
-        f"auth:verification_token:{token}", user_id, ttl=ttl
-    )
 
-    # Retrieve user ID by token
-    retrieved_user_id = get_user_id_by_verification_token(token)
-    mock_get.assert_called_once_with(f"auth:verification_token:{token}")
-    assert retrieved_user_id == str(
-        user_id
-    ), "Retrieved user ID does not match the stored value"
+def test_password_reset_token_is_single_use():
+    """Test a password reset token can only be consumed once."""
+    store_password_reset_token("reset_token", 1, ttl=3600)
+    assert get_user_id_by_password_reset_token("reset_token") == "1"
 
+    assert consume_password_reset_token("reset_token") == "1"
+    assert consume_password_reset_token("reset_token") is None
 
-def test_delete_verification_token(mock_redis):
-    """Test deleting a verification token from Redis."""
-    mock_save, mock_get, mock_delete = mock_redis
+    store_password_reset_token("reset_token", 1)
+    delete_password_reset_token("reset_token")
+    assert get_user_id_by_password_reset_token("reset_token") is None
 
-    token = "verification_token"
 
-    # Delete verification token
-    delete_verification_token(token)
-    mock_delete.assert_called_once_with(f"auth:verification_token:{token}")
+def test_tokens_are_namespaced():
+    """Test the same token string in another flow isn't accepted."""
+    store_verification_token("shared_token", 1)
+    assert consume_password_reset_token("shared_token") is None
+    assert consume_verification_token("shared_token") == "1"
 
 
-def test_store_and_retrieve_password_reset_token(mock_redis):
-    """Test storing and retrieving a password reset token from Redis."""
-    mock_save, mock_get, mock_delete = mock_redis
+def test_failed_attempts_lock_the_value(store):
+    """Test the value is dropped after too many wrong guesses."""
+    store.issue("user", "secret")
+    assert store.verify("user", "wrong") == INVALID
+    assert store.verify("user", "wrong") == INVALID
+    # The attempt counter expires with the value
+    assert 0 < REDIS.ttl(store.get_attempts_key("user")) <= 60
 
-    token = "reset_token"
-    user_id = 1
-    ttl = 3600
+    assert store.verify("user", "wrong") == LOCKED
+    assert store.verify("user", "secret") == MISSING
 
-    # Simulate successful retrieval
-    mock_get.return_value = str(user_id)
 
-    # Store password reset token
-    store_password_reset_token(token, user_id, ttl)
-    mock_save.assert_called_once_with(
-        f"auth:password_reset_token:{token}", user_id, ttl=ttl
-    )
+def test_reissuing_resets_attempts(store):
+    """Test issuing a new value starts its attempt count over."""
+    store.issue("user", "secret")
+    store.verify("user", "wrong")
+    store.verify("user", "wrong")
 
-    # Retrieve user ID by token
-    retrieved_user_id = get_user_id_by_password_reset_token(token)
-    mock_get.assert_called_once_with(f"auth:password_reset_token:{token}")
-    assert retrieved_user_id == str(
-        user_id
-    ), "Retrieved user ID does not match the stored value"
+    store.issue("user", "secret")
+    assert store.verify("user", "wrong") == INVALID
+    assert store.verify("user", "secret") == VERIFIED
 
 
-def test_delete_password_reset_token(mock_redis):
-    """Test deleting a password reset token from Redis."""
-    mock_save, mock_get, mock_delete = mock_redis
+def test_issue_many(store):
+    """Test issuing several values at once."""
+    store.issue_many({"a": "1", "b": "2"}, ttl=30)
+    assert store.peek("a") == "1"
+    assert store.peek("b") == "2"
+    assert 0 < REDIS.ttl(store.get_key("b")) <= 30
 
-    token = "reset_token"
 
-    # Delete password reset token
-    delete_password_reset_token(token)
-    mock_delete.assert_called_once_with(f"auth:password_reset_token:{token}")
+def test_key_version_bump_abandons_values(store):
+    """Test values of an older key version are no longer found."""
+    store.issue("user", "secret")
+    with override_settings(AUTH_TOKEN_KEY_VERSION=settings.AUTH_TOKEN_KEY_VERSION + 1):
+        assert store.consume("user") is None
+    assert store.consume("user") == "secret"
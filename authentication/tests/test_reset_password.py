@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import pytest
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -110,3 +112,25 @@ def test_reset_password_mismatched_passwords(api_client, user_with_token):
     assert response.status_code == status.HTTP_400_BAD_REQUEST
     assert "new_password" in response.data  # Ensure 'new_password' key exists
     assert response.data["new_password"][0] == "Passwords do not match."
+
+
+@pytest.mark.django_db
+def test_forgot_then_reset_password(api_client, user_with_token):
+    """Test the token mailed by forgot-password resets the password once."""
+    with patch("authentication.views.send_reset_password_email.delay") as mock_send:
+        response = api_client.post(
+            reverse("forgot_password"), {"email": user_with_token.email}
+        )
+    assert response.status_code == status.HTTP_200_OK
+    token = mock_send.call_args.args[1].split("token=")[1].split()[0]
+
+    url = reverse("reset_password") + f"?token={token}"
+    data = {"new_password": "new_password123", "new_password2": "new_password123"}
+    response = api_client.post(url, data)
+    assert response.status_code == status.HTTP_200_OK
+    user_with_token.refresh_from_db()
+    assert user_with_token.check_password("new_password123")
+
+    response = api_client.post(url, data)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["error"] == "Token is invalid or expired."
@@ -1,12 +1,22 @@
 import uuid
 
 import pytest
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.sessions.models import Session
+from django.contrib.sessions.backends.cache import SessionStore
+from django.db import DatabaseError
 from django.urls import reverse
 from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from authentication.models import SessionInfo
+from authentication.session_activity import (
+    ACTIVITY_KEY,
+    flush_session_activity,
+    get_user_sessions,
+    record_session_activity,
+)
 
 
 @pytest.fixture
@@ -21,30 +31,18 @@ def create_user(db):
 
 
 def create_session(user, device="Unknown Device", location="Unknown Location"):
-    """Helper function to create a Session and update its SessionInfo."""
-    # Generate a unique session key
-    session_key = uuid.uuid4().hex
-
-    # Create a Session object
-    session = Session.objects.create(
-        session_key=session_key,
-        session_data="{}",  # Empty session data
-        expire_date=timezone.now() + timezone.timedelta(days=1),
+    """Helper function to create a session and its flushed SessionInfo."""
+    session = SessionStore()
+    session.create()
+
+    SessionInfo.objects.create(
+        session_key=session.session_key,
+        user=user,
+        device=device,
+        location=location,
+        last_activity=timezone.now(),
     )
 
-    # Retrieve the automatically created SessionInfo instance
-    try:
-        session_info = SessionInfo.objects.get(session=session)
-    except SessionInfo.DoesNotExist:
-        pytest.fail("SessionInfo was not created by signal.")
-
-    # Update SessionInfo fields
-    session_info.user = user
-    session_info.device = device
-    session_info.location = location
-    session_info.last_activity = timezone.now()
-    session_info.save()
-
     return session
 
 
@@ -125,8 +123,8 @@ def test_delete_session_success(api_client, create_user):
     assert response.data["message"] == "Session deleted successfully."
 
     # Verify that the session and SessionInfo are deleted
-    assert not Session.objects.filter(session_key=session.session_key).exists()
-    assert not SessionInfo.objects.filter(session=session).exists()
+    assert not SessionStore().exists(session.session_key)
+    assert not SessionInfo.objects.filter(session_key=session.session_key).exists()
 
 
 @pytest.mark.django_db
@@ -170,8 +168,8 @@ def test_delete_session_another_user_session(api_client, create_user):
     assert response.data["error"] == "Session not found."
 
     # Verify that the session still exists
-    assert Session.objects.filter(session_key=session.session_key).exists()
-    assert SessionInfo.objects.filter(session=session).exists()
+    assert SessionStore().exists(session.session_key)
+    assert SessionInfo.objects.filter(session_key=session.session_key).exists()
 
 
 @pytest.mark.django_db
@@ -211,7 +209,6 @@ def test_logout_all_sessions_success(api_client, create_user):
     user = create_user
 
     # Ensure no pre-existing sessions
-    Session.objects.all().delete()
     SessionInfo.objects.all().delete()
 
     # Create multiple sessions
@@ -224,7 +221,7 @@ def test_logout_all_sessions_success(api_client, create_user):
     # Debugging: Log all sessions before logout
     all_sessions = SessionInfo.objects.all()
     print(
-        f"All sessions before logout: {[(s.user.username, s.session.session_key) for s in all_sessions]}"
+        f"All sessions before logout: {[(s.user.username, s.session_key) for s in all_sessions]}"
     )
 
     # Count active sessions before logout
@@ -237,7 +234,7 @@ def test_logout_all_sessions_success(api_client, create_user):
     # Debugging: Log all sessions after logout
     all_sessions_after = SessionInfo.objects.all()
     print(
-        f"All sessions after logout: {[(s.user.username, s.session.session_key) for s in all_sessions_after]}"
+        f"All sessions after logout: {[(s.user.username, s.session_key) for s in all_sessions_after]}"
     )
 
     # Count active sessions after logout
@@ -289,12 +286,11 @@ def test_list_sessions_with_expired_session(api_client, create_user):
     expired_session = create_session(
         user, device="Old Browser", location="Old Location"
     )
-    # Manually set expire_date to past
-    expired_session.expire_date = timezone.now() - timezone.timedelta(days=1)
-    expired_session.save()
+    # Expire the session in the store
+    expired_session.delete()
 
     # Update the corresponding SessionInfo
-    session_info = SessionInfo.objects.get(session=expired_session)
+    session_info = SessionInfo.objects.get(session_key=expired_session.session_key)
     session_info.last_activity = timezone.now() - timezone.timedelta(days=2)
     session_info.save()
 
@@ -314,3 +310,144 @@ def test_list_sessions_with_expired_session(api_client, create_user):
     session_keys = {expired_session.session_key, valid_session.session_key}
     returned_keys = {session["session_key"] for session in response.data["sessions"]}
     assert session_keys == returned_keys
+
+
+@pytest.mark.django_db
+def test_session_activity_is_recorded_without_writes(client, create_user):
+    """Requests of a logged-in session only touch Redis; the flush upserts."""
+    user = create_user
+    client.force_login(user)
+    session_key = client.session.session_key
+
+    client.get(reverse("list_sessions"), HTTP_USER_AGENT="Chrome")
+
+    assert not SessionInfo.objects.filter(session_key=session_key).exists()
+    pending = get_user_sessions(user)
+    assert pending[session_key]["device"] == "Chrome"
+
+    assert flush_session_activity() == 1
+    info = SessionInfo.objects.get(session_key=session_key)
+    assert info.user == user
+    assert info.device == "Chrome"
+    assert not settings.REDIS_INSTANCE.hexists(ACTIVITY_KEY, session_key)
+
+
+@pytest.mark.django_db
+def test_flush_session_activity_updates_existing_rows(create_user):
+    """A flush updates the activity of flushed sessions in place."""
+    user = create_user
+    session = create_session(user, device="Chrome", location="New York")
+    SessionInfo.objects.filter(session_key=session.session_key).update(
+        last_activity=timezone.now() - timezone.timedelta(days=1)
+    )
+
+    record_session_activity(session.session_key, user.pk, "Firefox")
+    record_session_activity("new-session", user.pk, "Safari")
+    assert flush_session_activity() == 2
+
+    info = SessionInfo.objects.get(session_key=session.session_key)
+    assert info.device == "Firefox"
+    assert info.location == "New York"
+    assert info.last_activity > timezone.now() - timezone.timedelta(minutes=1)
+    assert SessionInfo.objects.filter(user=user).count() == 2
+    assert flush_session_activity() == 0
+
+
+@pytest.mark.django_db
+def test_flush_session_activity_puts_back_on_failure(create_user, monkeypatch):
+    """Activity of a failed flush is kept for the next one."""
+    user = create_user
+    record_session_activity("pending-session", user.pk, "Chrome")
+
+    def fail(*args, **kwargs):
+        raise DatabaseError("database unavailable")
+
+    monkeypatch.setattr(SessionInfo.objects, "bulk_create", fail)
+    with pytest.raises(DatabaseError):
+        flush_session_activity()
+    monkeypatch.undo()
+
+    assert flush_session_activity() == 1
+    assert SessionInfo.objects.filter(session_key="pending-session").exists()
+
+
+@pytest.mark.django_db
+def test_list_sessions_merges_pending_activity(api_client, create_user):
+    """Unflushed sessions are listed and flushed ones show their latest activity."""
+    user = create_user
+    session = create_session(user, device="Chrome", location="New York")
+    record_session_activity(session.session_key, user.pk, "Chrome 2")
+    record_session_activity("pending-session", user.pk, "Safari")
+
+    api_client.force_authenticate(user=user)
+    response = api_client.get(reverse("list_sessions"))
+
+    assert response.status_code == 200
+    sessions = {s["session_key"]: s for s in response.data["sessions"]}
+    assert set(sessions) == {session.session_key, "pending-session"}
+    assert sessions[session.session_key]["device"] == "Chrome 2"
+    assert sessions[session.session_key]["location"] == "New York"
+    assert sessions["pending-session"]["device"] == "Safari"
+
+
+@pytest.mark.django_db
+def test_logout_all_sessions_clears_pending_activity(api_client, create_user):
+    """Logging out everywhere also drops sessions that were never flushed."""
+    user = create_user
+    create_session(user, device="Chrome")
+    record_session_activity("pending-session", user.pk, "Safari")
+
+    api_client.force_authenticate(user=user)
+    response = api_client.post(reverse("logout_all_sessions"))
+
+    assert response.data["message"] == "All 2 sessions logged out successfully."
+    assert get_user_sessions(user) == {}
+    assert flush_session_activity() == 0
+
+
+@pytest.mark.django_db
+def test_list_sessions_uses_one_query(
+    api_client, create_user, django_assert_num_queries
+):
+    """Listing reads the needed SessionInfo columns in a single query."""
+    user = create_user
+    for device in ("Chrome", "Firefox", "Safari"):
+        create_session(user, device=device)
+
+    api_client.force_authenticate(user=user)
+    with django_assert_num_queries(1):
+        response = api_client.get(reverse("list_sessions"))
+
+    assert len(response.data["sessions"]) == 3
+
+
+@pytest.mark.django_db
+def test_logout_all_sessions_blacklists_refresh_tokens(
+    api_client, create_user, django_assert_max_num_queries
+):
+    """Every unexpired refresh token of the user is blacklisted in bulk."""
+    user = create_user
+    other_user = get_user_model().objects.create_user(
+        username="otheruser", email="other@example.com", password="otherpassword"
+    )
+    tokens = [RefreshToken.for_user(user) for _ in range(3)]
+    tokens[0].blacklist()
+    other_token = RefreshToken.for_user(other_user)
+    create_session(user, device="Chrome")
+
+    api_client.force_authenticate(user=user)
+    # Session keys, session delete, outstanding tokens and one bulk insert
+    with django_assert_max_num_queries(4):
+        response = api_client.post(reverse("logout_all_sessions"))
+
+    assert response.status_code == 200
+    assert response.data["blacklisted_tokens"] == 2
+    for token in tokens:
+        assert BlacklistedToken.objects.filter(token__jti=token["jti"]).exists()
+    assert not BlacklistedToken.objects.filter(token__jti=other_token["jti"]).exists()
+    assert not SessionInfo.objects.filter(user=user).exists()
+
+    refresh = api_client.post(
+        reverse("token_refresh"), {"refresh": str(tokens[1])}, format="json"
+    )
+    assert refresh.status_code == 401
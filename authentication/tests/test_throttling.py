@@ -0,0 +1,82 @@
+from unittest.mock import patch
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from authentication.models import User
+from RadinGalleryAPI.throttling import GCRARateThrottle
+
+
+class ScopedView(APIView):
+    throttle_scope = "test"
+
+
+def make_request():
+    request = APIRequestFactory().get("/", REMOTE_ADDR="10.0.0.1")
+    request.user = None
+    return request
+
+
+@pytest.fixture
+def test_rates():
+    rates = {"test": "3/min", "other": "3/min", "anon": "10/min"}
+    with patch.object(GCRARateThrottle, "THROTTLE_RATES", rates):
+        yield
+
+
+def test_throttle_allows_rate_then_waits(test_rates):
+    """Test the scope's burst is allowed and the next request waits."""
+    with patch("RadinGalleryAPI.throttling.time.time", return_value=1000.0):
+        results = [
+            GCRARateThrottle().allow_request(make_request(), ScopedView())
+            for _ in range(4)
+        ]
+        throttle = GCRARateThrottle()
+        assert throttle.allow_request(make_request(), ScopedView()) is False
+
+    assert results == [True, True, True, False]
+    # One request is regained every 60 / 3 seconds
+    assert throttle.wait() == pytest.approx(20.0)
+
+    with patch("RadinGalleryAPI.throttling.time.time", return_value=1020.0):
+        assert GCRARateThrottle().allow_request(make_request(), ScopedView())
+        assert not GCRARateThrottle().allow_request(make_request(), ScopedView())
+
+
+def test_throttle_scopes_are_independent(test_rates):
+    """Test exhausting one scope doesn't throttle another one."""
+    other = ScopedView()
+    other.throttle_scope = "other"
+    for _ in range(3):
+        GCRARateThrottle().allow_request(make_request(), ScopedView())
+
+    assert not GCRARateThrottle().allow_request(make_request(), ScopedView())
+    assert GCRARateThrottle().allow_request(make_request(), other)
+    # Views without a scope fall back to "anon"
+    assert GCRARateThrottle().allow_request(make_request(), APIView())
+
+
+@pytest.mark.django_db
+def test_generate_otp_is_throttled(api_client):
+    """Test OTP generation is limited by its own stricter scope."""
+    user = User.objects.create_user(
+        email="test@example.com",
+        username="testuser",
+        password="password123",
+        is_2fa_enabled=True,
+        two_fa_method="email",
+    )
+    api_client.force_authenticate(user)
+    url = reverse("generate_otp")
+
+    with patch("authentication.tasks.send_otp_via_email.delay"):
+        responses = [
+            api_client.post(url, {"method": "email"}, format="json") for _ in range(6)
+        ]
+
+    assert [r.status_code for r in responses[:5]] == [status.HTTP_200_OK] * 5
+    assert responses[5].status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert "Retry-After" in responses[5]
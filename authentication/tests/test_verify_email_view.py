@@ -26,6 +26,10 @@ class TestVerifyEmailView:
         user.refresh_from_db()
         assert user.is_active
 
+        # The token is single-use
+        response = api_client.get(f"{verify_email_url}?token={token}")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
     def test_verify_email_invalid_token(self, api_client, verify_email_setup):
         """Test verifying email with an invalid token."""
         _, verify_email_url = verify_email_setup
@@ -3,14 +3,16 @@ import logging
 from django.utils.crypto import get_random_string
 from django.utils.timezone import now, timedelta
 
-from .utils_otp_and_tokens import store_verification_token
+from .token_store import verification_tokens
 
 logger = logging.getLogger(__name__)
 
 
 class TokenMixin:
-    def generate_token(self, user, expiry_hours=1):
-        # Generate a secure token and store it in Redis with an expiration time
+    def generate_token(self, user, expiry_hours=1, store=verification_tokens):
+        # Generate a secure token and store it in Redis with an expiration time.
+        # `store` is the TokenStore the token is issued in (verification or
+        # password reset), so a token only works for its own flow.
         token = get_random_string(32)
         token_expiration = now() + timedelta(hours=expiry_hours)
 
@@ -19,10 +21,12 @@ class TokenMixin:
 
         # Store the token with the user_id in Redis
         # Redis will handle expiration automatically
-        store_verification_token(token, user.id, ttl=ttl)
+        store.issue(token, user.id, ttl=ttl)
 
-        logger.info(
-            f"Token for user {user.id} generated and stored in Redis with TTL {ttl} seconds."
+        logger.debug(
+            "Token for user %s generated and stored in Redis with TTL %s seconds.",
+            user.id,
+            ttl,
         )
 
         return token
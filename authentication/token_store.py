@@ -0,0 +1,113 @@
+# This file contains the Redis store of single-use auth tokens and OTPs.
+
+from django.conf import settings
+
+REDIS_CLIENT = settings.REDIS_INSTANCE
+
+# Returns the value and deletes it (with its attempt counter) in one step,
+# so a token can't be used twice by concurrent requests.
+CONSUME_SCRIPT = REDIS_CLIENT.register_script("""
+    local value = redis.call('GET', KEYS[1])
+    if value then
+        redis.call('DEL', KEYS[1], KEYS[2])
+    end
+    return value
+    """)
+
+# Compares ARGV[1] with the stored value. A match consumes it; a mismatch
+# counts an attempt (expiring with the value) and after ARGV[2] attempts
+# (0 = unlimited) the value is dropped.
+VERIFY_SCRIPT = REDIS_CLIENT.register_script("""
+    local stored = redis.call('GET', KEYS[1])
+    if not stored then
+        return 'missing'
+    end
+    if stored == ARGV[1] then
+        redis.call('DEL', KEYS[1], KEYS[2])
+        return 'ok'
+    end
+    local attempts = redis.call('INCR', KEYS[2])
+    if attempts == 1 then
+        local ttl = redis.call('PTTL', KEYS[1])
+        if ttl > 0 then
+            redis.call('PEXPIRE', KEYS[2], ttl)
+        end
+    end
+    local max_attempts = tonumber(ARGV[2])
+    if max_attempts > 0 and attempts >= max_attempts then
+        redis.call('DEL', KEYS[1], KEYS[2])
+        return 'locked'
+    end
+    return 'invalid'
+    """)
+
+VERIFIED = "ok"
+MISSING = "missing"
+INVALID = "invalid"
+LOCKED = "locked"
+
+
+class TokenStore:
+    """
+    Short-lived single-use values kept in Redis under
+    "auth:v<AUTH_TOKEN_KEY_VERSION>:<namespace>:<identifier>". Bumping the
+    version setting abandons every stored value at once (e.g. after a
+    format change).
+
+    Every operation is one round trip: issuing pipelines the value with the
+    reset of its attempt counter, consuming and verifying run as scripts.
+    """
+
+    def __init__(self, namespace, ttl, max_attempts=0):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_attempts = max_attempts
+
+    def get_key(self, identifier):
+        version = settings.AUTH_TOKEN_KEY_VERSION
+        return f"auth:v{version}:{self.namespace}:{identifier}"
+
+    def get_attempts_key(self, identifier):
+        return f"{self.get_key(identifier)}:attempts"
+
+    def issue(self, identifier, value, ttl=None):
+        self.issue_many({identifier: value}, ttl=ttl)
+
+    def issue_many(self, values, ttl=None):
+        """
+        Store {identifier: value} with the given (or the store's) TTL.
+        """
+        pipe = REDIS_CLIENT.pipeline(transaction=True)
+        for identifier, value in values.items():
+            pipe.set(self.get_key(identifier), value, ex=ttl or self.ttl)
+            pipe.delete(self.get_attempts_key(identifier))
+        pipe.execute()
+
+    def peek(self, identifier):
+        return REDIS_CLIENT.get(self.get_key(identifier))
+
+    def consume(self, identifier):
+        """
+        Returns the stored value and deletes it, or None if there is none.
+        """
+        return CONSUME_SCRIPT(
+            keys=[self.get_key(identifier), self.get_attempts_key(identifier)]
+        )
+
+    def verify(self, identifier, candidate):
+        """
+        Consume the value if it matches `candidate`. Returns VERIFIED,
+        MISSING, INVALID or LOCKED (too many failed attempts).
+        """
+        return VERIFY_SCRIPT(
+            keys=[self.get_key(identifier), self.get_attempts_key(identifier)],
+            args=[candidate, self.max_attempts],
+        )
+
+    def revoke(self, identifier):
+        REDIS_CLIENT.delete(self.get_key(identifier), self.get_attempts_key(identifier))
+
+
+verification_tokens = TokenStore("verification_token", ttl=60 * 60)
+password_reset_tokens = TokenStore("password_reset_token", ttl=60 * 60)
+otp_codes = TokenStore("otp", ttl=60 * 5, max_attempts=settings.OTP_MAX_ATTEMPTS)
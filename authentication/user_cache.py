@@ -0,0 +1,78 @@
+# This file contains the cached user snapshots used by JWT authentication.
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from RadinGalleryAPI.local_cache import LocalLRUCache
+
+from .models import User
+
+USER_KEY_PREFIX = "auth:user"
+
+# Enough to authenticate and authorize a request; everything else is
+# deferred and loaded on first access.
+SNAPSHOT_FIELDS = [
+    "id",
+    "username",
+    "email",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "is_2fa_enabled",
+    "two_fa_method",
+]
+
+local_users = LocalLRUCache(
+    settings.USER_CACHE_LOCAL_SIZE, timeout=settings.USER_CACHE_LOCAL_TIMEOUT
+)
+
+
+def get_user_cache_key(user_id):
+    return f"{USER_KEY_PREFIX}:{user_id}"
+
+
+def get_user_snapshot(user_id):
+    """
+    Returns the snapshot dict of the user from the process cache, Redis or
+    the database (in that order), or None if the user doesn't exist.
+    """
+    key = get_user_cache_key(user_id)
+    snapshot = local_users.get(key)
+    if snapshot is None:
+        snapshot = cache.get(key)
+        if snapshot is None:
+            snapshot = User.objects.filter(pk=user_id).values(*SNAPSHOT_FIELDS).first()
+            if snapshot is None:
+                return None
+            cache.set(key, snapshot, timeout=settings.USER_CACHE_TIMEOUT)
+        local_users.set(key, snapshot)
+    return snapshot
+
+
+def build_user(snapshot):
+    """
+    User instance from a snapshot, as if loaded with .only(*SNAPSHOT_FIELDS).
+    """
+    field_names = [
+        field.attname
+        for field in User._meta.concrete_fields
+        if field.attname in snapshot
+    ]
+    return User.from_db(
+        DEFAULT_DB_ALIAS, field_names, [snapshot[name] for name in field_names]
+    )
+
+
+def invalidate_cached_user(user_id):
+    """
+    Drop the user's snapshot once the current transaction commits. Other
+    processes may still serve their copy for USER_CACHE_LOCAL_TIMEOUT.
+    """
+    key = get_user_cache_key(user_id)
+
+    def invalidate():
+        local_users.delete(key)
+        cache.delete(key)
+
+    transaction.on_commit(invalidate)
@@ -3,7 +3,7 @@ import random
 
 from django.utils.crypto import get_random_string
 
-from .redis_utils import delete_from_redis, get_from_redis, save_to_redis
+from .token_store import otp_codes, password_reset_tokens, verification_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +15,7 @@ def generate_otp():
         str: A string representing a 6-digit OTP code.
     """
     otp = f"{random.randint(100000, 999999)}"
-    logger.debug(f"Generated OTP: {otp}")
+    logger.debug("Generated OTP")
     return otp
 
 
@@ -26,27 +26,22 @@ def generate_verification_token():
         str: A random 32-character alphanumeric string.
     """
     token = get_random_string(32)
-    logger.debug(f"Generated verification token: {token}")
+    logger.debug("Generated verification token")
     return token
 
 
 def store_otp_for_user(user_id, otp, ttl=300):
     """
-    Store the given OTP for a user in Redis with a specified TTL.
+    Store the given OTP for a user in Redis with a specified TTL. Any
+    previous OTP of the user and its failed attempts are discarded.
 
     Args:
         user_id (int or str): The ID of the user.
         otp (str): The one-time password to store.
         ttl (int): Time-to-live in seconds (default 300 seconds).
     """
-    key = f"auth:otp:{user_id}"
-    try:
-        logger.info(f"Storing OTP for user {user_id} with TTL {ttl}: {otp}")
-        save_to_redis(key, otp, ttl=ttl)
-        logger.info(f"Successfully stored OTP for user {user_id}")
-    except Exception as e:
-        logger.error(f"Error storing OTP for user {user_id}: {e}")
-        raise
+    logger.debug("Storing OTP for user %s with TTL %s", user_id, ttl)
+    otp_codes.issue(user_id, otp, ttl=ttl)
 
 
 def get_otp_for_user(user_id):
@@ -59,18 +54,24 @@ def get_otp_for_user(user_id):
     Returns:
         str or None: The stored OTP if it exists, otherwise None.
     """
-    key = f"auth:otp:{user_id}"
-    try:
-        logger.info(f"Retrieving OTP for user {user_id}")
-        otp = get_from_redis(key)
-        if otp:
-            logger.info(f"Retrieved OTP for user {user_id}: {otp}")
-        else:
-            logger.warning(f"No OTP found for user {user_id}")
-        return otp
-    except Exception as e:
-        logger.error(f"Error retrieving OTP for user {user_id}: {e}")
-        raise
+    return otp_codes.peek(user_id)
+
+
+def verify_otp_for_user(user_id, otp):
+    """
+    Check an entered OTP and consume it if it matches, in one atomic step.
+
+    Args:
+        user_id (int or str): The ID of the user.
+        otp (str): The OTP entered by the user.
+
+    Returns:
+        str: token_store.VERIFIED, MISSING, INVALID or LOCKED (the OTP was
+        dropped after too many wrong attempts).
+    """
+    result = otp_codes.verify(user_id, otp)
+    logger.info("OTP verification for user %s: %s", user_id, result)
+    return result
 
 
 def delete_otp_for_user(user_id):
@@ -80,14 +81,8 @@ def delete_otp_for_user(user_id):
     Args:
         user_id (int or str): The ID of the user.
     """
-    key = f"auth:otp:{user_id}"
-    try:
-        logger.info(f"Deleting OTP for user {user_id}")
-        delete_from_redis(key)
-        logger.info(f"Successfully deleted OTP for user {user_id}")
-    except Exception as e:
-        logger.error(f"Error deleting OTP for user {user_id}: {e}")
-        raise
+    logger.debug("Deleting OTP for user %s", user_id)
+    otp_codes.revoke(user_id)
 
 
 def store_verification_token(token, user_id, ttl=3600):
@@ -99,14 +94,8 @@ def store_verification_token(token, user_id, ttl=3600):
         user_id (int or str): The ID of the user associated with this token.
         ttl (int): Time-to-live in seconds (default 3600 seconds).
     """
-    key = f"auth:verification_token:{token}"
-    try:
-        logger.info(f"Storing verification token for user {user_id} with TTL {ttl}")
-        save_to_redis(key, user_id, ttl=ttl)
-        logger.info(f"Successfully stored verification token for user {user_id}")
-    except Exception as e:
-        logger.error(f"Error storing verification token for user {user_id}: {e}")
-        raise
+    logger.debug("Storing verification token for user %s with TTL %s", user_id, ttl)
+    verification_tokens.issue(token, user_id, ttl=ttl)
 
 
 def get_user_id_by_verification_token(token):
@@ -119,18 +108,21 @@ def get_user_id_by_verification_token(token):
     Returns:
         str or None: The user_id if the token is found, otherwise None.
     """
-    key = f"auth:verification_token:{token}"
-    try:
-        logger.info(f"Retrieving user ID for verification token {token}")
-        user_id = get_from_redis(key)
-        if user_id:
-            logger.info(f"Retrieved user ID {user_id} for token {token}")
-        else:
-            logger.warning(f"No user ID found for token {token}")
-        return user_id
-    except Exception as e:
-        logger.error(f"Error retrieving user ID for token {token}: {e}")
-        raise
+    return verification_tokens.peek(token)
+
+
+def consume_verification_token(token):
+    """
+    Retrieve the user_id of a verification token and delete the token in one
+    atomic step, so it can only be used once.
+
+    Returns:
+        str or None: The user_id if the token is found, otherwise None.
+    """
+    user_id = verification_tokens.consume(token)
+    if not user_id:
+        logger.warning("Verification token not found or already used")
+    return user_id
 
 
 def delete_verification_token(token):
@@ -140,46 +132,33 @@ def delete_verification_token(token):
     Args:
         token (str): The verification token to delete.
     """
-    key = f"auth:verification_token:{token}"
-    try:
-        logger.info(f"Deleting verification token {token}")
-        delete_from_redis(key)
-        logger.info(f"Successfully deleted verification token {token}")
-    except Exception as e:
-        logger.error(f"Error deleting verification token {token}: {e}")
-        raise
+    verification_tokens.revoke(token)
 
 
 def store_password_reset_token(token, user_id, ttl=3600):
     """
     Store a password reset token associated with a user_id.
     """
-    key = f"auth:password_reset_token:{token}"
-    try:
-        logger.info(f"Storing password reset token for user {user_id} with TTL {ttl}")
-        save_to_redis(key, user_id, ttl=ttl)
-        logger.info(f"Successfully stored password reset token for user {user_id}")
-    except Exception as e:
-        logger.error(f"Error storing password reset token for user {user_id}: {e}")
-        raise
+    logger.debug("Storing password reset token for user %s with TTL %s", user_id, ttl)
+    password_reset_tokens.issue(token, user_id, ttl=ttl)
 
 
 def get_user_id_by_password_reset_token(token):
     """
     Retrieve the user_id associated with a password reset token.
     """
-    key = f"auth:password_reset_token:{token}"
-    try:
-        logger.info(f"Retrieving user ID for password reset token {token}")
-        user_id = get_from_redis(key)
-        if user_id:
-            logger.info(f"Retrieved user ID {user_id} for token {token}")
-        else:
-            logger.warning(f"No user ID found for token {token}")
-        return user_id
-    except Exception as e:
-        logger.error(f"Error retrieving user ID for token {token}: {e}")
-        raise
+    return password_reset_tokens.peek(token)
+
+
+def consume_password_reset_token(token):
+    """
+    Retrieve the user_id of a password reset token and delete the token in
+    one atomic step, so it can only be used once.
+    """
+    user_id = password_reset_tokens.consume(token)
+    if not user_id:
+        logger.warning("Password reset token not found or already used")
+    return user_id
 
 
 def delete_password_reset_token(token):
@@ -189,11 +168,4 @@ def delete_password_reset_token(token):
     Args:
         token (str): The password reset token to delete.
     """
-    key = f"auth:password_reset_token:{token}"
-    try:
-        logger.info(f"Deleting password reset token {token}")
-        delete_from_redis(key)
-        logger.info(f"Successfully deleted password reset token {token}")
-    except Exception as e:
-        logger.error(f"Error deleting password reset token {token}: {e}")
-        raise
+    password_reset_tokens.revoke(token)
@@ -1,7 +1,6 @@
 import logging
 
 from django.conf import settings
-from django.contrib.sessions.models import Session
 from django.shortcuts import get_object_or_404
 from django.urls import include, path
 from django.utils.crypto import get_random_string
@@ -20,7 +19,8 @@ from rest_framework_simplejwt.views import (
 
 from authentication.serializers import Disable2FASerializer
 
-from .models import SessionInfo, User
+from .jwt_tokens import blacklist_user_tokens
+from .models import User
 from .serializers import (
     ChangePasswordSerializer,
     Disable2FASerializer,
@@ -35,6 +35,12 @@ from .serializers import (
     UpdateProfileSerializer,
     VerifyOTPSerializer,
 )
+from .session_activity import (
+    forget_all_sessions,
+    forget_sessions,
+    get_user_sessions,
+    has_session,
+)
 from .tasks import (
     send_otp_via_email,
     send_otp_via_sms,
@@ -42,14 +48,13 @@ from .tasks import (
     send_verification_email,
 )
 from .token_mixin import TokenMixin
+from .token_store import LOCKED, VERIFIED, password_reset_tokens
+from .user_cache import invalidate_cached_user
 from .utils_otp_and_tokens import (
-    delete_otp_for_user,
-    delete_password_reset_token,
-    delete_verification_token,
-    get_otp_for_user,
-    get_user_id_by_password_reset_token,
-    get_user_id_by_verification_token,
+    consume_password_reset_token,
+    consume_verification_token,
     store_otp_for_user,
+    verify_otp_for_user,
 )
 
 logger = logging.getLogger(__name__)
@@ -61,7 +66,7 @@ auth_schema_view = SpectacularAPIView.as_view(urlconf="authentication.urls")
 # ---------------------------- JWT endpoints ----------------------------
 @extend_schema(tags=["Auth - Token"])
 class CustomTokenObtainPairView(TokenObtainPairView):
-    pass
+    throttle_scope = "auth"
 
 
 @extend_schema(tags=["Auth - Token"])
@@ -76,6 +81,7 @@ class CustomTokenVerifyView(TokenVerifyView):
 
 # ---------------------------- Authentication Endpoints ----------------------------
 class RegisterView(TokenMixin, generics.GenericAPIView):
+    throttle_scope = "auth"
     serializer_class = RegisterSerializer
 
     @extend_schema(
@@ -121,17 +127,14 @@ class RegisterView(TokenMixin, generics.GenericAPIView):
 
         # Save the new user
         user = serializer.save()
-        logger.info(
-            f"User {user.username} registered successfully with email {user.email}."
-        )
+        logger.info("User %s registered successfully.", user.id)
 
         # Generate token using the mixin
         token = self.generate_token(user)
-        logger.info(f"Generated verification token for user {user.username}.")
+        logger.debug("Generated verification token for user %s.", user.id)
 
         # Create a verification link
         verification_link = f"{settings.SITE_URL}/auth/api/verify-email/?token={token}"
-        logger.info(f"Generated verification link: {verification_link}")
 
         # Send the verification email using Celery
         subject = "Email Verification"
@@ -197,8 +200,8 @@ class VerifyEmailView(generics.GenericAPIView):
                 {"error": "Token is required."}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Get user_id from token in Redis
-        user_id = get_user_id_by_verification_token(token)
+        # Get user_id from token in Redis; the token is used up right away
+        user_id = consume_verification_token(token)
         if not user_id:
             logger.error("Invalid token provided, user not found in Redis.")
             return Response(
@@ -214,13 +217,11 @@ class VerifyEmailView(generics.GenericAPIView):
                 {"error": "Invalid token."}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        # If token is in Redis, it hasn't expired yet (Redis handles expiration)
-        # Activate user and delete token
+        # If token was in Redis, it hadn't expired yet (Redis handles expiration)
         user.is_active = True
         user.save()
-        delete_verification_token(token)
 
-        logger.info(f"User {user.id} email verified successfully.")
+        logger.info("User %s email verified successfully.", user.id)
         return Response(
             {"message": "Email verified successfully."}, status=status.HTTP_200_OK
         )
@@ -272,9 +273,8 @@ class LogoutView(generics.GenericAPIView):
         try:
             token = RefreshToken(refresh_token)
             token.blacklist()
-            logger.info(
-                f"Successfully logged out user by blacklisting refresh token: {refresh_token}"
-            )
+            invalidate_cached_user(request.user.id)
+            logger.info("User %s logged out.", request.user.id)
             return Response(
                 {"message": "Logged out successfully."}, status=status.HTTP_200_OK
             )
@@ -334,12 +334,13 @@ class ChangePasswordView(generics.GenericAPIView):
         new_password = serializer.validated_data["new_password"]
 
         # Log the password change attempt
-        logger.info(f"User {user.id} is attempting to change their password.")
+        logger.info("User %s is attempting to change their password.", user.id)
 
         # Check the old password
         if not user.check_password(old_password):
             logger.warning(
-                f"User {user.id} attempted to change password with incorrect old password."
+                "User %s attempted to change password with incorrect old password.",
+                user.id,
             )
             return Response(
                 {"error": "Old password is incorrect."},
@@ -351,7 +352,7 @@ class ChangePasswordView(generics.GenericAPIView):
         user.save()
 
         # Log the successful password change
-        logger.info(f"Password changed successfully for user {user.id}.")
+        logger.info("Password changed successfully for user %s.", user.id)
 
         return Response(
             {"message": "Password changed successfully."}, status=status.HTTP_200_OK
@@ -359,6 +360,7 @@ class ChangePasswordView(generics.GenericAPIView):
 
 
 class ForgotPasswordView(TokenMixin, generics.GenericAPIView):
+    throttle_scope = "password_reset"
     serializer_class = ForgotPasswordSerializer
 
     @extend_schema(
@@ -405,18 +407,14 @@ class ForgotPasswordView(TokenMixin, generics.GenericAPIView):
         serializer.is_valid(raise_exception=True)
 
         email = serializer.validated_data["email"]
-        logger.info(f"Looking up user with email: {email}")
-
         user = get_object_or_404(User, email=email)
-        logger.info(f"User found with email: {email}, ID: {user.id}")
 
         # Generate token using the mixin
-        token = self.generate_token(user)
-        logger.info(f"Generated reset token for user ID: {user.id}")
+        token = self.generate_token(user, store=password_reset_tokens)
+        logger.debug("Generated reset token for user ID: %s", user.id)
 
         # Generate reset password link
         reset_link = f"{settings.SITE_URL}/auth/api/reset-password/?token={token}"
-        logger.info(f"Reset link generated: {reset_link}")
 
         # Send reset password email using Celery
         subject = "Reset your password"
@@ -426,7 +424,7 @@ class ForgotPasswordView(TokenMixin, generics.GenericAPIView):
         send_reset_password_email.delay(
             subject, message, settings.DEFAULT_FROM_EMAIL, [email]
         )
-        logger.info(f"Password reset email task queued for: {email}")
+        logger.info("Password reset email task queued for user %s.", user.id)
 
         return Response(
             {"message": "Password reset link sent."}, status=status.HTTP_200_OK
@@ -474,6 +472,7 @@ class ForgotPasswordView(TokenMixin, generics.GenericAPIView):
     },
 )
 class ResetPasswordView(generics.GenericAPIView):
+    throttle_scope = "password_reset"
     serializer_class = ResetPasswordSerializer
 
     def post(self, request):
@@ -488,8 +487,24 @@ class ResetPasswordView(generics.GenericAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Retrieve user ID associated with the token
-        user_id = get_user_id_by_password_reset_token(token)
+        # Validate the password data using serializer first, so invalid input
+        # doesn't use up the token
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Check if passwords match
+        new_password = serializer.validated_data["new_password"]
+        new_password2 = serializer.validated_data["new_password2"]
+
+        if new_password != new_password2:
+            return Response(
+                {"error": "Passwords do not match."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Retrieve user ID associated with the token and delete the token in
+        # one step, so it can't be used twice
+        user_id = consume_password_reset_token(token)
         if not user_id:
             return Response(
                 {"error": "Token is invalid or expired."},
@@ -505,27 +520,10 @@ class ResetPasswordView(generics.GenericAPIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        # Validate the password data using serializer
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-
-        # Check if passwords match
-        new_password = serializer.validated_data["new_password"]
-        new_password2 = serializer.validated_data["new_password2"]
-
-        if new_password != new_password2:
-            return Response(
-                {"error": "Passwords do not match."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
         # Update the user's password securely
         user.set_password(new_password)
         user.save()
 
-        # Delete the token from Redis after successful password reset
-        delete_password_reset_token(token)
-
         return Response(
             {"message": "Password reset successful."},
             status=status.HTTP_200_OK,
@@ -533,6 +531,7 @@ class ResetPasswordView(generics.GenericAPIView):
 
 
 class ResendEmailView(TokenMixin, generics.GenericAPIView):
+    throttle_scope = "password_reset"
     serializer_class = ResendEmailSerializer
 
     @extend_schema(
@@ -577,9 +576,8 @@ class ResendEmailView(TokenMixin, generics.GenericAPIView):
 
         try:
             user = User.objects.get(email=email)
-            logger.info(f"User found with email: {email}, ID: {user.id}")
         except User.DoesNotExist:
-            logger.error(f"User with email {email} not found.")
+            logger.warning("Resend email requested for an unknown address.")
             return Response(
                 {"error": "User not found."},
                 status=status.HTTP_404_NOT_FOUND,
@@ -587,7 +585,7 @@ class ResendEmailView(TokenMixin, generics.GenericAPIView):
 
         if email_type == "verification":
             if user.is_active:
-                logger.warning(f"User {user.id} is already verified.")
+                logger.warning("User %s is already verified.", user.id)
                 return Response(
                     {"error": "User is already verified."},
                     status=status.HTTP_400_BAD_REQUEST,
@@ -608,7 +606,7 @@ class ResendEmailView(TokenMixin, generics.GenericAPIView):
             send_verification_email.delay(
                 subject, message, settings.DEFAULT_FROM_EMAIL, [user.email]
             )
-            logger.info(f"Verification email task queued for {user.email}.")
+            logger.info("Verification email task queued for user %s.", user.id)
 
             return Response(
                 {"message": "Verification email resent successfully."},
@@ -617,7 +615,7 @@ class ResendEmailView(TokenMixin, generics.GenericAPIView):
 
         elif email_type == "reset_password":
             # Generate reset token and link
-            token = self.generate_token(user)
+            token = self.generate_token(user, store=password_reset_tokens)
             reset_link = f"{settings.SITE_URL}/auth/api/reset-password/?token={token}"
             subject = "Reset your password"
             message = (
@@ -630,7 +628,7 @@ class ResendEmailView(TokenMixin, generics.GenericAPIView):
             send_reset_password_email.delay(
                 subject, message, settings.DEFAULT_FROM_EMAIL, [user.email]
             )
-            logger.info(f"Password reset email task queued for {user.email}.")
+            logger.info("Password reset email task queued for user %s.", user.id)
 
             return Response(
                 {"message": "Password reset email resent successfully."},
@@ -685,16 +683,18 @@ class ProfileView(generics.RetrieveAPIView):
         # Check if the user is active
         if not request.user.is_active:
             logger.warning(
-                f"User {request.user.id} attempted to access profile while inactive."
+                "User %s attempted to access profile while inactive.", request.user.id
             )
             raise PermissionDenied("User account is disabled.")
 
         # Log the profile fetch attempt
-        logger.info(f"User {request.user.id} is fetching their profile.")
+        logger.debug("User %s is fetching their profile.", request.user.id)
 
-        # Serialize and return the user profile data
-        serializer = self.get_serializer(request.user)
-        logger.info(f"Profile fetched successfully for user {request.user.id}.")
+        # Serialize and return the user profile data. request.user is a cached
+        # snapshot, so the profile fields are loaded in one query.
+        user = User.objects.get(pk=request.user.pk)
+        serializer = self.get_serializer(user)
+        logger.info("Profile fetched successfully for user %s.", request.user.id)
         return Response(serializer.data)
 
 
@@ -741,16 +741,16 @@ class UpdateProfileView(generics.UpdateAPIView):
     def get_object(self):
         # Fetch the authenticated user
         user = self.request.user
-        logger.info(f"Fetching profile for user {user.id}")
+        logger.debug("Fetching profile for user %s", user.id)
         return user
 
     def update(self, request, *args, **kwargs):
         # Custom behavior for better error management or logging if needed
-        logger.info(f"Attempting to update profile for user {request.user.id}")
+        logger.debug("Attempting to update profile for user %s", request.user.id)
         response = super().update(request, *args, **kwargs)
 
         # Log the successful update
-        logger.info(f"Profile updated successfully for user {request.user.id}")
+        logger.info("Profile updated successfully for user %s", request.user.id)
 
         return Response(
             {"message": "Profile updated successfully."}, status=status.HTTP_200_OK
@@ -798,6 +798,7 @@ class Enable2FAView(generics.GenericAPIView):
     description="Generates a one-time password (OTP) for the user, which is sent via the selected method (email or SMS).",
 )
 class GenerateOTPView(generics.GenericAPIView):
+    throttle_scope = "otp"
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = GenerateOTPSerializer
 
@@ -843,6 +844,7 @@ class GenerateOTPView(generics.GenericAPIView):
     description="Verifies the one-time password (OTP) entered by the user.",
 )
 class VerifyOTPView(generics.GenericAPIView):
+    throttle_scope = "otp"
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = VerifyOTPSerializer
 
@@ -853,23 +855,20 @@ class VerifyOTPView(generics.GenericAPIView):
         user = request.user
         entered_otp = serializer.validated_data["otp"]
 
-        # Retrieve OTP from Redis
-        stored_otp = get_otp_for_user(user.id)
-        if not stored_otp:
+        # Compare with the OTP in Redis; a match deletes it, too many wrong
+        # attempts drop it
+        result = verify_otp_for_user(user.id, entered_otp)
+        if result == LOCKED:
             return Response(
-                {"error": "Invalid or expired OTP."},
+                {"error": "Too many invalid attempts. Request a new OTP."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-
-        if entered_otp != stored_otp:
+        if result != VERIFIED:
             return Response(
                 {"error": "Invalid or expired OTP."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # If OTP is valid, delete it from Redis
-        delete_otp_for_user(user.id)
-
         return Response(
             {"message": "OTP verified successfully."},
             status=status.HTTP_200_OK,
@@ -922,21 +921,19 @@ class ListSessionsView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        # Retrieve all SessionInfo instances linked to the authenticated user
-        session_infos = SessionInfo.objects.filter(user=request.user)
-
-        session_data = []
-        for session_info in session_infos:
-            session = session_info.session  # Access the related Session object
-            session_data.append(
-                {
-                    "session_key": session.session_key,
-                    "device": session_info.device or "Unknown Device",
-                    "location": session_info.location or "Unknown Location",
-                    "created_at": session_info.session.expire_date,  # Adjust as needed
-                    "last_activity": session_info.last_activity,
-                }
-            )
+        # Flushed SessionInfo rows merged with the activity still pending in Redis
+        sessions = get_user_sessions(request.user)
+
+        session_data = [
+            {
+                "session_key": session_key,
+                "device": session["device"] or "Unknown Device",
+                "location": session["location"] or "Unknown Location",
+                "created_at": session["created_at"],
+                "last_activity": session["last_activity"],
+            }
+            for session_key, session in sessions.items()
+        ]
 
         return Response({"sessions": session_data}, status=status.HTTP_200_OK)
 
@@ -950,18 +947,13 @@ class DeleteSessionView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, session_key):
-        try:
-            # Retrieve the SessionInfo linked to the given session_key and user
-            session_info = SessionInfo.objects.get(
-                session__session_key=session_key, user=request.user
-            )
-        except SessionInfo.DoesNotExist:
+        if not has_session(request.user, session_key):
             return Response(
                 {"error": "Session not found."}, status=status.HTTP_404_NOT_FOUND
             )
 
-        # Delete the associated Session object, which will also delete SessionInfo due to CASCADE
-        session_info.session.delete()
+        # Ends the session itself, its SessionInfo and its pending activity
+        forget_sessions(request.user, [session_key])
 
         return Response(
             {"message": "Session deleted successfully."}, status=status.HTTP_200_OK
@@ -971,26 +963,23 @@ class DeleteSessionView(generics.GenericAPIView):
 @extend_schema(
     tags=["Auth - Session"],
     summary="Logout from All Sessions",
-    description="Logs out the user from all active sessions.",
+    description=(
+        "Logs out the user from all active sessions and blacklists all of "
+        "their outstanding refresh tokens."
+    ),
 )
 class LogoutAllSessionsView(GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request):
-        # Retrieve all SessionInfo instances linked to the authenticated user
-        session_infos = SessionInfo.objects.filter(user=request.user)
-
-        # Count the sessions linked to the user
-        session_count = session_infos.count()
-
-        # Delete all associated Session objects
-        session_keys = session_infos.values_list("session__session_key", flat=True)
-        Session.objects.filter(session_key__in=session_keys).delete()
-
-        # Delete the SessionInfo entries
-        session_infos.delete()
+        session_count = forget_all_sessions(request.user)
+        # Refresh tokens would otherwise keep minting access tokens
+        token_count = blacklist_user_tokens(request.user)
 
         return Response(
-            {"message": f"All {session_count} sessions logged out successfully."},
+            {
+                "message": f"All {session_count} sessions logged out successfully.",
+                "blacklisted_tokens": token_count,
+            },
             status=status.HTTP_200_OK,
         )
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.15 on 2026-10-18 00:34
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+from RadinGalleryAPI.search import update_search_vector
+
+
+def populate_search_vector(apps, schema_editor):
+    Brand = apps.get_model("brands", "Brand")
+    update_search_vector(
+        Brand.objects.using(schema_editor.connection.alias),
+        [("name", "A"), ("description", "B")],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("brands", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="brand",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="brand",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="brands_bran_search__a96f74_gin"
+            ),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
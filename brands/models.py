@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import FileExtensionValidator
 from django.db import models
 from django.urls import reverse
@@ -41,11 +43,16 @@ class Brand(models.Model):
         verbose_name=_("Date Brand Updated"),
         help_text=_("Format: Y-m-d H:M:S"),
     )
+    # Maintained from name (weight A) and description (weight B), see brands.signals
+    search_vector = SearchVectorField(null=True, editable=False)
 
     class Meta:
         verbose_name = _("Brand")
         verbose_name_plural = _("Brands")
         ordering = ["name"]
+        indexes = [
+            GinIndex(fields=["search_vector"]),
+        ]
 
     def __str__(self):
         return self.name
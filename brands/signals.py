@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save
+
+from RadinGalleryAPI.search import update_search_vector
+
+from .models import Brand
+
+# Fields indexed in Brand.search_vector, with their weights
+BRAND_SEARCH_FIELDS = [("name", "A"), ("description", "B")]
+
+
+def update_brand_search_vector(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {"name", "description"} & set(update_fields):
+        return
+    update_search_vector(Brand.objects.filter(pk=instance.pk), BRAND_SEARCH_FIELDS)
+
+
+post_save.connect(update_brand_search_vector, sender=Brand)
@@ -1,4 +1,5 @@
 import pytest
+from django.db import connection
 from django.urls import reverse
 
 from brands.models import Brand
@@ -18,6 +19,25 @@ class TestPublicBrandEndpoints:
         assert data["results"][0]["name"] in ["Brand A", "Brand B"]
         assert data["results"][1]["name"] in ["Brand A", "Brand B"]
 
+    def test_list_brands_conditional_get(self, api_client):
+        brand = Brand.objects.create(name="Brand A", slug="brand-a")
+        url = reverse("brand-list")
+
+        response = api_client.get(url)
+        assert response.status_code == 200
+        etag = response["ETag"]
+        assert "Last-Modified" not in response
+
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+        brand.description = "Updated"
+        brand.save()
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
     def test_retrieve_brand(self, api_client):
         brand = Brand.objects.create(name="Brand C", slug="brand-c")
         url = reverse("brand-detail", args=[brand.id])
@@ -78,6 +98,20 @@ class TestPublicBrandEndpoints:
         assert len(data["results"]) == 1
         assert data["results"][0]["description"] == "Great quality"
 
+    def test_search_brands_ranks_name_matches_first(self, api_client):
+        if connection.vendor != "postgresql":
+            pytest.skip("Full-text search requires PostgreSQL")
+        Brand.objects.create(
+            name="Brand A", slug="brand-a", description="Official camera reseller"
+        )
+        Brand.objects.create(name="Camera House", slug="camera-house")
+
+        url = reverse("brand-list")
+        response = api_client.get(url, {"search": "cam"})
+        assert response.status_code == 200
+        names = [brand["name"] for brand in response.json()["results"]]
+        assert names == ["Camera House", "Brand A"]
+
     def test_sort_brands_by_name(self, api_client):
         Brand.objects.create(name="Zeta Brand", slug="zeta-brand")
         Brand.objects.create(name="Alpha Brand", slug="alpha-brand")
@@ -10,6 +10,9 @@ from rest_framework.generics import (
 )
 from rest_framework.permissions import IsAdminUser
 
+from RadinGalleryAPI.mixins import ConditionalGetMixin
+from RadinGalleryAPI.search import FullTextSearchFilter
+
 from .models import Brand
 from .serializers import BrandSerializer
 
@@ -25,15 +28,17 @@ brands_schema_view = SpectacularAPIView.as_view(urlconf="brands.urls")
     operation_id="list_brands_for_users",
     description="Retrieve a list of brands with filtering, searching, and ordering capabilities.",
 )
-class BrandListView(ListAPIView):
+class BrandListView(ConditionalGetMixin, ListAPIView):
     """
     List of brands (for users) with filtering, searching, and ordering
     """
 
+    throttle_scope = "catalog"
     queryset = Brand.objects.all()
     serializer_class = BrandSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, FullTextSearchFilter]
     filterset_fields = ["name", "slug"]
+    search_vector_field = "search_vector"
     search_fields = ["name", "description"]
     ordering_fields = ["name", "created_at"]
     ordering = ["name"]
@@ -49,6 +54,7 @@ class BrandDetailView(RetrieveAPIView):
     Details of a specific brand (for users)
     """
 
+    throttle_scope = "catalog"
     queryset = Brand.objects.all()
     serializer_class = BrandSerializer
 
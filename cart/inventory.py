@@ -0,0 +1,466 @@
+# This file contains the stock reservation logic used at checkout.
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import NotSupportedError, OperationalError, transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.transaction import TransactionManagementError
+from django.utils import timezone
+from redis.exceptions import LockError
+
+from products.models import ProductInventory
+
+REDIS_CLIENT = settings.REDIS_INSTANCE
+
+# Pending stock decrements for fast-stock SKUs, {inventory_id: quantity}
+FAST_STOCK_DELTAS_KEY = "stock:deltas"
+# Held while database stock and pending deltas must be read together
+FAST_STOCK_LOCK_KEY = "stock:lock"
+
+# Checks every counter before touching any of them, so a reservation is
+# all-or-nothing. KEYS are the counters followed by the deltas hash, ARGV the
+# matching quantities followed by the inventory ids. The reserved quantities
+# are added to the pending deltas in the same step, so `stock - pending`
+# always matches the counters.
+# Returns {1} on success, {-1, i, ...} for counters that aren't loaded yet,
+# or {0, i, available, ...} for lines short on stock.
+RESERVE_FAST_STOCK_SCRIPT = REDIS_CLIENT.register_script("""
+    local n = #KEYS - 1
+    local missing = {-1}
+    local short = {0}
+    for i = 1, n do
+        local stock = redis.call('GET', KEYS[i])
+        if not stock then
+            table.insert(missing, i)
+        elseif tonumber(stock) < tonumber(ARGV[i]) then
+            table.insert(short, i)
+            table.insert(short, tonumber(stock))
+        end
+    end
+    if #missing > 1 then
+        return missing
+    end
+    if #short > 1 then
+        return short
+    end
+    for i = 1, n do
+        redis.call('DECRBY', KEYS[i], ARGV[i])
+        redis.call('HINCRBY', KEYS[n + 1], ARGV[n + i], ARGV[i])
+    end
+    return {1}
+    """)
+
+# Undoes a reservation of a rolled back checkout; same KEYS/ARGV layout as
+# the reserve script. Counters that were dropped meanwhile are left missing,
+# they are reloaded from `stock - pending` on next use.
+RELEASE_FAST_STOCK_SCRIPT = REDIS_CLIENT.register_script("""
+    local n = #KEYS - 1
+    for i = 1, n do
+        if redis.call('EXISTS', KEYS[i]) == 1 then
+            redis.call('INCRBY', KEYS[i], ARGV[i])
+        end
+        local pending = redis.call('HINCRBY', KEYS[n + 1], ARGV[n + i], -ARGV[i])
+        if pending == 0 then
+            redis.call('HDEL', KEYS[n + 1], ARGV[n + i])
+        end
+    end
+    return 1
+    """)
+
+# Subtracts the deltas the flush task has committed to the database; ARGV
+# are inventory id and quantity pairs. Reservations made since the flush read
+# the deltas stay pending.
+SETTLE_FAST_STOCK_DELTAS_SCRIPT = REDIS_CLIENT.register_script("""
+    for i = 1, #ARGV, 2 do
+        local pending = redis.call('HINCRBY', KEYS[1], ARGV[i], -ARGV[i + 1])
+        if pending == 0 then
+            redis.call('HDEL', KEYS[1], ARGV[i])
+        end
+    end
+    return 1
+    """)
+
+# Compares a counter with `stock - pending` in one step and, if ARGV[2] is
+# set, repairs it. KEYS are the counter and the deltas hash, ARGV the database
+# stock, the fix flag and the inventory id.
+# Returns {loaded (0/1), counter, pending, expected}.
+RECONCILE_FAST_STOCK_SCRIPT = REDIS_CLIENT.register_script("""
+    local counter = redis.call('GET', KEYS[1])
+    local pending = tonumber(redis.call('HGET', KEYS[2], ARGV[3]) or 0)
+    local expected = tonumber(ARGV[1]) - pending
+    if not counter then
+        return {0, 0, pending, expected}
+    end
+    if ARGV[2] == '1' and tonumber(counter) ~= expected then
+        redis.call('SET', KEYS[1], expected)
+    end
+    return {1, tonumber(counter), pending, expected}
+    """)
+
+
+class StockReservationError(Exception):
+    """
+    Raised when one or more cart lines can't be reserved.
+    `errors` holds one entry per failing line.
+    """
+
+    def __init__(self, errors):
+        super().__init__("Unable to reserve stock")
+        self.errors = errors
+
+
+class FastStockService:
+    """
+    Redis counters for SKUs flagged with `fast_stock`.
+
+    Reservations decrement the counter and record the same amount in a deltas
+    hash in one atomic step; the flush task writes the deltas back to
+    ProductInventory.stock in batches and only then subtracts them from the
+    hash. A counter is therefore always `stock - pending delta`. Reservations
+    of a rolled back checkout are released again by `stock_reservation_atomic`.
+
+    Database stock and pending deltas are only read together under `lock()`,
+    which the flush holds while it moves deltas into the database, so they
+    always come from matching snapshots.
+    """
+
+    @staticmethod
+    def get_counter_key(inventory_id):
+        return f"stock:{inventory_id}"
+
+    @classmethod
+    def lock(cls, blocking_timeout=5):
+        """
+        Lock serializing the flush, counter loads and reconciliation.
+        As a context manager it raises redis.exceptions.LockError when it
+        can't be acquired in time.
+        """
+        return REDIS_CLIENT.lock(
+            FAST_STOCK_LOCK_KEY, timeout=60, blocking_timeout=blocking_timeout
+        )
+
+    @classmethod
+    def load(cls, inventory_ids):
+        """
+        Initialize missing counters from the database stock minus the pending
+        deltas. Existing counters are left untouched.
+        """
+        inventory_ids = list(inventory_ids)
+        with cls.lock():
+            stocks = dict(
+                ProductInventory.objects.filter(id__in=inventory_ids).values_list(
+                    "id", "stock"
+                )
+            )
+            pending = REDIS_CLIENT.hmget(FAST_STOCK_DELTAS_KEY, inventory_ids)
+            pipe = REDIS_CLIENT.pipeline(transaction=False)
+            for inventory_id, delta in zip(inventory_ids, pending):
+                available = stocks.get(inventory_id, 0) - int(delta or 0)
+                pipe.set(cls.get_counter_key(inventory_id), available, nx=True)
+            pipe.execute()
+
+    @classmethod
+    def reserve(cls, lines):
+        """
+        Reserve a {inventory_id: quantity} mapping against the counters,
+        loading missing counters first.
+        Returns {inventory_id: available} for lines short on stock; nothing is
+        reserved unless that mapping is empty.
+        """
+        inventory_ids = list(lines.keys())
+        keys, args = cls._script_params(lines)
+
+        result = RESERVE_FAST_STOCK_SCRIPT(keys=keys, args=args)
+        if result[0] == -1:
+            missing = [inventory_ids[i - 1] for i in result[1:]]
+            cls.load(missing)
+            result = RESERVE_FAST_STOCK_SCRIPT(keys=keys, args=args)
+
+        short = result[1:]
+        return {
+            inventory_ids[short[i] - 1]: short[i + 1] for i in range(0, len(short), 2)
+        }
+
+    @classmethod
+    def _script_params(cls, lines):
+        inventory_ids = list(lines.keys())
+        keys = [cls.get_counter_key(inventory_id) for inventory_id in inventory_ids]
+        args = [lines[inventory_id] for inventory_id in inventory_ids]
+        return keys + [FAST_STOCK_DELTAS_KEY], args + inventory_ids
+
+    @classmethod
+    def release(cls, lines):
+        """
+        Give back the quantities ({inventory_id: quantity}) of a reservation
+        that was never committed.
+        """
+        keys, args = cls._script_params(lines)
+        RELEASE_FAST_STOCK_SCRIPT(keys=keys, args=args)
+
+    @classmethod
+    def get_deltas(cls):
+        """
+        Returns the pending deltas, {inventory_id: quantity}.
+        """
+        deltas = REDIS_CLIENT.hgetall(FAST_STOCK_DELTAS_KEY)
+        return {int(k): int(v) for k, v in deltas.items()}
+
+    @classmethod
+    def settle(cls, deltas):
+        """
+        Subtract deltas ({inventory_id: quantity}) once they are committed to
+        ProductInventory.stock.
+        """
+        args = [value for item in deltas.items() for value in item]
+        SETTLE_FAST_STOCK_DELTAS_SCRIPT(keys=[FAST_STOCK_DELTAS_KEY], args=args)
+
+    @classmethod
+    def reconcile(cls, inventory_id, stock, fix=False):
+        """
+        Compare the counter with `stock - pending` in one step, repairing it
+        if `fix` is set. Must be called under `lock()` with a fresh database
+        stock. Returns (counter or None, pending, expected).
+        """
+        loaded, counter, pending, expected = RECONCILE_FAST_STOCK_SCRIPT(
+            keys=[cls.get_counter_key(inventory_id), FAST_STOCK_DELTAS_KEY],
+            args=[stock, "1" if fix else "0", inventory_id],
+        )
+        return (counter if loaded else None), pending, expected
+
+    @classmethod
+    def get_counters(cls, inventory_ids):
+        """
+        Returns {inventory_id: (counter or None, pending delta)}.
+        """
+        inventory_ids = list(inventory_ids)
+        pipe = REDIS_CLIENT.pipeline(transaction=False)
+        pipe.mget([cls.get_counter_key(inventory_id) for inventory_id in inventory_ids])
+        pipe.hmget(FAST_STOCK_DELTAS_KEY, inventory_ids)
+        counters, pending = pipe.execute()
+        return {
+            inventory_id: (
+                int(counter) if counter is not None else None,
+                int(delta or 0),
+            )
+            for inventory_id, counter, delta in zip(inventory_ids, counters, pending)
+        }
+
+    @classmethod
+    def set_counter(cls, inventory_id, value):
+        REDIS_CLIENT.set(cls.get_counter_key(inventory_id), value)
+
+    @classmethod
+    def reset(cls, inventory_id):
+        """
+        Drop a counter so it is reloaded from the database on next use.
+        """
+        REDIS_CLIENT.delete(cls.get_counter_key(inventory_id))
+
+
+# Fast-stock reservations made in the current stock_reservation_atomic block
+_reservations = ContextVar("fast_stock_reservations", default=None)
+
+
+@contextmanager
+def stock_reservation_atomic(using=None):
+    """
+    transaction.atomic() for checkouts. Redis is not part of the database
+    transaction, so fast-stock reserved by reserve_stock() inside the block
+    is released again if the block raises and its changes are rolled back.
+    Nested blocks hand their reservations on to the enclosing one.
+    """
+    outer = _reservations.get()
+    reservations = []
+    token = _reservations.set(reservations)
+    try:
+        with transaction.atomic(using=using):
+            yield
+    except BaseException:
+        for lines in reservations:
+            FastStockService.release(lines)
+        raise
+    else:
+        if outer is not None:
+            outer.extend(reservations)
+    finally:
+        _reservations.reset(token)
+
+
+def _pick_inventories(rows):
+    """
+    Pick the first row by SKU for each product from
+    (id, product_id, sku, stock, fast_stock) rows.
+    """
+    inventories = {}
+    for row in rows:
+        current = inventories.get(row[1])
+        if current is None or row[2] < current[2]:
+            inventories[row[1]] = row
+    return inventories
+
+
+def _is_lock_unavailable(error):
+    """
+    Whether a select_for_update(nowait=True) error means the rows are locked
+    by another transaction (PostgreSQL lock_not_available), or the backend
+    doesn't support NOWAIT at all.
+    """
+    if isinstance(error, NotSupportedError):
+        return True
+    return getattr(error.__cause__, "pgcode", None) == "55P03"
+
+
+def _retry_errors(quantities):
+    return [
+        {
+            "product_id": product_id,
+            "detail": "Item is being reserved by another order, please retry.",
+        }
+        for product_id in quantities
+    ]
+
+
+def _decrement_stock(lines):
+    """
+    stock = stock - n WHERE stock >= n for a {inventory_id: quantity} mapping,
+    in one statement. Returns the number of rows updated.
+    """
+    condition = Q()
+    whens = []
+    for inventory_id, qty in lines.items():
+        condition |= Q(id=inventory_id, stock__gte=qty)
+        whens.append(When(id=inventory_id, then=Value(qty)))
+
+    # updated_at drives the inventory list validators, see ConditionalGetMixin
+    return ProductInventory.objects.filter(condition).update(
+        stock=F("stock") - Case(*whens, output_field=IntegerField()),
+        updated_at=timezone.now(),
+    )
+
+
+def reserve_stock(quantities):
+    """
+    Reserve stock for a {product_id: quantity} mapping.
+
+    Each product is reserved from its first active ProductInventory entry
+    (by SKU), the same row its price is resolved from. The rows are picked
+    with a plain read and only those are then locked, in id order so
+    concurrent checkouts always take locks in the same order and can't
+    deadlock; all of them are decremented with one UPDATE.
+
+    When FAST_STOCK_ENABLED is set, rows flagged with `fast_stock` are not
+    locked; they are reserved against Redis counters instead, after the
+    database lines succeeded, and written back by the flush task.
+
+    Must be called inside stock_reservation_atomic(), as late as possible so
+    the locks are held briefly. Raises StockReservationError with per-line errors
+    and leaves stock untouched if any line fails.
+    Returns a {product_id: inventory_id} mapping of the reserved rows.
+    """
+    quantities = {int(product_id): int(qty) for product_id, qty in quantities.items()}
+    if not quantities:
+        return {}
+    reservations = _reservations.get()
+    if reservations is None:
+        raise TransactionManagementError(
+            "reserve_stock() must be called inside stock_reservation_atomic()."
+        )
+
+    # Pick the rows without locking, then lock only the ones that are
+    # decremented, so checkouts of other SKUs of a product don't conflict
+    inventories = _pick_inventories(
+        ProductInventory.objects.filter(
+            product_id__in=quantities.keys(), is_active=True
+        ).values_list("id", "product_id", "sku", "stock", "fast_stock")
+    )
+    locked_ids = [
+        row[0]
+        for row in inventories.values()
+        # Hot SKUs aren't locked; Redis serializes their buyers
+        if not (settings.FAST_STOCK_ENABLED and row[4])
+    ]
+
+    if locked_ids:
+        try:
+            stocks = dict(
+                ProductInventory.objects.select_for_update(
+                    nowait=settings.CHECKOUT_STOCK_LOCK_NOWAIT
+                )
+                .filter(id__in=locked_ids, is_active=True)
+                .order_by("id")
+                .values_list("id", "stock")
+            )
+        except (OperationalError, NotSupportedError) as e:
+            if not _is_lock_unavailable(e):
+                raise
+            # Another checkout holds one of the rows; fail fast instead of queueing
+            raise StockReservationError(_retry_errors(quantities))
+        if len(stocks) != len(locked_ids):
+            # A row was deactivated since it was picked
+            raise StockReservationError(_retry_errors(quantities))
+        # Only the locked stock is current
+        for product_id, row in inventories.items():
+            if row[0] in stocks:
+                inventories[product_id] = row[:3] + (stocks[row[0]],) + row[4:]
+
+    errors = []
+    for product_id, qty in quantities.items():
+        inventory = inventories.get(product_id)
+        if inventory is None or (
+            not (settings.FAST_STOCK_ENABLED and inventory[4]) and inventory[3] < qty
+        ):
+            errors.append(
+                {
+                    "product_id": product_id,
+                    "requested": qty,
+                    "available": inventory[3] if inventory else 0,
+                    "detail": "Insufficient stock.",
+                }
+            )
+    if errors:
+        raise StockReservationError(errors)
+
+    db_lines = {}
+    fast_lines = {}
+    for product_id, qty in quantities.items():
+        inventory_id, _, _, _, fast_stock = inventories[product_id]
+        if settings.FAST_STOCK_ENABLED and fast_stock:
+            fast_lines[inventory_id] = qty
+        else:
+            db_lines[inventory_id] = qty
+
+    if db_lines and _decrement_stock(db_lines) != len(db_lines):
+        # Only reachable if the rows weren't actually locked (e.g. no row locking)
+        raise StockReservationError(
+            [
+                {"product_id": product_id, "detail": "Insufficient stock."}
+                for product_id in quantities
+            ]
+        )
+
+    if fast_lines:
+        try:
+            short = FastStockService.reserve(fast_lines)
+        except LockError:
+            # A flush holds the stock lock while a counter needs loading
+            raise StockReservationError(_retry_errors(quantities))
+        if short:
+            product_ids = {
+                row[0]: product_id for product_id, row in inventories.items()
+            }
+            raise StockReservationError(
+                [
+                    {
+                        "product_id": product_ids[inventory_id],
+                        "requested": fast_lines[inventory_id],
+                        "available": available,
+                        "detail": "Insufficient stock.",
+                    }
+                    for inventory_id, available in short.items()
+                ]
+            )
+        reservations.append(fast_lines)
+
+    return {product_id: row[0] for product_id, row in inventories.items()}
@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from cart.inventory import FastStockService
+from cart.tasks import flush_fast_stock_deltas
+from products.models import ProductInventory
+
+
+class Command(BaseCommand):
+    help = "Detect (and optionally repair) drift between fast-stock Redis counters and the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Reset drifted counters to the database stock minus pending deltas",
+        )
+        parser.add_argument(
+            "--flush",
+            action="store_true",
+            help="Flush pending deltas to the database before comparing",
+        )
+
+    def handle(self, *args, **options):
+        if options["flush"]:
+            flushed = flush_fast_stock_deltas()
+            self.stdout.write(f"Flushed {flushed} pending deltas.")
+
+        # Hold the flush lock so the database stock and the pending deltas
+        # come from the same moment; reservations may still run and are
+        # compared atomically per counter.
+        lock = FastStockService.lock()
+        locked = lock.acquire()
+        if not locked:
+            if options["fix"]:
+                raise CommandError(
+                    "Could not acquire the fast-stock lock, a flush is running. "
+                    "Retry later."
+                )
+            self.stdout.write(
+                self.style.WARNING("Fast-stock lock busy, results may be stale.")
+            )
+
+        drifted = 0
+        try:
+            stocks = ProductInventory.objects.filter(fast_stock=True).values_list(
+                "id", "stock"
+            )
+            for inventory_id, stock in stocks:
+                counter, pending, expected = FastStockService.reconcile(
+                    inventory_id, stock, fix=options["fix"]
+                )
+                if counter is None or counter == expected:
+                    # Counters that aren't loaded are initialized on the next reservation
+                    continue
+
+                drifted += 1
+                self.stdout.write(
+                    f"Inventory {inventory_id}: redis={counter} "
+                    f"db={stock} pending={pending} expected={expected}"
+                )
+        finally:
+            if locked:
+                lock.release()
+
+        if drifted and options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {drifted} counters."))
+        elif drifted:
+            self.stdout.write(
+                self.style.WARNING(f"Found {drifted} drifted counters (use --fix).")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("No drift detected."))
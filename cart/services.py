@@ -1,26 +1,72 @@
 # This file contains the synchronization logic with Redis.
 
+from decimal import Decimal
+
 from django.conf import settings
 
+from products.models import ProductInventory
+
 REDIS_CLIENT = settings.REDIS_INSTANCE
-from decimal import Decimal
+
+
+def get_active_prices(product_ids):
+    """
+    Returns a {product_id: price} mapping for the given product ids,
+    resolved from each product's first active ProductInventory entry
+    (by SKU) in a single query.
+    sale_price takes precedence over store_price when it is set.
+    Products without an active inventory are priced at 0.
+    """
+    product_ids = {int(product_id) for product_id in product_ids}
+    prices = dict.fromkeys(product_ids, Decimal("0"))
+    if not product_ids:
+        return prices
+
+    inventories = (
+        ProductInventory.objects.filter(product_id__in=product_ids, is_active=True)
+        .order_by("product_id", "sku")
+        .values_list("product_id", "sale_price", "store_price")
+    )
+
+    resolved = set()
+    for product_id, sale_price, store_price in inventories:
+        # Rows are ordered by SKU, so the first row per product wins
+        if product_id in resolved:
+            continue
+        resolved.add(product_id)
+        prices[product_id] = sale_price if sale_price else store_price
+
+    return prices
 
 
 def get_active_price(product):
     """
     Returns the price for the given product by looking up its
     first active ProductInventory entry.
-    If you want sale_price over store_price, handle that logic here.
     """
-    inventory = product.product_inventory.filter(is_active=True).first()
-    if not inventory:
-        # If there's no inventory, define how you want to handle this scenario
-        return Decimal("0")
+    return get_active_prices([product.id])[product.id]
+
 
-    # Example logic: if there's a sale_price, use it; otherwise use store_price
-    if inventory.sale_price:
-        return inventory.sale_price
-    return inventory.store_price
+# Server-side scripts keep multi-field cart updates atomic and single round trip.
+# ARGV holds flattened (product_id, quantity) pairs; quantities <= 0 remove the item.
+SET_ITEMS_SCRIPT = REDIS_CLIENT.register_script("""
+    for i = 1, #ARGV, 2 do
+        if tonumber(ARGV[i + 1]) <= 0 then
+            redis.call('HDEL', KEYS[1], ARGV[i])
+        else
+            redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+        end
+    end
+    return redis.call('HLEN', KEYS[1])
+    """)
+
+# Reads the whole cart and deletes it in one step, so concurrent checkouts
+# of the same cart can never both see the items.
+POP_ITEMS_SCRIPT = REDIS_CLIENT.register_script("""
+    local items = redis.call('HGETALL', KEYS[1])
+    redis.call('DEL', KEYS[1])
+    return items
+    """)
 
 
 class CartService:
@@ -28,14 +74,30 @@ class CartService:
     def get_redis_cart_key(user_id):
         return f"cart:{user_id}"
 
+    @staticmethod
+    def _flatten(items):
+        args = []
+        for product_id, quantity in items.items():
+            args.extend([product_id, int(quantity)])
+        return args
+
     @classmethod
     def add_item(cls, user_id, product_id, quantity=1):
         key = cls.get_redis_cart_key(user_id)
-        current_qty = REDIS_CLIENT.hget(key, product_id)
-        if current_qty:
-            quantity += int(current_qty)
-        REDIS_CLIENT.hset(key, product_id, quantity)
-        return quantity
+        # HINCRBY is atomic, so concurrent adds from several clients are never lost
+        return REDIS_CLIENT.hincrby(key, product_id, quantity)
+
+    @classmethod
+    def add_items(cls, user_id, items):
+        """
+        Increment several items ({product_id: quantity}) in one round trip.
+        Returns the new quantities keyed by product_id.
+        """
+        key = cls.get_redis_cart_key(user_id)
+        pipe = REDIS_CLIENT.pipeline(transaction=True)
+        for product_id, quantity in items.items():
+            pipe.hincrby(key, product_id, int(quantity))
+        return dict(zip(items.keys(), pipe.execute()))
 
     @classmethod
     def remove_item(cls, user_id, product_id):
@@ -44,17 +106,33 @@ class CartService:
 
     @classmethod
     def set_item_quantity(cls, user_id, product_id, quantity):
+        cls.set_items(user_id, {product_id: quantity})
+
+    @classmethod
+    def set_items(cls, user_id, items):
+        """
+        Set the quantity of several items ({product_id: quantity}) atomically.
+        Items with a quantity <= 0 are removed from the cart.
+        """
+        if not items:
+            return
         key = cls.get_redis_cart_key(user_id)
-        if quantity <= 0:
-            REDIS_CLIENT.hdel(key, product_id)
-        else:
-            REDIS_CLIENT.hset(key, product_id, quantity)
+        SET_ITEMS_SCRIPT(keys=[key], args=cls._flatten(items))
 
     @classmethod
     def get_all_items(cls, user_id):
         key = cls.get_redis_cart_key(user_id)
         return REDIS_CLIENT.hgetall(key)  # {product_id: quantity}
 
+    @classmethod
+    def pop_all_items(cls, user_id):
+        """
+        Atomically read and clear the cart for checkout.
+        """
+        key = cls.get_redis_cart_key(user_id)
+        flat = POP_ITEMS_SCRIPT(keys=[key])
+        return dict(zip(flat[::2], flat[1::2]))  # {product_id: quantity}
+
     @classmethod
     def clear_cart(cls, user_id):
         key = cls.get_redis_cart_key(user_id)
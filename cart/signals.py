@@ -0,0 +1,19 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from products.models import ProductInventory
+
+from .inventory import FastStockService
+
+
+@receiver(post_save, sender=ProductInventory)
+def reset_fast_stock_counter(sender, instance, **kwargs):
+    # Stock edited outside of checkout; reload the counter on next reservation
+    if instance.fast_stock:
+        FastStockService.reset(instance.id)
+
+
+@receiver(post_delete, sender=ProductInventory)
+def delete_fast_stock_counter(sender, instance, **kwargs):
+    if instance.fast_stock:
+        FastStockService.reset(instance.id)
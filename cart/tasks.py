@@ -0,0 +1,56 @@
+import logging
+
+from celery import shared_task
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from products.models import ProductInventory
+
+from .inventory import FastStockService
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def flush_fast_stock_deltas(batch_size=500):
+    """
+    Write pending fast-stock reservations back to ProductInventory.stock.
+    Each batch is a single UPDATE; its deltas are only subtracted in Redis
+    once it has committed, so batches that fail stay pending and are retried
+    on the next run. Returns the number of flushed deltas.
+    """
+    lock = FastStockService.lock(blocking_timeout=0)
+    if not lock.acquire():
+        logger.info("Fast-stock flush skipped, another flush is running.")
+        return 0
+
+    flushed = 0
+    try:
+        deltas = list(FastStockService.get_deltas().items())
+        for start in range(0, len(deltas), batch_size):
+            batch = deltas[start : start + batch_size]
+            try:
+                with transaction.atomic():
+                    ProductInventory.objects.filter(
+                        id__in=[inventory_id for inventory_id, _ in batch]
+                    ).update(
+                        stock=F("stock")
+                        - Case(
+                            *[
+                                When(id=inventory_id, then=Value(qty))
+                                for inventory_id, qty in batch
+                            ],
+                            output_field=IntegerField(),
+                        ),
+                        updated_at=timezone.now(),
+                    )
+            except Exception:
+                logger.exception("Failed to flush fast-stock deltas.")
+                continue
+            FastStockService.settle(dict(batch))
+            flushed += len(batch)
+    finally:
+        lock.release()
+
+    return flushed
@@ -0,0 +1,349 @@
+import threading
+import time
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError, OperationalError, connection, transaction
+from django.db.transaction import TransactionManagementError
+
+from cart.inventory import (
+    FAST_STOCK_DELTAS_KEY,
+    FastStockService,
+    StockReservationError,
+    reserve_stock,
+    stock_reservation_atomic,
+)
+from cart.tasks import flush_fast_stock_deltas
+from products.models import Product, ProductInventory, ProductType
+
+
+@pytest.fixture
+def product_type(db):
+    return ProductType.objects.create(name="Type 1", slug="type-1")
+
+
+def create_product(brand, category, web_id):
+    return Product.objects.create(
+        web_id=web_id,
+        slug=web_id,
+        name=f"Product {web_id}",
+        description="Stock test product",
+        brand=brand,
+        category=category,
+    )
+
+
+def create_inventory(product, product_type, sku, stock, is_active=True):
+    return ProductInventory.objects.create(
+        sku=sku,
+        upc=sku,
+        product_type=product_type,
+        product=product,
+        stock=stock,
+        is_active=is_active,
+        retail_price=Decimal("10.00"),
+        store_price=Decimal("10.00"),
+        weight=Decimal("1.0"),
+    )
+
+
+@pytest.mark.django_db
+def test_reserve_stock_decrements_first_active_inventory(
+    brand, category_active, product_type
+):
+    product = create_product(brand, category_active, "stock-1")
+    inactive = create_inventory(product, product_type, "SKU-A", 50, is_active=False)
+    first = create_inventory(product, product_type, "SKU-B", 5)
+    second = create_inventory(product, product_type, "SKU-C", 5)
+
+    with stock_reservation_atomic():
+        reserved = reserve_stock({str(product.id): 3})
+
+    assert reserved == {product.id: first.id}
+    first.refresh_from_db()
+    second.refresh_from_db()
+    inactive.refresh_from_db()
+    assert (first.stock, second.stock, inactive.stock) == (2, 5, 50)
+
+
+@pytest.mark.django_db
+def test_reserve_stock_is_all_or_nothing(brand, category_active, product_type):
+    in_stock = create_product(brand, category_active, "stock-2")
+    low_stock = create_product(brand, category_active, "stock-3")
+    no_inventory = create_product(brand, category_active, "stock-4")
+    in_stock_inventory = create_inventory(in_stock, product_type, "SKU-D", 10)
+    create_inventory(low_stock, product_type, "SKU-E", 1)
+
+    with pytest.raises(StockReservationError) as exc_info:
+        with stock_reservation_atomic():
+            reserve_stock({in_stock.id: 2, low_stock.id: 2, no_inventory.id: 1})
+
+    failed = {
+        error["product_id"]: error["available"] for error in exc_info.value.errors
+    }
+    assert failed == {low_stock.id: 1, no_inventory.id: 0}
+    in_stock_inventory.refresh_from_db()
+    assert in_stock_inventory.stock == 10
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reserve_stock_never_oversells_hot_sku(brand, category_active, product_type):
+    if connection.vendor != "postgresql":
+        pytest.skip("Row-level locking requires PostgreSQL")
+
+    product = create_product(brand, category_active, "stock-hot")
+    inventory = create_inventory(product, product_type, "SKU-HOT", 5)
+
+    results = []
+
+    def buy():
+        try:
+            for _ in range(200):
+                try:
+                    with stock_reservation_atomic():
+                        reserve_stock({product.id: 1})
+                    results.append("ok")
+                    return
+                except StockReservationError as e:
+                    if "requested" in e.errors[0]:
+                        results.append("sold_out")
+                        return
+                    # Row is locked by another buyer, retry shortly
+                    time.sleep(0.005)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=buy) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    inventory.refresh_from_db()
+    assert results.count("ok") == 5
+    assert results.count("sold_out") == 15
+    assert inventory.stock == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reserve_stock_locks_only_the_reserved_row(
+    brand, category_active, product_type
+):
+    if connection.vendor != "postgresql":
+        pytest.skip("Row-level locking requires PostgreSQL")
+
+    product = create_product(brand, category_active, "stock-lock")
+    first = create_inventory(product, product_type, "SKU-L1", 5)
+    second = create_inventory(product, product_type, "SKU-L2", 5)
+
+    def hold_lock(inventory, locked, done):
+        try:
+            with transaction.atomic():
+                ProductInventory.objects.select_for_update().get(pk=inventory.pk)
+                locked.set()
+                done.wait(5)
+        finally:
+            connection.close()
+
+    def reserve_while_locked(inventory):
+        locked, done = threading.Event(), threading.Event()
+        thread = threading.Thread(target=hold_lock, args=(inventory, locked, done))
+        thread.start()
+        locked.wait(5)
+        try:
+            with stock_reservation_atomic():
+                return reserve_stock({product.id: 1})
+        finally:
+            done.set()
+            thread.join()
+
+    # Another SKU of the product being locked doesn't block the checkout
+    assert reserve_while_locked(second) == {product.id: first.id}
+
+    with pytest.raises(StockReservationError) as exc_info:
+        reserve_while_locked(first)
+    assert "please retry" in exc_info.value.errors[0]["detail"]
+
+    first.refresh_from_db()
+    assert first.stock == 4
+
+
+@pytest.mark.django_db
+def test_reserve_stock_reraises_other_database_errors(
+    brand, category_active, product_type, mocker
+):
+    product = create_product(brand, category_active, "stock-error")
+    create_inventory(product, product_type, "SKU-ERR", 5)
+    mocker.patch.object(
+        ProductInventory.objects,
+        "select_for_update",
+        side_effect=OperationalError("connection lost"),
+    )
+
+    with pytest.raises(OperationalError):
+        with stock_reservation_atomic():
+            reserve_stock({product.id: 1})
+
+
+# ---------------------------------
+# Fast stock (Redis counters)
+# ---------------------------------
+@pytest.fixture
+def fast_inventory(settings, brand, category_active, product_type):
+    settings.FAST_STOCK_ENABLED = True
+    settings.REDIS_INSTANCE.delete(FAST_STOCK_DELTAS_KEY)
+    product = create_product(brand, category_active, "stock-fast")
+    inventory = create_inventory(product, product_type, "SKU-FAST", 5)
+    inventory.fast_stock = True
+    inventory.save()
+    yield inventory
+    FastStockService.reset(inventory.id)
+    settings.REDIS_INSTANCE.delete(FAST_STOCK_DELTAS_KEY)
+
+
+@pytest.mark.django_db
+def test_fast_stock_reserves_in_redis_and_flushes(fast_inventory):
+    product_id = fast_inventory.product_id
+
+    with stock_reservation_atomic():
+        reserve_stock({product_id: 2})
+
+    # The database is only updated by the flush task
+    fast_inventory.refresh_from_db()
+    assert fast_inventory.stock == 5
+    assert FastStockService.get_counters([fast_inventory.id]) == {
+        fast_inventory.id: (3, 2)
+    }
+
+    with pytest.raises(StockReservationError) as exc_info:
+        with stock_reservation_atomic():
+            reserve_stock({product_id: 4})
+    assert exc_info.value.errors[0]["available"] == 3
+
+    updated_at = fast_inventory.updated_at
+    assert flush_fast_stock_deltas() == 1
+    fast_inventory.refresh_from_db()
+    assert fast_inventory.stock == 3
+    assert fast_inventory.updated_at > updated_at
+    assert FastStockService.get_counters([fast_inventory.id]) == {
+        fast_inventory.id: (3, 0)
+    }
+
+
+@pytest.mark.django_db
+def test_reconcile_fast_stock_repairs_drift(fast_inventory):
+    FastStockService.set_counter(fast_inventory.id, 42)
+
+    out = StringIO()
+    call_command("reconcile_fast_stock", stdout=out)
+    assert "Found 1 drifted counters" in out.getvalue()
+    assert (
+        FastStockService.get_counters([fast_inventory.id])[fast_inventory.id][0] == 42
+    )
+
+    call_command("reconcile_fast_stock", "--fix", stdout=StringIO())
+    assert FastStockService.get_counters([fast_inventory.id]) == {
+        fast_inventory.id: (5, 0)
+    }
+
+
+@pytest.mark.django_db
+def test_fast_stock_is_released_on_rollback(fast_inventory):
+    product_id = fast_inventory.product_id
+
+    with pytest.raises(RuntimeError):
+        with stock_reservation_atomic():
+            reserve_stock({product_id: 2})
+            # The reservation is pending right away, so reconcile can see it
+            assert FastStockService.get_counters([fast_inventory.id]) == {
+                fast_inventory.id: (3, 2)
+            }
+            raise RuntimeError("order failed")
+
+    assert FastStockService.get_counters([fast_inventory.id]) == {
+        fast_inventory.id: (5, 0)
+    }
+    assert flush_fast_stock_deltas() == 0
+
+
+@pytest.mark.django_db
+def test_fast_stock_release_after_flush_restores_stock(fast_inventory):
+    product_id = fast_inventory.product_id
+
+    with pytest.raises(RuntimeError):
+        with stock_reservation_atomic():
+            reserve_stock({product_id: 2})
+            # A flush in another worker settles the reservation before the
+            # rollback ...
+            FastStockService.settle({fast_inventory.id: 2})
+            raise RuntimeError("order failed")
+    # ... once its own transaction wrote it to the database
+    ProductInventory.objects.filter(pk=fast_inventory.pk).update(stock=3)
+
+    # The release queued the opposite delta, which the next flush writes back
+    assert flush_fast_stock_deltas() == 1
+    fast_inventory.refresh_from_db()
+    assert fast_inventory.stock == 5
+    assert FastStockService.get_counters([fast_inventory.id]) == {
+        fast_inventory.id: (5, 0)
+    }
+
+
+@pytest.mark.django_db
+def test_failed_flush_keeps_deltas_pending(fast_inventory, mocker):
+    with stock_reservation_atomic():
+        reserve_stock({fast_inventory.product_id: 2})
+
+    mocker.patch.object(
+        ProductInventory.objects, "filter", side_effect=DatabaseError("down")
+    )
+    assert flush_fast_stock_deltas() == 0
+    mocker.stopall()
+    assert FastStockService.get_deltas() == {fast_inventory.id: 2}
+
+    assert flush_fast_stock_deltas() == 1
+    fast_inventory.refresh_from_db()
+    assert fast_inventory.stock == 3
+    assert FastStockService.get_deltas() == {}
+
+
+@pytest.mark.django_db
+def test_flush_and_reconcile_fix_wait_for_the_stock_lock(fast_inventory, mocker):
+    with stock_reservation_atomic():
+        reserve_stock({fast_inventory.product_id: 2})
+
+    lock = FastStockService.lock()
+    assert lock.acquire()
+    try:
+        assert flush_fast_stock_deltas() == 0
+        mocker.patch.object(
+            FastStockService, "lock", return_value=FastStockService.lock(0)
+        )
+        with pytest.raises(CommandError):
+            call_command("reconcile_fast_stock", "--fix", stdout=StringIO())
+    finally:
+        lock.release()
+
+    assert FastStockService.get_deltas() == {fast_inventory.id: 2}
+
+
+@pytest.mark.django_db
+def test_reconcile_fast_stock_counts_uncommitted_reservations(fast_inventory):
+    with stock_reservation_atomic():
+        reserve_stock({fast_inventory.product_id: 2})
+
+        out = StringIO()
+        call_command("reconcile_fast_stock", "--fix", stdout=out)
+        assert "No drift detected." in out.getvalue()
+        assert FastStockService.get_counters([fast_inventory.id]) == {
+            fast_inventory.id: (3, 2)
+        }
+
+
+@pytest.mark.django_db
+def test_reserve_stock_requires_reservation_block(fast_inventory):
+    with pytest.raises(TransactionManagementError):
+        reserve_stock({fast_inventory.product_id: 1})
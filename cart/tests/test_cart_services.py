@@ -1,7 +1,10 @@
+from decimal import Decimal
+
 import pytest
 from django.contrib.auth import get_user_model
 
-from cart.services import CartService
+from cart.services import CartService, get_active_prices
+from products.models import Product, ProductInventory, ProductType
 
 User = get_user_model()
 
@@ -55,3 +58,95 @@ def test_clear_cart_in_redis(settings):
     CartService.clear_cart(user.id)
     items = CartService.get_all_items(user.id)
     assert items == {}
+
+
+@pytest.mark.django_db
+def test_get_active_prices_single_query(
+    django_assert_num_queries, brand, category_active
+):
+    product_type = ProductType.objects.create(name="Type 1", slug="type-1")
+    on_sale, regular, inactive, no_inventory = [
+        Product.objects.create(
+            web_id=f"price-{i}",
+            slug=f"price-{i}",
+            name=f"Price {i}",
+            description="Price test product",
+            brand=brand,
+            category=category_active,
+        )
+        for i in range(4)
+    ]
+    inventories = [
+        (on_sale, "SKU-A1", True, Decimal("20.00"), Decimal("15.00")),
+        (on_sale, "SKU-A2", True, Decimal("99.00"), None),
+        (regular, "SKU-B1", False, Decimal("1.00"), None),
+        (regular, "SKU-B2", True, Decimal("30.00"), None),
+        (inactive, "SKU-C1", False, Decimal("40.00"), Decimal("35.00")),
+    ]
+    for product, sku, is_active, store_price, sale_price in inventories:
+        ProductInventory.objects.create(
+            sku=sku,
+            upc=sku,
+            product_type=product_type,
+            product=product,
+            stock=10,
+            is_active=is_active,
+            retail_price=store_price,
+            store_price=store_price,
+            sale_price=sale_price,
+            weight=Decimal("1.0"),
+        )
+
+    product_ids = [str(p.id) for p in (on_sale, regular, inactive, no_inventory)]
+    with django_assert_num_queries(1):
+        prices = get_active_prices(product_ids)
+
+    assert prices == {
+        on_sale.id: Decimal("15.00"),
+        regular.id: Decimal("30.00"),
+        inactive.id: Decimal("0"),
+        no_inventory.id: Decimal("0"),
+    }
+
+
+@pytest.mark.django_db
+def test_get_active_prices_empty(django_assert_num_queries):
+    with django_assert_num_queries(0):
+        assert get_active_prices([]) == {}
+
+
+@pytest.mark.django_db
+def test_add_item_increments_atomically():
+    user = User.objects.create_user(
+        username="redis_user5", email="redis_user5@example.com", password="testpass"
+    )
+    CartService.clear_cart(user.id)
+    CartService.add_item(user.id, product_id=3, quantity=2)
+    assert CartService.add_item(user.id, product_id=3, quantity=4) == 6
+    assert CartService.get_all_items(user.id) == {"3": "6"}
+
+
+@pytest.mark.django_db
+def test_bulk_add_and_set_items():
+    user = User.objects.create_user(
+        username="redis_user6", email="redis_user6@example.com", password="testpass"
+    )
+    CartService.clear_cart(user.id)
+    quantities = CartService.add_items(user.id, {1: 2, 2: 3})
+    assert quantities == {1: 2, 2: 3}
+
+    CartService.set_items(user.id, {1: 5, 2: 0, 4: 1})
+    assert CartService.get_all_items(user.id) == {"1": "5", "4": "1"}
+
+
+@pytest.mark.django_db
+def test_pop_all_items_clears_cart():
+    user = User.objects.create_user(
+        username="redis_user7", email="redis_user7@example.com", password="testpass"
+    )
+    CartService.clear_cart(user.id)
+    CartService.add_items(user.id, {8: 1, 9: 2})
+
+    assert CartService.pop_all_items(user.id) == {"8": "1", "9": "2"}
+    assert CartService.get_all_items(user.id) == {}
+    assert CartService.pop_all_items(user.id) == {}
@@ -2,6 +2,8 @@ from decimal import Decimal
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import AccessToken
@@ -10,7 +12,7 @@ from brands.models import Brand
 from cart.models import Cart, CartItem, CartStatus
 from cart.services import CartService
 from categories.models import Category
-from products.models import Product
+from products.models import Product, ProductInventory, ProductType
 
 User = get_user_model()
 
@@ -63,6 +65,21 @@ class TestCartEndpoints:
             category=self.category,
         )
 
+    def create_inventory(self, product, sku, price, stock=10):
+        product_type, _ = ProductType.objects.get_or_create(
+            name="Type 1", slug="type-1"
+        )
+        return ProductInventory.objects.create(
+            sku=sku,
+            upc=sku,
+            product_type=product_type,
+            product=product,
+            stock=stock,
+            retail_price=price,
+            store_price=price,
+            weight=Decimal("1.0"),
+        )
+
     # --------------------
     # User Endpoints
     # --------------------
@@ -113,6 +130,7 @@ class TestCartEndpoints:
         assert cart_data[str(self.product1.id)] == "5"
 
     def test_cart_checkout(self):
+        inventory = self.create_inventory(self.product1, "SKU-1", Decimal("0.00"))
         CartService.add_item(self.user.id, self.product1.id, 2)
 
         url = reverse("cart-checkout")
@@ -123,6 +141,76 @@ class TestCartEndpoints:
         assert cart.status == CartStatus.COMPLETED
         assert cart.total_amount == Decimal("0.00")
 
+        inventory.refresh_from_db()
+        assert inventory.stock == 8
+
+    def test_cart_checkout_insufficient_stock(self):
+        inventory = self.create_inventory(
+            self.product1, "SKU-1", Decimal("10.00"), stock=1
+        )
+        self.create_inventory(self.product2, "SKU-2", Decimal("5.00"))
+        CartService.add_items(self.user.id, {self.product1.id: 2, self.product2.id: 1})
+
+        url = reverse("cart-checkout")
+        response = self.client.post(url, {}, format="json")
+        assert response.status_code == 409
+
+        errors = response.json()["errors"]
+        assert errors == [
+            {
+                "product_id": self.product1.id,
+                "requested": 2,
+                "available": 1,
+                "detail": "Insufficient stock.",
+            }
+        ]
+
+        # Nothing is reserved or persisted and the cart is kept
+        inventory.refresh_from_db()
+        assert inventory.stock == 1
+        assert ProductInventory.objects.get(sku="SKU-2").stock == 10
+        assert not Cart.objects.filter(user=self.user).exists()
+        assert len(CartService.get_all_items(self.user.id)) == 2
+
+    def test_cart_checkout_bulk_creates_items(self):
+        self.create_inventory(self.product1, "SKU-1", Decimal("10.00"))
+        self.create_inventory(self.product2, "SKU-2", Decimal("2.50"))
+        CartService.add_items(self.user.id, {self.product1.id: 2, self.product2.id: 4})
+
+        url = reverse("cart-checkout")
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(url, {}, format="json")
+        assert response.status_code == 200
+
+        # One stock UPDATE, one INSERT for the finished cart and one for its items
+        writes = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if q["sql"].startswith(("INSERT", "UPDATE"))
+        ]
+        assert len(writes) == 3
+
+        cart = Cart.objects.get(user=self.user)
+        assert cart.status == CartStatus.COMPLETED
+        assert cart.total_amount == Decimal("30.00")
+        assert cart.items.count() == 2
+
+    def test_cart_checkout_restores_items_on_failure(self, mocker):
+        self.create_inventory(self.product1, "SKU-1", Decimal("10.00"))
+        CartService.add_item(self.user.id, self.product1.id, 2)
+        mocker.patch(
+            "cart.views.CartItem.objects.bulk_create",
+            side_effect=RuntimeError("db down"),
+        )
+
+        url = reverse("cart-checkout")
+        with pytest.raises(RuntimeError):
+            self.client.post(url, {}, format="json")
+
+        cart_data = CartService.get_all_items(self.user.id)
+        assert cart_data == {str(self.product1.id): "2"}
+        assert not Cart.objects.filter(user=self.user).exists()
+
     def test_cart_checkout_empty(self):
         url = reverse("cart-checkout")
         response = self.client.post(url, {}, format="json")
@@ -1,6 +1,5 @@
 from decimal import Decimal
 
-from django.db import transaction
 from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
 from drf_spectacular.views import SpectacularAPIView
 from rest_framework import status
@@ -8,12 +7,17 @@ from rest_framework.generics import GenericAPIView, ListAPIView, RetrieveAPIView
 from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 
+from cart.inventory import (
+    StockReservationError,
+    reserve_stock,
+    stock_reservation_atomic,
+)
 from cart.models import Cart, CartItem, CartStatus
 from cart.serializers import CartSerializer
 from cart.services import CartService
 from products.models import Product
 
-from .services import get_active_price
+from .services import get_active_prices
 
 # ---------------------------- Create schema for swagger ----------------------------
 cart_schema_view = SpectacularAPIView.as_view(urlconf="cart.urls")
@@ -36,12 +40,13 @@ class CartListView(GenericAPIView):
     def get(self, request):
         redis_items = CartService.get_all_items(request.user.id)
         products = Product.objects.filter(id__in=redis_items.keys())
+        prices = get_active_prices(redis_items.keys())
 
         items_data = []
         total_amount = Decimal("0")
         for p in products:
             qty = int(redis_items[str(p.id)])
-            price = get_active_price(p)
+            price = prices[p.id]
             items_data.append(
                 {
                     "product_id": p.id,
@@ -211,35 +216,62 @@ class CartUpdateItemView(GenericAPIView):
         tags=["Cart - Checkout"],
         summary="Checkout the cart",
         description="Complete the checkout process for the current user's cart.",
-        responses={200: CartSerializer, 400: {"detail": "Cart is empty"}},
+        responses={
+            200: CartSerializer,
+            400: {"detail": "Cart is empty"},
+            409: {"detail": "Some items could not be reserved"},
+        },
     )
 )
 class CartCheckoutView(GenericAPIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        redis_items = CartService.get_all_items(request.user.id)
+        # Read and clear the cart in one step so a concurrent checkout can't reuse it
+        redis_items = CartService.pop_all_items(request.user.id)
         if not redis_items:
             return Response(
                 {"detail": "Cart is empty"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        products = Product.objects.filter(id__in=redis_items.keys())
+        try:
+            products = Product.objects.filter(id__in=redis_items.keys())
+            prices = get_active_prices(redis_items.keys())
 
-        with transaction.atomic():
-            cart = Cart.objects.create(user=request.user, status=CartStatus.CHECKOUT)
+            # Build the items and the total in a single pass before touching the DB
+            items = []
+            quantities = {}
             total_amount = Decimal("0")
             for p in products:
                 qty = int(redis_items[str(p.id)])
-                price = get_active_price(p)
-                CartItem.objects.create(cart=cart, product=p, quantity=qty, price=price)
+                price = prices[p.id]
+                items.append(CartItem(product=p, quantity=qty, price=price))
+                quantities[p.id] = qty
                 total_amount += price * qty
 
-            cart.total_amount = total_amount
-            cart.status = CartStatus.COMPLETED
-            cart.save()
+            # Also gives back fast-stock reserved in Redis if this rolls back
+            with stock_reservation_atomic():
+                cart = Cart.objects.create(
+                    user=request.user,
+                    status=CartStatus.COMPLETED,
+                    total_amount=total_amount,
+                )
+                for item in items:
+                    item.cart = cart
+                CartItem.objects.bulk_create(items)
+                # Reserve last so inventory locks are held only until commit
+                reserve_stock(quantities)
+        except StockReservationError as e:
+            CartService.add_items(request.user.id, redis_items)
+            return Response(
+                {"detail": "Some items could not be reserved", "errors": e.errors},
+                status=status.HTTP_409_CONFLICT,
+            )
+        except Exception:
+            # Put the items back so the user doesn't lose their cart
+            CartService.add_items(request.user.id, redis_items)
+            raise
 
-        CartService.clear_cart(request.user.id)
         return Response(CartSerializer(cart).data, status=status.HTTP_200_OK)
 
 
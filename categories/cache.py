@@ -0,0 +1,114 @@
+# This file contains the rendered category tree cache (in-process LRU + Redis).
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.http import quote_etag
+from rest_framework.renderers import JSONRenderer
+
+from RadinGalleryAPI.local_cache import LocalLRUCache
+from RadinGalleryAPI.mixins import ConditionalGetMixin
+
+TREE_VERSION_KEY = "categories:tree:version"
+TREE_KEY_PREFIX = "categories:tree"
+
+local_cache = LocalLRUCache(settings.CATEGORY_TREE_LOCAL_CACHE_SIZE)
+
+
+def get_tree_version():
+    version = cache.get(TREE_VERSION_KEY)
+    if version is None:
+        # Time based, so entries of an evicted version are never reused
+        cache.add(TREE_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(TREE_VERSION_KEY)
+    return version
+
+
+def bump_tree_version():
+    """
+    Invalidate every rendered tree. Inside a transaction the bump waits for
+    the commit, so a reader can't cache the old tree under the new version.
+    """
+
+    def bump():
+        try:
+            cache.incr(TREE_VERSION_KEY)
+        except ValueError:
+            cache.set(TREE_VERSION_KEY, time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def get_rendered_tree(key):
+    content = local_cache.get(key)
+    if content is None:
+        content = cache.get(key)
+        if content is not None:
+            local_cache.set(key, content)
+    return content
+
+
+def set_rendered_tree(key, content):
+    local_cache.set(key, content)
+    cache.set(key, content, timeout=settings.CATEGORY_TREE_CACHE_TIMEOUT)
+
+
+class RenderedTreeCacheMixin(ConditionalGetMixin):
+    """
+    Serves list responses of the category tree as pre-rendered JSON bytes,
+    keyed by the tree version, host and query string. The ETag is derived
+    from the same key, so hits and 304s don't touch the database at all.
+    """
+
+    def get_tree_cache_key(self, request):
+        if not hasattr(self, "_tree_cache_key"):
+            raw = "|".join(
+                [
+                    request.get_host(),
+                    request.get_full_path(),
+                    str(get_tree_version()),
+                ]
+            )
+            digest = hashlib.md5(raw.encode()).hexdigest()
+            self._tree_cache_key = f"{TREE_KEY_PREFIX}:{digest}"
+        return self._tree_cache_key
+
+    def get_etag(self, request):
+        return quote_etag(self.get_tree_cache_key(request).split(":")[-1])
+
+    def list(self, request, *args, **kwargs):
+        key = self.get_tree_cache_key(request)
+        content = get_rendered_tree(key)
+        cache_status = "HIT"
+        if content is None:
+            cache_status = "MISS"
+            response = super().list(request, *args, **kwargs)
+            content = JSONRenderer().render(response.data)
+            set_rendered_tree(key, content)
+
+        response = HttpResponse(content, content_type="application/json")
+        response["X-Cache"] = cache_status
+        return response
+
+
+def warm_category_tree(host, paths):
+    """
+    Render the given category list paths into the cache (e.g. at startup).
+    Returns the number of responses rendered.
+    """
+    from django.test import RequestFactory
+
+    from .views import CategoryListView
+
+    view = CategoryListView.as_view()
+    factory = RequestFactory(HTTP_HOST=host)
+    warmed = 0
+    for path in paths:
+        response = view(factory.get(path))
+        if response.status_code == 200 and response["X-Cache"] == "MISS":
+            warmed += 1
+    return warmed
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.urls import reverse
+
+from categories.cache import warm_category_tree
+
+
+class Command(BaseCommand):
+    help = "Pre-render the cached category tree responses"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--host",
+            required=True,
+            help="Host the API is served on, as sent in the Host header. It "
+            "appears in pagination links and so is part of the cache key; "
+            "trees rendered for another host are never served.",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Category list path to render, may be repeated "
+            "(default: the first page of the category list)",
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or [reverse("category-list")]
+        warmed = warm_category_tree(options["host"], paths)
+        self.stdout.write(self.style.SUCCESS(f"Rendered {warmed} category trees"))
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.15 on 2026-10-18 00:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("categories", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="category",
+            index=models.Index(
+                fields=["tree_id", "lft", "rght"], name="categories_tree_range_idx"
+            ),
+        ),
+    ]
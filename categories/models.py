@@ -50,6 +50,10 @@ class Category(MPTTModel):
         indexes = [
             models.Index(fields=["name"]),
             models.Index(fields=["slug"]),
+            # Subtree lookups: tree_id = x AND lft BETWEEN lft AND rght
+            models.Index(
+                fields=["tree_id", "lft", "rght"], name="categories_tree_range_idx"
+            ),
         ]
         verbose_name = _("Category")
         verbose_name_plural = _("Categories")
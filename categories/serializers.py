@@ -1,22 +1,68 @@
+from django.db.models import Q
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 from .models import Category
 
 
-class RecursiveField(serializers.Serializer):
-    def to_representation(self, value):
-        serializer = self.parent.parent.__class__(value, context=self.context)
-        return serializer.data
+def get_children_map(nodes, queryset=None):
+    """
+    Loads every descendant of `nodes` in one query ordered by (tree_id, lft)
+    and groups them by parent: {parent_id: [child, ...]}, siblings in tree
+    order. Descendants hidden by `queryset` are left out with their subtree.
+    """
+    if queryset is None:
+        queryset = Category.objects.all()
+
+    # Drop nodes nested in a range already kept, their descendants are
+    # covered by it; whole trees are matched by tree_id alone
+    tree_ids = []
+    ranges = Q()
+    kept = None
+    for node in sorted(nodes, key=lambda node: (node.tree_id, node.lft)):
+        if node.rght - node.lft <= 1:
+            continue
+        if kept and kept.tree_id == node.tree_id and node.rght < kept.rght:
+            continue
+        kept = node
+        if node.lft == 1:
+            tree_ids.append(node.tree_id)
+        else:
+            ranges |= Q(tree_id=node.tree_id, lft__gt=node.lft, rght__lt=node.rght)
+    if tree_ids:
+        ranges |= Q(tree_id__in=tree_ids, lft__gt=1)
+
+    children = {}
+    if ranges:
+        for node in queryset.filter(ranges).order_by("tree_id", "lft"):
+            children.setdefault(node.parent_id, []).append(node)
+    return children
+
+
+class CategoryListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        nodes = list(data.all() if hasattr(data, "all") else data)
+        self.child.children_map = get_children_map(
+            nodes, self.context.get("descendants")
+        )
+        return [self.child.to_representation(node) for node in nodes]
 
 
 class CategorySerializer(serializers.ModelSerializer):
-    children = RecursiveField(many=True, read_only=True)
+    """
+    Category with its nested subtree. The whole subtree of every serialized
+    category is loaded in a single query (see get_children_map); pass a
+    `descendants` queryset in the context to restrict which nodes are shown.
+    """
+
+    children = serializers.SerializerMethodField()
     parent = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.all(), required=False, allow_null=True
     )
 
     class Meta:
         model = Category
+        list_serializer_class = CategoryListSerializer
         fields = [
             "id",
             "name",
@@ -28,3 +74,18 @@ class CategorySerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["id", "children", "created_at", "updated_at"]
+
+    children_map = None
+
+    def to_representation(self, instance):
+        if self.children_map is None:
+            self.children_map = get_children_map(
+                [instance], self.context.get("descendants")
+            )
+        return super().to_representation(instance)
+
+    @extend_schema_field(serializers.ListField(child=serializers.DictField()))
+    def get_children(self, obj):
+        return [
+            self.to_representation(child) for child in self.children_map.get(obj.id, [])
+        ]
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from mptt.signals import node_moved
+
+from .cache import bump_tree_version
+from .models import Category
+
+
+def invalidate_category_tree(sender, **kwargs):
+    bump_tree_version()
+
+
+post_save.connect(invalidate_category_tree, sender=Category)
+post_delete.connect(invalidate_category_tree, sender=Category)
+node_moved.connect(invalidate_category_tree, sender=Category)
@@ -1,6 +1,13 @@
+from io import StringIO
+
 import pytest
+from django.core.management import CommandError, call_command
 from django.urls import reverse
 
+from categories.cache import local_cache
+from categories.models import Category
+from categories.serializers import get_children_map
+
 
 @pytest.mark.django_db
 class TestUserCategoryEndpoints:
@@ -15,6 +22,89 @@ class TestUserCategoryEndpoints:
         assert category_active.id in ids
         assert category_inactive.id not in ids
 
+    def test_category_list_conditional_get(
+        self,
+        api_client,
+        category_active,
+        django_assert_num_queries,
+        django_capture_on_commit_callbacks,
+    ):
+        url = reverse("category-list")
+        response = api_client.get(url)
+        etag = response["ETag"]
+
+        # The ETag comes from the tree version, no query needed
+        with django_assert_num_queries(0):
+            response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        # A new category bumps the tree version, so the ETag changes too
+        with django_capture_on_commit_callbacks(execute=True):
+            Category.objects.create(name="Second", slug="second")
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    def test_category_list_is_served_pre_rendered(
+        self, api_client, category_active, django_assert_num_queries
+    ):
+        url = reverse("category-list")
+        response = api_client.get(url)
+        assert response["X-Cache"] == "MISS"
+
+        with django_assert_num_queries(0):
+            cached = api_client.get(url)
+        assert cached["X-Cache"] == "HIT"
+        assert cached.content == response.content
+
+        # Redis still serves the tree when the in-process LRU is cold
+        local_cache.clear()
+        assert api_client.get(url)["X-Cache"] == "HIT"
+
+    def test_category_list_cache_invalidated_by_tree_changes(
+        self,
+        api_client,
+        authenticated_admin_client,
+        category_active,
+        django_capture_on_commit_callbacks,
+    ):
+        url = reverse("category-list")
+        api_client.get(url)
+
+        # The version is only bumped once the admin change commits
+        admin_url = reverse("admin-category-list-create")
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = authenticated_admin_client.post(
+                admin_url,
+                {"name": "Child", "slug": "child", "parent": category_active.id},
+                format="json",
+            )
+        assert response.status_code == 201
+        assert api_client.get(url)["X-Cache"] == "HIT"
+        for callback in callbacks:
+            callback()
+
+        response = api_client.get(url)
+        assert response["X-Cache"] == "MISS"
+        names = [c["name"] for c in response.json()["results"]]
+        assert "Child" in names
+
+        # Moving a node changes the tree as well
+        child = Category.objects.get(slug="child")
+        with django_capture_on_commit_callbacks(execute=True):
+            child.move_to(None)
+        assert api_client.get(url)["X-Cache"] == "MISS"
+
+    def test_warm_category_tree(self, api_client, category_active):
+        call_command("warm_category_tree", host="testserver", stdout=StringIO())
+
+        response = api_client.get(reverse("category-list"))
+        assert response["X-Cache"] == "HIT"
+
+    def test_warm_category_tree_requires_host(self):
+        # A default host would fill entries requests on the real host never hit
+        with pytest.raises(CommandError):
+            call_command("warm_category_tree", stdout=StringIO())
+
     def test_user_can_get_active_category_detail(self, api_client, category_active):
         url = reverse("category-detail", args=[category_active.id])
         response = api_client.get(url)
@@ -79,3 +169,52 @@ class TestUserCategoryEndpoints:
         results = response.json()["results"]
         assert len(results) == 1
         assert results[0]["id"] == category_active.id
+
+    def test_category_list_nests_subtree_in_one_query(
+        self, api_client, django_assert_num_queries
+    ):
+        root = Category.objects.create(name="Electronics", slug="electronics")
+        phones = Category.objects.create(name="Phones", slug="phones", parent=root)
+        Category.objects.create(name="Android", slug="android", parent=phones)
+        Category.objects.create(name="iPhone", slug="iphone", parent=phones)
+        hidden = Category.objects.create(
+            name="Hidden", slug="hidden", parent=root, is_active=False
+        )
+        Category.objects.create(name="Under Hidden", slug="under-hidden", parent=hidden)
+
+        url = reverse("category-list")
+        # Page count, page, every subtree of the page
+        with django_assert_num_queries(3):
+            response = api_client.get(url, {"name": "Electronics"})
+        assert response.status_code == 200
+
+        (electronics,) = response.json()["results"]
+        assert [c["name"] for c in electronics["children"]] == ["Phones"]
+        assert [c["name"] for c in electronics["children"][0]["children"]] == [
+            "Android",
+            "iPhone",
+        ]
+
+    def test_children_map_merges_nested_ranges(self, django_assert_num_queries):
+        root = Category.objects.create(name="Home", slug="home")
+        kitchen = Category.objects.create(name="Kitchen", slug="kitchen", parent=root)
+        Category.objects.create(name="Pans", slug="pans", parent=kitchen)
+        other = Category.objects.create(name="Garden", slug="garden")
+        tools = Category.objects.create(name="Tools", slug="tools", parent=other)
+        Category.objects.create(name="Shovels", slug="shovels", parent=tools)
+        nodes = list(Category.objects.filter(pk__in=[root.pk, kitchen.pk, tools.pk]))
+
+        with django_assert_num_queries(1) as captured:
+            children = get_children_map(nodes)
+
+        # Kitchen is inside Home, so only Home's tree and Tools' range are read
+        sql = captured.captured_queries[0]["sql"]
+        assert sql.count('"tree_id" IN') == 1
+        assert sql.count('"rght" <') == 1
+        assert {
+            parent: [c.slug for c in nodes] for parent, nodes in children.items()
+        } == {
+            root.pk: ["kitchen"],
+            kitchen.pk: ["pans"],
+            tools.pk: ["shovels"],
+        }
@@ -1,9 +1,11 @@
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.utils import extend_schema
 from drf_spectacular.views import SpectacularAPIView
 from rest_framework import filters, generics, permissions
 
+from .cache import RenderedTreeCacheMixin
 from .models import Category
 from .serializers import CategorySerializer
 
@@ -15,18 +17,16 @@ category_schema_view = SpectacularAPIView.as_view(urlconf="categories.urls")
 # User Endpoints
 # -------------------------
 @extend_schema(tags=["Category - List"])
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(RenderedTreeCacheMixin, generics.ListAPIView):
     """
     Returns a list of all active categories.
     Only active categories are visible to the end user.
+    Responses are cached pre-rendered until the category tree changes.
     """
 
+    throttle_scope = "catalog"
     serializer_class = CategorySerializer
-    queryset = (
-        Category.objects.filter(is_active=True)
-        .select_related("parent")
-        .prefetch_related("children")
-    )
+    queryset = Category.objects.filter(is_active=True)
 
     filter_backends = [
         DjangoFilterBackend,
@@ -38,6 +38,12 @@ class CategoryListView(generics.ListAPIView):
     ordering_fields = ["name", "created_at"]  # Fields available for ordering
     ordering = ["name"]  # Default ordering
 
+    def get_serializer_context(self):
+        # Nested children are limited to active categories as well
+        context = super().get_serializer_context()
+        context["descendants"] = Category.objects.filter(is_active=True)
+        return context
+
 
 @extend_schema(tags=["Category - Detail"])
 class CategoryDetailView(generics.RetrieveAPIView):
@@ -45,6 +51,7 @@ class CategoryDetailView(generics.RetrieveAPIView):
     Returns the details of a single active category by its primary key (pk).
     """
 
+    throttle_scope = "catalog"
     serializer_class = CategorySerializer
 
     def get_queryset(self):
@@ -54,6 +61,11 @@ class CategoryDetailView(generics.RetrieveAPIView):
         queryset = self.get_queryset()
         return get_object_or_404(queryset, pk=self.kwargs.get("pk"))
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["descendants"] = Category.objects.filter(is_active=True)
+        return context
+
 
 # -------------------------
 # Admin Endpoints
@@ -66,7 +78,7 @@ class AdminCategoryListCreateView(generics.ListCreateAPIView):
     """
 
     serializer_class = CategorySerializer
-    queryset = Category.objects.select_related("parent").prefetch_related("children")
+    queryset = Category.objects.all()
 
     permission_classes = [permissions.IsAdminUser]
     filter_backends = [
@@ -80,7 +92,9 @@ class AdminCategoryListCreateView(generics.ListCreateAPIView):
     ordering = ["-created_at"]  # Default ordering
 
     def perform_create(self, serializer):
-        serializer.save()
+        # Tree changes apply atomically; the cache version is bumped on commit
+        with transaction.atomic():
+            serializer.save()
 
 
 @extend_schema(tags=["Admin - Category"])
@@ -102,3 +116,12 @@ class AdminCategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
     search_fields = ["name"]  # Fields available for search
     ordering_fields = ["name", "created_at"]  # Fields available for ordering
     ordering = ["-created_at"]  # Default ordering
+
+    def perform_update(self, serializer):
+        # Tree changes apply atomically; the cache version is bumped on commit
+        with transaction.atomic():
+            serializer.save()
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
@@ -1,10 +1,15 @@
 import pytest
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import AccessToken
 
+from authentication.user_cache import local_users
 from brands.models import Brand
+from categories.cache import local_cache
 from categories.models import Category
 from products.models import Product
 
@@ -64,6 +69,20 @@ def admin_api_client(admin_user, api_client):
     return api_client
 
 
+@pytest.fixture
+def explain_plan(db):
+    """
+    Returns a function giving the query plan of a queryset. Sequential scans
+    are disabled for the test, so even on tiny tables the plan shows whether
+    a matching index exists. Skipped on databases other than PostgreSQL.
+    """
+    if connection.vendor != "postgresql":
+        pytest.skip("Query plan tests need PostgreSQL")
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    return lambda queryset: queryset.explain()
+
+
 @pytest.fixture
 def verify_email_setup(db):
     """Setup user and URL for verify email tests."""
@@ -132,3 +151,18 @@ def configure_rest_framework_settings(settings):
         "DEFAULT_THROTTLE_CLASSES": [],
         "DEFAULT_THROTTLE_RATES": {},
     }
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Keeps cached responses, throttle state and session activity from
+    leaking between tests.
+    """
+    cache.clear()
+    local_cache.clear()
+    local_users.clear()
+    for pattern in ("throttle:*", "auth:sessions:*"):
+        for key in settings.REDIS_INSTANCE.scan_iter(pattern):
+            settings.REDIS_INSTANCE.delete(key)
+    yield
@@ -1,7 +1,10 @@
+from unittest.mock import patch
+
 import pytest
 from django.urls import reverse
 
 from orders.models import Order, OrderItem
+from RadinGalleryAPI.pagination import NewestFirstPagination
 
 
 @pytest.mark.django_db
@@ -21,6 +24,24 @@ class TestOrderEndpoints:
         assert len(response.data["results"]) == 1
         assert response.data["results"][0]["total_amount"] == "100.00"
 
+    def test_list_orders_cursor_pagination(self, authenticated_user_client, user):
+        """Test keyset pagination of the order list with ?cursor=."""
+        url = reverse("order-list")
+        orders = [Order.objects.create(user=user, total_amount=i) for i in range(3)]
+
+        with patch.object(NewestFirstPagination, "page_size", 2):
+            response = authenticated_user_client.get(url, {"cursor": ""})
+            assert response.status_code == 200
+            assert "count" not in response.data
+            ids = [order["id"] for order in response.data["results"]]
+
+            response = authenticated_user_client.get(response.data["next"])
+            assert response.status_code == 200
+            assert response.data["next"] is None
+            ids += [order["id"] for order in response.data["results"]]
+
+        assert ids == [order.id for order in reversed(orders)]
+
     def test_creatd_orders_authenticated_user(self, authenticated_user_client):
         """Test creating an order for an authenticated user."""
         url = reverse("order-list")
@@ -4,6 +4,8 @@ from drf_spectacular.views import SpectacularAPIView
 from rest_framework import generics
 from rest_framework.permissions import IsAdminUser
 
+from RadinGalleryAPI.pagination import NewestFirstPagination
+
 from .models import Order, OrderItem
 from .serializers import OrderItemSerializer, OrderSerializer
 
@@ -19,6 +21,7 @@ orders_schema_view = SpectacularAPIView.as_view(urlconf="orders.urls")
 @extend_schema(tags=["Order - List"])
 class OrderListView(generics.ListCreateAPIView):
     serializer_class = OrderSerializer
+    pagination_class = NewestFirstPagination
 
     def get_queryset(self):
         # Only return orders for the authenticated user
@@ -76,3 +79,4 @@ class AdminOrderListView(generics.ListAPIView):
     serializer_class = OrderSerializer
     queryset = Order.objects.all()
     permission_classes = [IsAdminUser]
+    pagination_class = NewestFirstPagination
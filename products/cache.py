@@ -0,0 +1,146 @@
+# This file contains the versioned response cache for public catalog endpoints.
+
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import quote_etag
+from rest_framework.response import Response
+
+from RadinGalleryAPI.mixins import ConditionalGetMixin
+
+VERSION_KEY_PREFIX = "catalog:version"
+RESPONSE_KEY_PREFIX = "catalog:response"
+STATS_KEY_PREFIX = "catalog:stats"
+
+
+def get_version_key(model):
+    return f"{VERSION_KEY_PREFIX}:{model._meta.label_lower}"
+
+
+def get_versions(models):
+    """
+    Returns the current version of each model in one cache round trip.
+    Missing versions are initialized to a time-based value, so entries
+    cached under an evicted version can never be served again.
+    """
+    keys = [get_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(model):
+    """
+    Invalidate every cached response that depends on the given model.
+    Inside a transaction the bump waits for the commit, so a reader can't
+    cache uncommitted or pre-commit data under the new version.
+    """
+    key = get_version_key(model)
+
+    def bump():
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def normalize_query(query_params):
+    """
+    Sorted, blank-free query string, so equivalent requests share a key.
+    """
+    items = sorted(
+        (key, value)
+        for key in query_params
+        for value in query_params.getlist(key)
+        if value != ""
+    )
+    return urlencode(items)
+
+
+def record_lookup(name, hit):
+    key = f"{STATS_KEY_PREFIX}:{name}:{'hits' if hit else 'misses'}"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def get_stats(name):
+    """
+    Returns {"hits", "misses", "hit_rate"} for a cached view.
+    """
+    hits_key = f"{STATS_KEY_PREFIX}:{name}:hits"
+    misses_key = f"{STATS_KEY_PREFIX}:{name}:misses"
+    values = cache.get_many([hits_key, misses_key])
+    hits = values.get(hits_key, 0)
+    misses = values.get(misses_key, 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else 0.0,
+    }
+
+
+class VersionedCacheMixin:
+    """
+    Caches successful GET responses of public views that are identical for
+    every user. The key is made of the request path, the normalized query
+    string and the version of every model in `cache_models`; saving or
+    deleting any of those models bumps its version (see products.signals).
+    """
+
+    cache_models = ()
+    cache_name = None
+
+    def get_cache_name(self):
+        return self.cache_name or self.__class__.__name__
+
+    def get_cache_key(self, request):
+        if not hasattr(self, "_cache_key"):
+            versions = get_versions(self.cache_models)
+            raw = "|".join(
+                [
+                    request.get_host(),
+                    request.path,
+                    normalize_query(request.query_params),
+                    *map(str, versions),
+                ]
+            )
+            digest = hashlib.md5(raw.encode()).hexdigest()
+            self._cache_key = f"{RESPONSE_KEY_PREFIX}:{self.get_cache_name()}:{digest}"
+        return self._cache_key
+
+    def get(self, request, *args, **kwargs):
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            record_lookup(self.get_cache_name(), hit=True)
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout=settings.CATALOG_CACHE_TIMEOUT)
+        record_lookup(self.get_cache_name(), hit=False)
+        response["X-Cache"] = "MISS"
+        return response
+
+
+class VersionedConditionalGetMixin(ConditionalGetMixin):
+    """
+    ConditionalGetMixin for views using VersionedCacheMixin: the ETag is
+    derived from the cache key, which changes whenever one of `cache_models`
+    does. Validating and serving a cache hit therefore needs no query.
+    """
+
+    def get_etag(self, request):
+        return quote_etag(self.get_cache_key(request).split(":")[-1])
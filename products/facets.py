@@ -0,0 +1,212 @@
+# This file contains the facet index and the attribute value filter of the product list.
+
+from django.db import transaction
+from django.db.models import Count
+from rest_framework.filters import BaseFilterBackend
+
+from .cache import bump_version
+from .models import ProductAttributeValue, ProductFacet, ProductInventory
+
+FACET_QUERY_PARAM = "attribute_values"
+
+
+def refresh_product_facets(product_ids):
+    """
+    Bring the facet index of the given products in line with the attribute
+    values of their active inventory entries. Only the difference is written.
+    Returns True when anything changed.
+    """
+    product_ids = set(product_ids)
+    if not product_ids:
+        return False
+
+    through = ProductInventory.attribute_values.through
+    with transaction.atomic():
+        desired = set(
+            through.objects.filter(
+                productinventory__product_id__in=product_ids,
+                productinventory__is_active=True,
+            ).values_list(
+                "productinventory__product_id",
+                "productattributevalue_id",
+                "productattributevalue__product_attribute_id",
+            )
+        )
+        existing = {
+            (product_id, value_id, attribute_id): facet_id
+            for facet_id, product_id, value_id, attribute_id in (
+                ProductFacet.objects.filter(product_id__in=product_ids).values_list(
+                    "id", "product_id", "attribute_value_id", "attribute_id"
+                )
+            )
+        }
+
+        stale = [facet_id for key, facet_id in existing.items() if key not in desired]
+        missing = [key for key in desired if key not in existing]
+        if stale:
+            ProductFacet.objects.filter(id__in=stale).delete()
+        if missing:
+            ProductFacet.objects.bulk_create(
+                [
+                    ProductFacet(
+                        product_id=product_id,
+                        attribute_value_id=value_id,
+                        attribute_id=attribute_id,
+                    )
+                    for product_id, value_id, attribute_id in missing
+                ],
+                ignore_conflicts=True,
+            )
+
+    if stale or missing:
+        bump_version(ProductFacet)
+        return True
+    return False
+
+
+def rebuild_product_facets(batch_size=1000):
+    """
+    Refresh the facet index of every product, `batch_size` products at a time.
+    """
+    through = ProductInventory.attribute_values.through
+    product_ids = sorted(
+        set(ProductFacet.objects.values_list("product_id", flat=True))
+        | set(through.objects.values_list("productinventory__product_id", flat=True))
+    )
+    for start in range(0, len(product_ids), batch_size):
+        refresh_product_facets(product_ids[start : start + batch_size])
+    return len(product_ids)
+
+
+def get_facet_selection(request):
+    """
+    Parse `?attribute_values=1,2,5` into {attribute_id: {value_id, ...}}.
+    Values of the same attribute are OR-ed, different attributes are AND-ed.
+    """
+    if not hasattr(request, "_facet_selection"):
+        value_ids = set()
+        for raw in request.query_params.getlist(FACET_QUERY_PARAM):
+            value_ids.update(int(v) for v in raw.split(",") if v.strip().isdigit())
+
+        selection = {}
+        if value_ids:
+            for value_id, attribute_id in ProductAttributeValue.objects.filter(
+                id__in=value_ids
+            ).values_list("id", "product_attribute_id"):
+                selection.setdefault(attribute_id, set()).add(value_id)
+            if not selection:
+                # Only unknown values were asked for, nothing can match
+                selection = {None: set()}
+        request._facet_selection = selection
+    return request._facet_selection
+
+
+def filter_by_facets(queryset, selection, exclude_attribute=None):
+    for attribute_id, value_ids in selection.items():
+        if attribute_id is not None and attribute_id == exclude_attribute:
+            continue
+        queryset = queryset.filter(
+            id__in=ProductFacet.objects.filter(attribute_value_id__in=value_ids).values(
+                "product_id"
+            )
+        )
+    return queryset
+
+
+def _count_facets(queryset, **filters):
+    return (
+        ProductFacet.objects.filter(product_id__in=queryset.values("id"), **filters)
+        .values(
+            "attribute_id",
+            "attribute__name",
+            "attribute_value_id",
+            "attribute_value__attribute_value",
+        )
+        .annotate(count=Count("product_id"))
+        .order_by("attribute__name", "attribute_value_id")
+    )
+
+
+def get_facet_counts(queryset, selection):
+    """
+    Product counts per attribute value for a product queryset that is
+    filtered by everything except the facet selection.
+
+    Counts of a selected attribute ignore that attribute's own selection, so
+    shoppers can see the alternatives (OR within one attribute). That's one
+    query per selected attribute plus one for all the others.
+    """
+    rows = []
+    selected = [attribute_id for attribute_id in selection if attribute_id]
+    for attribute_id in selected:
+        rows += _count_facets(
+            filter_by_facets(queryset, selection, exclude_attribute=attribute_id),
+            attribute_id=attribute_id,
+        )
+    rows += _count_facets(filter_by_facets(queryset, selection)).exclude(
+        attribute_id__in=selected
+    )
+
+    facets = {}
+    for row in rows:
+        facet = facets.setdefault(
+            row["attribute_id"],
+            {
+                "attribute_id": row["attribute_id"],
+                "attribute": row["attribute__name"],
+                "values": [],
+            },
+        )
+        facet["values"].append(
+            {
+                "id": row["attribute_value_id"],
+                "value": row["attribute_value__attribute_value"],
+                "count": row["count"],
+                "selected": row["attribute_value_id"]
+                in selection.get(row["attribute_id"], ()),
+            }
+        )
+    return sorted(facets.values(), key=lambda facet: facet["attribute"])
+
+
+class FacetFilter(BaseFilterBackend):
+    """
+    Filter products by attribute values through the facet index.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return filter_by_facets(queryset, get_facet_selection(request))
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": FACET_QUERY_PARAM,
+                "required": False,
+                "in": "query",
+                "description": "Comma separated attribute value ids; values of one "
+                "attribute are OR-ed, different attributes AND-ed.",
+                "schema": {"type": "string"},
+            }
+        ]
+
+
+class FacetCountsMixin:
+    """
+    Adds a `facets` block with per-value product counts to a paginated
+    product list response. The view must list FacetFilter in filter_backends.
+    """
+
+    def get_facet_base_queryset(self):
+        queryset = self.get_queryset()
+        for backend in self.filter_backends:
+            if not issubclass(backend, FacetFilter):
+                queryset = backend().filter_queryset(self.request, queryset, self)
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if isinstance(response.data, dict):
+            response.data["facets"] = get_facet_counts(
+                self.get_facet_base_queryset(), get_facet_selection(request)
+            )
+        return response
@@ -0,0 +1,28 @@
+from django.db.models import Subquery
+from django_filters import rest_framework as filters
+
+from categories.models import Category
+
+from .models import Product
+
+
+class ProductFilter(filters.FilterSet):
+    category_tree = filters.NumberFilter(
+        method="filter_category_tree",
+        label="Category id; matches products in the category and all its descendants",
+    )
+
+    class Meta:
+        model = Product
+        fields = ["brand", "category"]
+
+    def filter_category_tree(self, queryset, name, value):
+        # Descendants share the node's tree_id and have lft within its
+        # (lft, rght) range, so the whole subtree is one range scan. The node
+        # is read through scalar subqueries to keep it to a single query.
+        node = Category.objects.filter(pk=value)
+        return queryset.filter(
+            category__tree_id=Subquery(node.values("tree_id")),
+            category__lft__gte=Subquery(node.values("lft")),
+            category__lft__lte=Subquery(node.values("rght")),
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from products.cache import get_stats
+from products.views import ProductDetailView, ProductListView
+
+
+class Command(BaseCommand):
+    help = "Show hit/miss counters of the cached catalog endpoints"
+
+    def handle(self, *args, **options):
+        for view in (ProductListView, ProductDetailView):
+            name = view().get_cache_name()
+            stats = get_stats(name)
+            self.stdout.write(
+                f"{name}: hits={stats['hits']} misses={stats['misses']} "
+                f"hit_rate={stats['hit_rate']:.2%}"
+            )
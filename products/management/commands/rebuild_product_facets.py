@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from products.facets import rebuild_product_facets
+
+
+class Command(BaseCommand):
+    help = "Rebuild the product facet index from the inventory attribute values"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of products refreshed per transaction",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild_product_facets(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Refreshed facets of {count} products"))
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.15 on 2026-10-18 00:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0005_alter_productattributevalue_options"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="productinventory",
+            name="fast_stock",
+            field=models.BooleanField(
+                default=False,
+                help_text="True = Stock is reserved through Redis counters (hot SKUs)",
+                verbose_name="Fast Stock",
+            ),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.15 on 2026-10-18 00:34
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+from RadinGalleryAPI.search import update_search_vector
+
+
+def populate_search_vector(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    update_search_vector(
+        Product.objects.using(schema_editor.connection.alias),
+        [("name", "A"), ("description", "B")],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("brands", "0002_brand_search_vector_and_more"),
+        ("categories", "0001_initial"),
+        ("products", "0006_productinventory_fast_stock"),
+        ("wishlist", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="products_pr_search__98d711_gin"
+            ),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.1.15 on 2026-10-18 00:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_facets(apps, schema_editor):
+    ProductInventory = apps.get_model("products", "ProductInventory")
+    ProductFacet = apps.get_model("products", "ProductFacet")
+    db_alias = schema_editor.connection.alias
+
+    rows = (
+        ProductInventory.attribute_values.through.objects.using(db_alias)
+        .filter(productinventory__is_active=True)
+        .values_list(
+            "productinventory__product_id",
+            "productattributevalue_id",
+            "productattributevalue__product_attribute_id",
+        )
+        .distinct()
+    )
+    ProductFacet.objects.using(db_alias).bulk_create(
+        [
+            ProductFacet(
+                product_id=product_id,
+                attribute_value_id=value_id,
+                attribute_id=attribute_id,
+            )
+            for product_id, value_id, attribute_id in rows
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0007_product_search_vector_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductFacet",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "attribute",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="facets",
+                        to="products.productattribute",
+                    ),
+                ),
+                (
+                    "attribute_value",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="facets",
+                        to="products.productattributevalue",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="facets",
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Product Facet",
+                "verbose_name_plural": "Product Facets",
+                "indexes": [
+                    models.Index(
+                        fields=["attribute_value", "product"],
+                        name="products_pr_attribu_c916d6_idx",
+                    ),
+                    models.Index(
+                        fields=["attribute", "attribute_value", "product"],
+                        name="products_pr_attribu_553d11_idx",
+                    ),
+                ],
+                "unique_together": {("product", "attribute_value")},
+            },
+        ),
+        migrations.RunPython(populate_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.15 on 2026-10-18 00:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("brands", "0002_brand_search_vector_and_more"),
+        ("categories", "0002_category_categories_tree_range_idx"),
+        ("products", "0008_productfacet"),
+        ("wishlist", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(
+                fields=["category", "is_active"], name="products_pr_categor_50f5f1_idx"
+            ),
+        ),
+    ]
@@ -1,3 +1,4 @@
 from .attribute import ProductAttribute, ProductAttributeValue, ProductType
+from .facet import ProductFacet
 from .inventory import ProductInventory
 from .product import Media, Product
@@ -0,0 +1,40 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from .attribute import ProductAttribute, ProductAttributeValue
+from .product import Product
+
+
+class ProductFacet(models.Model):
+    """
+    Materialized product -> attribute value mapping, built from the attribute
+    values of each product's active inventory entries (see products.facets).
+    """
+
+    product = models.ForeignKey(
+        Product,
+        related_name="facets",
+        on_delete=models.CASCADE,
+    )
+    attribute = models.ForeignKey(
+        ProductAttribute,
+        related_name="facets",
+        on_delete=models.CASCADE,
+    )
+    attribute_value = models.ForeignKey(
+        ProductAttributeValue,
+        related_name="facets",
+        on_delete=models.CASCADE,
+    )
+
+    class Meta:
+        unique_together = ("product", "attribute_value")
+        indexes = [
+            models.Index(fields=["attribute_value", "product"]),
+            models.Index(fields=["attribute", "attribute_value", "product"]),
+        ]
+        verbose_name = _("Product Facet")
+        verbose_name_plural = _("Product Facets")
+
+    def __str__(self):
+        return f"{self.product_id} - {self.attribute_value_id}"
@@ -43,6 +43,11 @@ class ProductInventory(models.Model):
         help_text=_("True = Product Visible"),
         default=True,
     )
+    fast_stock = models.BooleanField(
+        verbose_name=_("Fast Stock"),
+        help_text=_("True = Stock is reserved through Redis counters (hot SKUs)"),
+        default=False,
+    )
     retail_price = models.DecimalField(
         max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal("0"))]
     )
@@ -1,4 +1,6 @@
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
@@ -103,6 +105,24 @@ class Product(models.Model):
         blank=True,
         verbose_name=_("Users Wishlist"),
     )
+    # Maintained from name (weight A) and description (weight B), see products.signals
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Approved review aggregates, maintained by reviews.ratings
+    rating_avg = models.DecimalField(
+        max_digits=3,
+        decimal_places=2,
+        default=0,
+        editable=False,
+        verbose_name=_("Average Rating"),
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name=_("Rating Count")
+    )
+    rating_1_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_2_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_3_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_4_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_5_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ["name"]
@@ -112,6 +132,9 @@ class Product(models.Model):
             models.Index(fields=["-created_at"]),
             models.Index(fields=["brand"]),
             models.Index(fields=["category"]),
+            models.Index(fields=["category", "is_active"]),
+            models.Index(fields=["-rating_avg", "-rating_count"]),
+            GinIndex(fields=["search_vector"]),
         ]
         unique_together = ("web_id", "slug")
         verbose_name = _("Product")
@@ -130,3 +153,10 @@ class Product(models.Model):
             ]
             or 0
         )
+
+    @property
+    def rating_histogram(self):
+        return {
+            str(rating): getattr(self, f"rating_{rating}_count")
+            for rating in range(1, 6)
+        }
@@ -32,6 +32,8 @@ class ProductSerializer(serializers.ModelSerializer):
             "brand",
             "category",
             "is_active",
+            "rating_avg",
+            "rating_count",
             "created_at",
             "updated_at",
         ]
@@ -40,6 +42,9 @@ class ProductSerializer(serializers.ModelSerializer):
 class ProductDetailSerializer(serializers.ModelSerializer):
     brand_name = serializers.CharField(source="brand.name", read_only=True)
     category_name = serializers.CharField(source="category.name", read_only=True)
+    rating_histogram = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True
+    )
 
     class Meta:
         model = Product
@@ -54,6 +59,9 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             "category",
             "category_name",
             "is_active",
+            "rating_avg",
+            "rating_count",
+            "rating_histogram",
             "created_at",
             "updated_at",
         ]
@@ -208,6 +216,7 @@ class AdminProductInventorySerializer(serializers.ModelSerializer):
             "attribute_values",
             "stock",
             "is_active",
+            "fast_stock",
             "retail_price",
             "store_price",
             "sale_price",
@@ -230,6 +239,7 @@ class AdminProductInventoryDetailSerializer(serializers.ModelSerializer):
             "attribute_values",
             "stock",
             "is_active",
+            "fast_stock",
             "retail_price",
             "store_price",
             "sale_price",
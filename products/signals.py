@@ -0,0 +1,101 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils import timezone
+
+from brands.models import Brand
+from categories.models import Category
+from RadinGalleryAPI.search import update_search_vector
+
+from .cache import bump_version
+from .facets import refresh_product_facets
+from .models import (
+    Media,
+    Product,
+    ProductAttribute,
+    ProductAttributeValue,
+    ProductFacet,
+    ProductInventory,
+)
+
+# Models whose changes invalidate the cached catalog responses
+CACHED_MODELS = [
+    Product,
+    ProductInventory,
+    Media,
+    Brand,
+    Category,
+    ProductAttribute,
+    ProductAttributeValue,
+]
+
+# Fields indexed in Product.search_vector, with their weights
+PRODUCT_SEARCH_FIELDS = [("name", "A"), ("description", "B")]
+
+
+def bump_catalog_cache_version(sender, **kwargs):
+    bump_version(sender)
+
+
+for model in CACHED_MODELS:
+    post_save.connect(bump_catalog_cache_version, sender=model)
+    post_delete.connect(bump_catalog_cache_version, sender=model)
+
+
+def update_product_search_vector(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {"name", "description"} & set(update_fields):
+        return
+    update_search_vector(Product.objects.filter(pk=instance.pk), PRODUCT_SEARCH_FIELDS)
+
+
+post_save.connect(update_product_search_vector, sender=Product)
+
+
+def refresh_inventory_facets(sender, instance, **kwargs):
+    refresh_product_facets([instance.product_id])
+
+
+def refresh_attribute_value_facets(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        refresh_product_facets([instance.product_id])
+    elif action == "post_clear":
+        # The value was removed from every inventory entry
+        if ProductFacet.objects.filter(attribute_value=instance).delete()[0]:
+            bump_version(ProductFacet)
+    else:
+        refresh_product_facets(
+            ProductInventory.objects.filter(pk__in=pk_set).values_list(
+                "product_id", flat=True
+            )
+        )
+
+
+def touch_inventory_attribute_values(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    # The inventory list ETag is built from updated_at, which M2M changes
+    # don't touch on their own
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            inventories = ProductInventory.objects.filter(pk=instance.pk)
+        else:
+            return
+    elif action in ("post_add", "post_remove"):
+        inventories = ProductInventory.objects.filter(pk__in=pk_set)
+    elif action == "pre_clear":
+        # Afterwards the cleared inventory entries can't be found any more
+        inventories = instance.product_inventories.all()
+    else:
+        return
+    inventories.update(updated_at=timezone.now())
+
+
+post_save.connect(refresh_inventory_facets, sender=ProductInventory)
+post_delete.connect(refresh_inventory_facets, sender=ProductInventory)
+m2m_changed.connect(
+    refresh_attribute_value_facets, sender=ProductInventory.attribute_values.through
+)
+m2m_changed.connect(
+    touch_inventory_attribute_values,
+    sender=ProductInventory.attribute_values.through,
+)
@@ -0,0 +1,144 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.urls import reverse
+
+from brands.models import Brand
+from cart.inventory import reserve_stock, stock_reservation_atomic
+from categories.models import Category
+from products.models import (
+    Product,
+    ProductAttribute,
+    ProductAttributeValue,
+    ProductInventory,
+    ProductType,
+)
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Category 1", slug="category-1")
+        self.brand = Brand.objects.create(name="Brand 1", slug="brand-1")
+        self.product_type = ProductType.objects.create(name="Type 1", slug="type-1")
+        self.product = Product.objects.create(
+            web_id="prod-001",
+            slug="product-one",
+            name="Product One",
+            description="This is the first product",
+            brand=self.brand,
+            category=self.category,
+            is_active=True,
+        )
+        self.inventory = ProductInventory.objects.create(
+            sku="SKU-001",
+            upc="UPC-001",
+            product_type=self.product_type,
+            product=self.product,
+            stock=100,
+            retail_price=Decimal("49.99"),
+            store_price=Decimal("45.00"),
+            weight=Decimal("1.2"),
+        )
+
+    def test_product_list_returns_304_for_matching_etag(self):
+        url = reverse("product-list")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        # The ETag comes from the cache versions, no query needed
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_product_list_etag_depends_on_query(self):
+        url = reverse("product-list")
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(
+            url, {"brand": self.brand.id}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_inventory_list_changes_etag_on_update(self):
+        url = reverse("product-inventory-list", args=[self.product.id])
+        response = self.client.get(url)
+        etag = response["ETag"]
+
+        self.inventory.stock = 10
+        self.inventory.save()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["stock"], 10)
+
+    def test_inventory_list_changes_etag_on_checkout(self):
+        url = reverse("product-inventory-list", args=[self.product.id])
+        etag = self.client.get(url)["ETag"]
+
+        with stock_reservation_atomic():
+            reserve_stock({self.product.id: 3})
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["stock"], 97)
+
+    def test_product_list_ignores_if_modified_since(self):
+        url = reverse("product-list")
+        response = self.client.get(url)
+        self.assertNotIn("Last-Modified", response)
+
+        # Hiding a product doesn't move the newest updated_at of the others
+        Product.objects.filter(pk=self.product.pk).update(is_active=False)
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT"
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_inventory_list_changes_etag_on_attribute_values(self):
+        url = reverse("product-inventory-list", args=[self.product.id])
+        attribute = ProductAttribute.objects.create(name="Color")
+        value = ProductAttributeValue.objects.create(
+            product_attribute=attribute, attribute_value="Red"
+        )
+
+        for change in (
+            lambda: self.inventory.attribute_values.add(value),
+            lambda: self.inventory.attribute_values.remove(value),
+            lambda: value.product_inventories.add(self.inventory),
+            lambda: value.product_inventories.clear(),
+        ):
+            etag = self.client.get(url)["ETag"]
+            change()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+
+    def test_etags_change_on_attribute_rename(self):
+        attribute = ProductAttribute.objects.create(name="Color")
+        value = ProductAttributeValue.objects.create(
+            product_attribute=attribute, attribute_value="Red"
+        )
+        self.inventory.attribute_values.add(value)
+        urls = [
+            reverse("product-inventory-list", args=[self.product.id]),
+            reverse("product-list"),
+        ]
+
+        for rename in (
+            lambda: setattr(value, "attribute_value", "Blue") or value.save(),
+            lambda: setattr(attribute, "name", "Colour") or attribute.save(),
+        ):
+            etags = [self.client.get(url)["ETag"] for url in urls]
+            with self.captureOnCommitCallbacks(execute=True):
+                rename()
+            for url, etag in zip(urls, etags):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_inventory_list_not_found_has_no_validators(self):
+        url = reverse("product-inventory-list", args=[self.product.id + 100])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn("ETag", response)
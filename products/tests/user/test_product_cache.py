@@ -0,0 +1,92 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from brands.models import Brand
+from categories.models import Category
+from products.cache import get_stats, get_versions
+from products.models import Product
+
+
+class ProductResponseCacheTest(TestCase):
+    def setUp(self):
+        self.category = Category.objects.create(name="Category 1", slug="category-1")
+        self.brand = Brand.objects.create(name="Brand 1", slug="brand-1")
+        self.product = Product.objects.create(
+            web_id="prod-001",
+            slug="product-one",
+            name="Product One",
+            description="This is the first product",
+            brand=self.brand,
+            category=self.category,
+            is_active=True,
+        )
+        self.list_url = reverse("product-list")
+        self.detail_url = reverse("product-detail", args=[self.product.id])
+
+    def test_list_is_served_from_cache(self):
+        response = self.client.get(self.list_url, {"brand": self.brand.id})
+        self.assertEqual(response["X-Cache"], "MISS")
+
+        # Same filters in a different order and with a blank param share the
+        # key; the hit and its ETag come from the cache alone
+        with self.assertNumQueries(0):
+            response = self.client.get(f"{self.list_url}?search=&brand={self.brand.id}")
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(len(response.json()["results"]), 1)
+
+        stats = get_stats("ProductListView")
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_different_query_is_a_miss(self):
+        self.client.get(self.list_url)
+        response = self.client.get(self.list_url, {"page": 1})
+        self.assertEqual(response["X-Cache"], "MISS")
+
+    def test_product_save_invalidates_cache(self):
+        self.client.get(self.detail_url)
+
+        self.product.name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.save()
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["name"], "Renamed")
+
+    def test_related_model_change_invalidates_cache(self):
+        self.client.get(self.detail_url)
+
+        self.brand.name = "Brand Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.brand.save()
+
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.json()["brand_name"], "Brand Renamed")
+
+    def test_product_delete_invalidates_list(self):
+        self.client.get(self.list_url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.delete()
+
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.json()["results"], [])
+
+    def test_version_is_bumped_on_commit(self):
+        version = get_versions([Product])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.product.save()
+            # A reader before the commit must not cache under a new version
+            self.assertEqual(get_versions([Product]), version)
+
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_versions([Product]), version)
+
+    def test_not_found_is_not_cached(self):
+        url = reverse("product-detail", args=[self.product.id + 100])
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 404)
+        self.assertNotEqual(response.get("X-Cache"), "HIT")
@@ -0,0 +1,184 @@
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from products.facets import rebuild_product_facets
+from products.models import (
+    Product,
+    ProductAttribute,
+    ProductAttributeValue,
+    ProductFacet,
+    ProductInventory,
+    ProductType,
+)
+
+
+def create_product(brand, category, slug):
+    return Product.objects.create(
+        web_id=f"web-{slug}",
+        slug=slug,
+        name=slug.title(),
+        description="Description",
+        brand=brand,
+        category=category,
+    )
+
+
+def create_inventory(product, sku, values, is_active=True):
+    product_type, _ = ProductType.objects.get_or_create(name="Type 1", slug="type-1")
+    inventory = ProductInventory.objects.create(
+        sku=sku,
+        upc=sku,
+        product_type=product_type,
+        product=product,
+        stock=10,
+        is_active=is_active,
+        retail_price=Decimal("10.00"),
+        store_price=Decimal("10.00"),
+        weight=Decimal("1.0"),
+    )
+    inventory.attribute_values.add(*values)
+    return inventory
+
+
+def facet_values(product):
+    return set(
+        ProductFacet.objects.filter(product=product).values_list(
+            "attribute_value__attribute_value", flat=True
+        )
+    )
+
+
+@pytest.fixture
+def attributes(db):
+    color = ProductAttribute.objects.create(name="Color")
+    size = ProductAttribute.objects.create(name="Size")
+    return {
+        "red": ProductAttributeValue.objects.create(
+            product_attribute=color, attribute_value="Red"
+        ),
+        "blue": ProductAttributeValue.objects.create(
+            product_attribute=color, attribute_value="Blue"
+        ),
+        "m": ProductAttributeValue.objects.create(
+            product_attribute=size, attribute_value="M"
+        ),
+        "l": ProductAttributeValue.objects.create(
+            product_attribute=size, attribute_value="L"
+        ),
+    }
+
+
+@pytest.fixture
+def catalog(brand, category_active, attributes):
+    """
+    shirt: Red/M, Blue/L    pants: Red/L    hat: Blue/M
+    """
+    shirt = create_product(brand, category_active, "shirt")
+    pants = create_product(brand, category_active, "pants")
+    hat = create_product(brand, category_active, "hat")
+    create_inventory(shirt, "SHIRT-1", [attributes["red"], attributes["m"]])
+    create_inventory(shirt, "SHIRT-2", [attributes["blue"], attributes["l"]])
+    create_inventory(pants, "PANTS-1", [attributes["red"], attributes["l"]])
+    create_inventory(hat, "HAT-1", [attributes["blue"], attributes["m"]])
+    return {"shirt": shirt, "pants": pants, "hat": hat}
+
+
+def list_products(client, *values):
+    params = {"attribute_values": ",".join(str(value.id) for value in values)}
+    response = client.get(reverse("product-list"), params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def names(data):
+    return sorted(product["name"] for product in data["results"])
+
+
+@pytest.mark.django_db
+def test_facet_index_follows_inventory_changes(brand, category_active, attributes):
+    product = create_product(brand, category_active, "shirt")
+    inventory = create_inventory(product, "SHIRT-1", [attributes["red"]])
+    assert facet_values(product) == {"Red"}
+
+    inventory.attribute_values.add(attributes["m"])
+    inventory.attribute_values.remove(attributes["red"])
+    assert facet_values(product) == {"M"}
+
+    inventory.is_active = False
+    inventory.save()
+    assert facet_values(product) == set()
+
+    inventory.is_active = True
+    inventory.save()
+    attributes["m"].product_inventories.clear()
+    assert facet_values(product) == set()
+
+
+@pytest.mark.django_db
+def test_rebuild_product_facets(catalog):
+    ProductFacet.objects.all().delete()
+
+    assert rebuild_product_facets() == 3
+    assert facet_values(catalog["shirt"]) == {"Red", "Blue", "M", "L"}
+    assert facet_values(catalog["pants"]) == {"Red", "L"}
+
+
+@pytest.mark.django_db
+def test_filter_by_attribute_values(api_client, catalog, attributes):
+    assert names(list_products(api_client, attributes["red"])) == ["Pants", "Shirt"]
+    # Values of one attribute are OR-ed
+    assert names(list_products(api_client, attributes["red"], attributes["blue"])) == [
+        "Hat",
+        "Pants",
+        "Shirt",
+    ]
+    # Different attributes are AND-ed
+    assert names(list_products(api_client, attributes["blue"], attributes["m"])) == [
+        "Hat",
+        "Shirt",
+    ]
+    assert names(list_products(api_client, attributes["red"], attributes["l"])) == [
+        "Pants",
+        "Shirt",
+    ]
+
+
+@pytest.mark.django_db
+def test_facet_counts(api_client, catalog, attributes):
+    data = list_products(api_client, attributes["red"])
+
+    counts = {
+        facet["attribute"]: {
+            value["value"]: value["count"] for value in facet["values"]
+        }
+        for facet in data["facets"]
+    }
+    # The selected attribute still shows its alternatives
+    assert counts["Color"] == {"Red": 2, "Blue": 2}
+    # Other attributes are counted within the selection
+    assert counts["Size"] == {"M": 1, "L": 2}
+
+    selected = [
+        value["value"]
+        for facet in data["facets"]
+        for value in facet["values"]
+        if value["selected"]
+    ]
+    assert selected == ["Red"]
+
+
+@pytest.mark.django_db
+def test_facet_counts_query_per_facet_group(
+    api_client, catalog, attributes, django_assert_num_queries
+):
+    url = reverse("product-list")
+
+    # Value lookup, page count, page, 2 selected groups + the rest
+    with django_assert_num_queries(6):
+        response = api_client.get(
+            url, {"attribute_values": f"{attributes['red'].id},{attributes['m'].id}"}
+        )
+    assert response.status_code == 200
+    assert names(response.json()) == ["Shirt"]
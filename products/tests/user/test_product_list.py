@@ -1,9 +1,13 @@
+from unittest.mock import patch
+
 from django.test import TestCase
 from django.urls import reverse
 
 from brands.models import Brand
 from categories.models import Category
+from products.filters import ProductFilter
 from products.models import Product
+from RadinGalleryAPI.pagination import NewestFirstPagination
 
 
 class ProductListViewTest(TestCase):
@@ -97,3 +101,56 @@ class ProductListViewTest(TestCase):
         # response = self.client.get(self.url, {"page": 2})
         # data = response.json()
         # self.assertEqual(len(data["results"]), 1)  # The third product would be on the second page.
+
+    @patch.object(NewestFirstPagination, "page_size", 2)
+    def test_product_list_cursor_pagination(self):
+        response = self.client.get(self.url, {"cursor": ""})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertNotIn("count", data)
+        self.assertIsNone(data["previous"])
+        first_page = [p["name"] for p in data["results"]]
+
+        response = self.client.get(data["next"])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertIsNone(data["next"])
+        self.assertIsNotNone(data["previous"])
+        second_page = [p["name"] for p in data["results"]]
+
+        # Newest first, every product exactly once
+        self.assertEqual(
+            first_page + second_page, ["Product Three", "Product Two", "Product One"]
+        )
+
+    def test_filter_by_category_tree(self):
+        child = Category.objects.create(
+            name="Child", slug="child", parent=self.category1
+        )
+        grandchild = Category.objects.create(
+            name="Grandchild", slug="grandchild", parent=child
+        )
+        Product.objects.create(
+            web_id="prod-004",
+            slug="product-four",
+            name="Product Four",
+            description="Deep in the tree",
+            brand=self.brand1,
+            category=grandchild,
+        )
+
+        response = self.client.get(self.url, {"category_tree": self.category1.id})
+        self.assertEqual(response.status_code, 200)
+        names = sorted(p["name"] for p in response.json()["results"])
+        self.assertEqual(names, ["Product Four", "Product One", "Product Three"])
+
+        response = self.client.get(self.url, {"category_tree": child.id})
+        names = [p["name"] for p in response.json()["results"]]
+        self.assertEqual(names, ["Product Four"])
+
+        # The subtree is resolved inside the product query itself
+        queryset = ProductFilter(
+            {"category_tree": self.category1.id}, queryset=Product.objects.all()
+        ).qs
+        with self.assertNumQueries(1):
+            self.assertEqual(len(queryset), 3)
@@ -0,0 +1,81 @@
+from unittest.mock import patch
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+
+from products.models import Product
+
+
+def create_product(brand, category, slug, name, description):
+    return Product.objects.create(
+        web_id=f"web-{slug}",
+        slug=slug,
+        name=name,
+        description=description,
+        brand=brand,
+        category=category,
+    )
+
+
+def search_names(client, search):
+    response = client.get(reverse("product-list"), {"search": search})
+    assert response.status_code == 200
+    return [product["name"] for product in response.json()["results"]]
+
+
+@pytest.fixture
+def products(brand, category_active):
+    return [
+        create_product(
+            brand, category_active, "tripod", "Tripod", "Works with any laptop stand"
+        ),
+        create_product(
+            brand, category_active, "laptop", "Laptop Pro", "Fast and light"
+        ),
+        create_product(brand, category_active, "mouse", "Mouse", "Wireless"),
+    ]
+
+
+@pytest.fixture
+def postgres_only():
+    if connection.vendor != "postgresql":
+        pytest.skip("Full-text search requires PostgreSQL")
+
+
+@pytest.mark.django_db
+def test_search_vector_is_maintained_on_save(postgres_only, api_client, products):
+    product = products[2]
+    product.name = "Keyboard"
+    product.save()
+
+    product.refresh_from_db()
+    assert "'keyboard':1A" in product.search_vector
+    assert search_names(api_client, "keyboard") == ["Keyboard"]
+
+
+@pytest.mark.django_db
+def test_search_ranks_name_matches_first(postgres_only, api_client, products):
+    # "Laptop Pro" matches in its name, "Tripod" only in its description
+    assert search_names(api_client, "laptop") == ["Laptop Pro", "Tripod"]
+
+
+@pytest.mark.django_db
+def test_search_matches_prefixes(postgres_only, api_client, products):
+    assert search_names(api_client, "lap") == ["Laptop Pro", "Tripod"]
+    assert search_names(api_client, "lap pro") == ["Laptop Pro"]
+
+
+@pytest.mark.django_db
+def test_search_ignores_tsquery_syntax(postgres_only, api_client, products):
+    assert search_names(api_client, "mouse:* | !&") == ["Mouse"]
+    assert search_names(api_client, "'!&|") == []
+
+
+@pytest.mark.django_db
+def test_search_falls_back_to_icontains(api_client, products):
+    with patch("RadinGalleryAPI.search.supports_full_text_search", return_value=False):
+        names = search_names(api_client, "aptop")
+
+    # Substring match, default ordering by name
+    assert names == ["Laptop Pro", "Tripod"]
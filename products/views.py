@@ -5,7 +5,7 @@ from drf_spectacular.utils import OpenApiParameter, extend_schema
 from drf_spectacular.views import SpectacularAPIView
 from rest_framework import generics, permissions
 from rest_framework.exceptions import NotFound
-from rest_framework.filters import SearchFilter
+from rest_framework.filters import OrderingFilter
 from rest_framework.generics import (
     ListAPIView,
     ListCreateAPIView,
@@ -14,17 +14,26 @@ from rest_framework.generics import (
 )
 from rest_framework.permissions import AllowAny, IsAdminUser
 
+from brands.models import Brand
+from categories.models import Category
 from products.models import Media, Product, ProductInventory
 from products.models.attribute import (
     ProductAttribute,
     ProductAttributeValue,
     ProductType,
 )
+from RadinGalleryAPI.mixins import ConditionalGetMixin
+from RadinGalleryAPI.pagination import NewestFirstPagination
+from RadinGalleryAPI.search import FullTextSearchFilter
 
+from .cache import VersionedCacheMixin, VersionedConditionalGetMixin, get_versions
+from .facets import FacetCountsMixin, FacetFilter
+from .filters import ProductFilter
 from .models import (
     Product,
     ProductAttribute,
     ProductAttributeValue,
+    ProductFacet,
     ProductInventory,
     ProductType,
 )
@@ -61,28 +70,58 @@ products_schema_view = SpectacularAPIView.as_view(urlconf="products.urls")
 # User Endpoints (Products)
 # ---------------------------------------------------------
 @extend_schema(tags=["Product - List"])
-class ProductListView(ListAPIView):
+class ProductListView(
+    VersionedConditionalGetMixin, VersionedCacheMixin, FacetCountsMixin, ListAPIView
+):
+    throttle_scope = "catalog"
     serializer_class = ProductSerializer
     permission_classes = [AllowAny]
     queryset = Product.objects.filter(is_active=True)
 
+    # Page numbers by default, keyset pages on -created_at with ?cursor=
+    pagination_class = NewestFirstPagination
+
     # Filter based on model fields:
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    filter_backends = [
+        DjangoFilterBackend,
+        OrderingFilter,
+        FullTextSearchFilter,
+        FacetFilter,
+    ]
+
+    # ?ordering=-rating_avg lists the best rated products first (indexed)
+    ordering_fields = ["name", "created_at", "rating_avg", "rating_count"]
 
-    # Filter by brand and category
-    filterset_fields = ["brand", "category"]
+    # Filter by brand, category and category subtree (category_tree)
+    filterset_class = ProductFilter
 
-    # Search in name and description
+    # Ranked full-text search in name and description (ILIKE fallback off PostgreSQL)
+    search_vector_field = "search_vector"
     search_fields = ["name", "description"]
 
+    # Cached per query string until one of these models changes; the ETag
+    # comes from the same versions
+    cache_models = [
+        Product,
+        ProductInventory,
+        Media,
+        Brand,
+        Category,
+        ProductAttribute,
+        ProductAttributeValue,
+        ProductFacet,
+    ]
+
 
 @extend_schema(tags=["Product - List"])
-class ProductDetailView(RetrieveAPIView):
+class ProductDetailView(VersionedCacheMixin, RetrieveAPIView):
+    throttle_scope = "catalog"
     queryset = Product.objects.filter(is_active=True).select_related(
         "category", "brand"
     )
     serializer_class = ProductDetailSerializer
     permission_classes = [AllowAny]
+    cache_models = [Product, ProductInventory, Media, Brand, Category]
 
 
 @extend_schema(tags=["Product - Media"])
@@ -101,10 +140,17 @@ class ProductMediaListView(ListAPIView):
 
 
 @extend_schema(tags=["Product - Inventory"])
-class ProductInventoryListView(ListAPIView):
+class ProductInventoryListView(ConditionalGetMixin, ListAPIView):
     serializer_class = ProductInventorySerializer
     permission_classes = [AllowAny]
 
+    def get_etag_extra(self):
+        # Attribute and value labels are listed but renamed without touching
+        # the inventory rows
+        return "|".join(
+            map(str, get_versions([ProductAttribute, ProductAttributeValue]))
+        )
+
     def get_queryset(self):
         product_id = self.kwargs.get("pk")
 
@@ -223,6 +269,7 @@ class AdminProductListCreateView(ListCreateAPIView):
     queryset = Product.objects.all()
     serializer_class = AdminProductSerializer
     permission_classes = [IsAdminUser]
+    pagination_class = NewestFirstPagination
 
 
 @extend_schema(
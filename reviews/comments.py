@@ -0,0 +1,36 @@
+# This file contains the windowed loading of comments embedded in review lists.
+
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+from .models import Comment
+
+
+def get_latest_comments(review_ids, limit):
+    """
+    Loads the comment count and the latest `limit` comments (with their
+    users) of every given review in one windowed query.
+    Returns {review_id: (comment count, [comments, oldest first])}.
+    """
+    comments = (
+        Comment.objects.filter(review_id__in=list(review_ids))
+        .select_related("user")
+        .annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=F("review_id"),
+                order_by=[F("created_at").desc(), F("id").desc()],
+            ),
+            review_comment_count=Window(Count("id"), partition_by=F("review_id")),
+        )
+        .filter(row_number__lte=limit)
+        .order_by("review_id", "-row_number")
+    )
+
+    latest = {}
+    for comment in comments:
+        count, page = latest.setdefault(
+            comment.review_id, (comment.review_comment_count, [])
+        )
+        page.append(comment)
+    return latest
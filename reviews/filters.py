@@ -0,0 +1,16 @@
+from django_filters import rest_framework as filters
+
+from .models import Review
+
+
+class ReviewModerationFilter(filters.FilterSet):
+    created_after = filters.IsoDateTimeFilter(
+        field_name="created_at", lookup_expr="gte"
+    )
+    created_before = filters.IsoDateTimeFilter(
+        field_name="created_at", lookup_expr="lte"
+    )
+
+    class Meta:
+        model = Review
+        fields = ["product", "user", "rating", "is_approved"]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.15 on 2026-10-18 00:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0006_productinventory_fast_stock"),
+        ("reviews", "0003_alter_comment_options_alter_review_options"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["product", "created_at"], name="reviews_rev_product_847b15_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_product_ratings(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    Review = apps.get_model("reviews", "Review")
+    db_alias = schema_editor.connection.alias
+
+    histograms = {}
+    for product_id, rating, count in (
+        Review.objects.using(db_alias)
+        .filter(is_approved=True, rating__in=range(1, 6))
+        .values_list("product_id", "rating")
+        .annotate(count=Count("id"))
+        .order_by()
+    ):
+        histograms.setdefault(product_id, {})[rating] = count
+
+    for product_id, histogram in histograms.items():
+        count = sum(histogram.values())
+        total = sum(rating * n for rating, n in histogram.items())
+        Product.objects.using(db_alias).filter(pk=product_id).update(
+            rating_count=count,
+            rating_avg=round(total / count, 2),
+            **{
+                f"rating_{rating}_count": histogram.get(rating, 0)
+                for rating in range(1, 6)
+            },
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0010_product_rating_aggregates"),
+        ("reviews", "0004_review_reviews_rev_product_847b15_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_product_ratings, migrations.RunPython.noop),
+    ]
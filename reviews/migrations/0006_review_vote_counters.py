@@ -0,0 +1,40 @@
+# Generated by Django 5.1.15 on 2026-10-18 00:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0010_product_rating_aggregates"),
+        ("reviews", "0005_backfill_product_ratings"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="review",
+            name="downvotes",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="review",
+            name="helpfulness",
+            field=models.IntegerField(
+                default=0, editable=False, help_text="Upvotes minus downvotes"
+            ),
+        ),
+        migrations.AddField(
+            model_name="review",
+            name="upvotes",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                fields=["product", "-helpfulness"],
+                name="reviews_rev_product_ed4d73_idx",
+            ),
+        ),
+    ]
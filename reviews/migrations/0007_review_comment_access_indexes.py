@@ -0,0 +1,54 @@
+# Generated by Django 5.1.15 on 2026-10-18 01:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0010_product_rating_aggregates"),
+        ("reviews", "0006_review_vote_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="review",
+            name="reviews_rev_product_847b15_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="review",
+            name="reviews_rev_product_ed4d73_idx",
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["review", "created_at"], name="reviews_com_review__b4c0d7_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                condition=models.Q(("is_approved", True)),
+                fields=["product", "created_at"],
+                name="reviews_approved_product_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                condition=models.Q(("is_approved", True)),
+                fields=["product", "-helpfulness"],
+                name="reviews_approved_helpful_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="review",
+            index=models.Index(
+                condition=models.Q(("is_approved", False)),
+                fields=["created_at"],
+                name="reviews_pending_idx",
+            ),
+        ),
+    ]
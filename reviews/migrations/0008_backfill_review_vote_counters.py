@@ -0,0 +1,36 @@
+from django.db import migrations
+from django.db.models import Count, Q
+
+
+def backfill_review_vote_counters(apps, schema_editor):
+    Review = apps.get_model("reviews", "Review")
+    ReviewVote = apps.get_model("reviews", "ReviewVote")
+    db_alias = schema_editor.connection.alias
+
+    # Votes cast before the counters existed were never counted, so a later
+    # flip would move a vote out of a counter still at 0
+    for review_id, upvotes, downvotes in (
+        ReviewVote.objects.using(db_alias)
+        .values_list("review_id")
+        .annotate(
+            upvotes=Count("id", filter=Q(is_upvote=True)),
+            downvotes=Count("id", filter=Q(is_upvote=False)),
+        )
+        .order_by()
+    ):
+        Review.objects.using(db_alias).filter(pk=review_id).update(
+            upvotes=upvotes,
+            downvotes=downvotes,
+            helpfulness=upvotes - downvotes,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0007_review_comment_access_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_review_vote_counters, migrations.RunPython.noop),
+    ]
@@ -33,11 +33,37 @@ class Review(models.Model):
         verbose_name=_("Show Name"),
         help_text=_("Whether to display the user's name with the review"),
     )
+    # Vote counters, flushed from Redis by reviews.tasks.flush_review_vote_deltas
+    upvotes = models.PositiveIntegerField(default=0, editable=False)
+    downvotes = models.PositiveIntegerField(default=0, editable=False)
+    helpfulness = models.IntegerField(
+        default=0, editable=False, help_text=_("Upvotes minus downvotes")
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["created_at"]
+        # Public listings only read approved reviews and moderation only the
+        # pending ones, so each access path gets a partial index. Lookups by
+        # user are covered by the user foreign key index.
+        indexes = [
+            models.Index(
+                fields=["product", "created_at"],
+                condition=models.Q(is_approved=True),
+                name="reviews_approved_product_idx",
+            ),
+            models.Index(
+                fields=["product", "-helpfulness"],
+                condition=models.Q(is_approved=True),
+                name="reviews_approved_helpful_idx",
+            ),
+            models.Index(
+                fields=["created_at"],
+                condition=models.Q(is_approved=False),
+                name="reviews_pending_idx",
+            ),
+        ]
         verbose_name = _("Review")
         verbose_name_plural = _("Reviews")
         unique_together = (
@@ -92,6 +118,9 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+        indexes = [
+            models.Index(fields=["review", "created_at"]),
+        ]
         verbose_name = _("Comment")
         verbose_name_plural = _("Comments")
 
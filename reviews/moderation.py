@@ -0,0 +1,66 @@
+# This file contains the set-based approval and rejection of reviews.
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Review
+from .ratings import apply_rating_changes, get_rating_changes
+
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+NOT_FOUND = "not_found"
+
+
+def moderate_batch(queryset, is_approved):
+    """
+    Approve or reject the reviews of `queryset` with a single UPDATE and
+    apply the rating aggregate changes once per affected product.
+    Returns the locked pre-update rows and the ids of the changed ones.
+
+    Review signals don't fire for the UPDATE, so the aggregates are adjusted
+    here from the locked pre-update rows.
+    """
+    with transaction.atomic():
+        rows = list(
+            queryset.select_for_update().values(
+                "id", "product_id", "rating", "is_approved"
+            )
+        )
+        changed = [row for row in rows if row["is_approved"] != is_approved]
+        if changed:
+            Review.objects.filter(id__in=[row["id"] for row in changed]).update(
+                is_approved=is_approved, updated_at=timezone.now()
+            )
+
+            changes = {}
+            for row in changed:
+                new_state = dict(row, is_approved=is_approved)
+                for key, delta in get_rating_changes(row, new_state).items():
+                    changes[key] = changes.get(key, 0) + delta
+            apply_rating_changes(changes)
+    return rows, {row["id"] for row in changed}
+
+
+def moderate_reviews(queryset, is_approved, batch_size=None, limit=None):
+    """
+    Approve or reject the reviews of `queryset`, walking it in id order in
+    batches of at most `batch_size` rows. Every batch is locked and updated
+    in its own short transaction; at most `limit` reviews are processed.
+    Returns {review_id: UPDATED | UNCHANGED} for the processed reviews.
+    """
+    batch_size = batch_size or settings.REVIEW_MODERATION_BATCH_SIZE
+    queryset = queryset.order_by("id")
+    outcomes = {}
+    last_id = 0
+    while limit is None or len(outcomes) < limit:
+        size = batch_size if limit is None else min(batch_size, limit - len(outcomes))
+        rows, changed_ids = moderate_batch(
+            queryset.filter(id__gt=last_id)[:size], is_approved
+        )
+        for row in rows:
+            outcomes[row["id"]] = UPDATED if row["id"] in changed_ids else UNCHANGED
+        if len(rows) < size:
+            break
+        last_id = rows[-1]["id"]
+    return outcomes
@@ -0,0 +1,138 @@
+# This file maintains the denormalized rating aggregates on Product.
+
+from decimal import Decimal
+
+from django.db.models import Count, F, FloatField, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+
+from products.cache import bump_version
+from products.models import Product
+
+from .models import Review
+
+RATINGS = range(1, 6)
+
+
+def get_rating_field(rating):
+    return f"rating_{rating}_count"
+
+
+def _average(total, count):
+    # Float division works the same on every backend; the column rounds it
+    return Coalesce(
+        Cast(total, FloatField()) / NullIf(count, 0),
+        Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def apply_rating_changes(changes):
+    """
+    Apply {(product_id, rating): delta} changes of approved reviews to the
+    product aggregates. Every product is updated with one UPDATE whose
+    expressions are relative (F), so concurrent changes don't overwrite
+    each other.
+    """
+    by_product = {}
+    for (product_id, rating), delta in changes.items():
+        if delta:
+            by_product.setdefault(product_id, {})[rating] = delta
+
+    for product_id, deltas in by_product.items():
+        count_delta = sum(deltas.values())
+        total_delta = sum(rating * delta for rating, delta in deltas.items())
+        count = F("rating_count") + count_delta
+        total = sum(rating * F(get_rating_field(rating)) for rating in RATINGS)
+
+        Product.objects.filter(pk=product_id).update(
+            rating_count=count,
+            rating_avg=_average(total + total_delta, count),
+            updated_at=timezone.now(),
+            **{
+                get_rating_field(rating): F(get_rating_field(rating)) + delta
+                for rating, delta in deltas.items()
+            },
+        )
+
+    if by_product:
+        bump_version(Product)
+
+
+def get_rating_contribution(review_state):
+    """
+    {(product_id, rating): 1} for an approved review state, {} otherwise.
+    """
+    if (
+        not review_state
+        or not review_state["is_approved"]
+        or review_state["rating"] not in RATINGS
+    ):
+        return {}
+    return {(review_state["product_id"], review_state["rating"]): 1}
+
+
+def get_review_state(review):
+    return {
+        "product_id": review.product_id,
+        "rating": review.rating,
+        "is_approved": review.is_approved,
+    }
+
+
+def get_rating_changes(old_state, new_state):
+    """
+    Aggregate changes for a review going from `old_state` to `new_state`
+    (either may be None for a created or deleted review).
+    """
+    changes = {}
+    for key, value in get_rating_contribution(old_state).items():
+        changes[key] = changes.get(key, 0) - value
+    for key, value in get_rating_contribution(new_state).items():
+        changes[key] = changes.get(key, 0) + value
+    return {key: delta for key, delta in changes.items() if delta}
+
+
+def reconcile_product_ratings(batch_size=500):
+    """
+    Recompute the aggregates of every product from the approved reviews and
+    fix the ones that drifted. Returns the number of products corrected.
+    """
+    fields = ["rating_count", "rating_avg"] + [
+        get_rating_field(rating) for rating in RATINGS
+    ]
+    actual = {}
+    for product_id, rating, count in (
+        Review.objects.filter(is_approved=True, rating__in=RATINGS)
+        .values_list("product_id", "rating")
+        .annotate(count=Count("id"))
+        .order_by()
+    ):
+        actual.setdefault(product_id, {})[rating] = count
+
+    corrected = []
+    products = Product.objects.only("id", *fields).order_by("id")
+    for product in products.iterator(chunk_size=batch_size):
+        histogram = actual.get(product.id, {})
+        count = sum(histogram.values())
+        total = sum(rating * n for rating, n in histogram.items())
+        expected = {
+            get_rating_field(rating): histogram.get(rating, 0) for rating in RATINGS
+        }
+        expected["rating_count"] = count
+        expected["rating_avg"] = (
+            round(Decimal(total) / Decimal(count), 2) if count else Decimal("0")
+        )
+
+        if any(getattr(product, field) != value for field, value in expected.items()):
+            for field, value in expected.items():
+                setattr(product, field, value)
+            product.updated_at = timezone.now()
+            corrected.append(product)
+
+    Product.objects.bulk_update(
+        corrected, fields + ["updated_at"], batch_size=batch_size
+    )
+    if corrected:
+        bump_version(Product)
+    return len(corrected)
@@ -1,6 +1,23 @@
+from django.conf import settings
 from rest_framework import serializers
 
+from .comments import get_latest_comments
+from .filters import ReviewModerationFilter
 from .models import Comment, Review, ReviewVote
+from .votes import ReviewVoteCounter
+
+
+class ReviewListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        reviews = list(data.all() if hasattr(data, "all") else data)
+        review_ids = [review.id for review in reviews]
+        # Pending vote counts of the whole page in one Redis round trip
+        self.child.pending_votes = ReviewVoteCounter.get_pending(review_ids)
+        if self.context.get("include_comments"):
+            self.child.latest_comments = get_latest_comments(
+                review_ids, settings.REVIEW_EMBEDDED_COMMENTS
+            )
+        return [self.child.to_representation(review) for review in reviews]
 
 
 class ReviewSerializer(serializers.ModelSerializer):
@@ -8,8 +25,12 @@ class ReviewSerializer(serializers.ModelSerializer):
     Serializer for creating, updating, and retrieving reviews
     """
 
+    upvotes = serializers.SerializerMethodField()
+    downvotes = serializers.SerializerMethodField()
+
     class Meta:
         model = Review
+        list_serializer_class = ReviewListSerializer
         fields = [
             "id",
             "title",
@@ -17,6 +38,8 @@ class ReviewSerializer(serializers.ModelSerializer):
             "rating",
             "product",
             "user",
+            "upvotes",
+            "downvotes",
             "created_at",
             "updated_at",
         ]
@@ -27,6 +50,31 @@ class ReviewSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
 
+    pending_votes = None
+    latest_comments = None
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if self.latest_comments is not None:
+            count, comments = self.latest_comments.get(instance.id, (0, []))
+            data["comment_count"] = count
+            data["comments"] = CommentSerializer(comments, many=True).data
+        return data
+
+    def get_pending_votes(self, obj):
+        if self.pending_votes is None or obj.id not in self.pending_votes:
+            return ReviewVoteCounter.get_pending([obj.id]).get(obj.id, (0, 0))
+        return self.pending_votes[obj.id]
+
+    def get_upvotes(self, obj) -> int:
+        """
+        Flushed upvotes plus the ones still pending in Redis
+        """
+        return max(obj.upvotes + self.get_pending_votes(obj)[0], 0)
+
+    def get_downvotes(self, obj) -> int:
+        return max(obj.downvotes + self.get_pending_votes(obj)[1], 0)
+
     def get_user_name(self, obj):
         """
         Returns the username if show_name is True; otherwise, returns 'Anonymous'
@@ -70,3 +118,51 @@ class CommentSerializer(serializers.ModelSerializer):
         Return the username of the commenter
         """
         return obj.user.username if obj.user else "Anonymous"
+
+
+class ReviewModerationSerializer(serializers.Serializer):
+    """
+    Serializer for approving or rejecting reviews in bulk, selected either by
+    a list of ids or by a filter expression
+    """
+
+    is_approved = serializers.BooleanField()
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=settings.REVIEW_MODERATION_MAX_IDS,
+    )
+    filter = serializers.DictField(
+        child=serializers.CharField(),
+        required=False,
+        allow_empty=False,
+        help_text="Review filters: " + ", ".join(ReviewModerationFilter.base_filters),
+    )
+
+    def validate_filter(self, value):
+        unknown = set(value) - set(ReviewModerationFilter.base_filters)
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown filters: {', '.join(sorted(unknown))}"
+            )
+        filterset = ReviewModerationFilter(value, queryset=Review.objects.all())
+        if not filterset.is_valid():
+            raise serializers.ValidationError(filterset.errors)
+        return value
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError(
+                "Provide either 'ids' or 'filter', not both."
+            )
+        return attrs
+
+    def get_queryset(self):
+        if "ids" in self.validated_data:
+            return Review.objects.filter(id__in=self.validated_data["ids"])
+        # Reviews already in the requested state are skipped, so repeating a
+        # request that hit the limit moves on to the remaining ones
+        return ReviewModerationFilter(
+            self.validated_data["filter"], queryset=Review.objects.all()
+        ).qs.exclude(is_approved=self.validated_data["is_approved"])
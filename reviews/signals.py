@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from .models import Review
+from .ratings import apply_rating_changes, get_rating_changes, get_review_state
+
+
+def remember_review_state(sender, instance, **kwargs):
+    # The stored state is what the product aggregates currently count
+    instance._rating_state = (
+        Review.objects.filter(pk=instance.pk)
+        .values("product_id", "rating", "is_approved")
+        .first()
+        if instance.pk
+        else None
+    )
+
+
+def update_product_rating_on_save(sender, instance, **kwargs):
+    old_state = getattr(instance, "_rating_state", None)
+    apply_rating_changes(get_rating_changes(old_state, get_review_state(instance)))
+
+
+def update_product_rating_on_delete(sender, instance, **kwargs):
+    apply_rating_changes(get_rating_changes(get_review_state(instance), None))
+
+
+pre_save.connect(remember_review_state, sender=Review)
+post_save.connect(update_product_rating_on_save, sender=Review)
+post_delete.connect(update_product_rating_on_delete, sender=Review)
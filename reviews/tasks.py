@@ -0,0 +1,65 @@
+import logging
+
+from celery import shared_task
+from django.db import DatabaseError, transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+
+from .models import Review
+from .ratings import reconcile_product_ratings
+from .votes import ReviewVoteCounter
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def reconcile_product_ratings_task(batch_size=500):
+    """
+    Nightly safety net for the incrementally maintained product ratings.
+    """
+    return reconcile_product_ratings(batch_size=batch_size)
+
+
+@shared_task
+def flush_review_vote_deltas(batch_size=500):
+    """
+    Write pending vote counter deltas to Review.upvotes/downvotes.
+    Each batch is a single UPDATE and counters are clamped at 0, so a delta
+    that would drive one negative can't fail the flush. Deltas of a batch
+    that fails anyway are put back to be retried on the next run, while the
+    other batches are still written.
+    """
+    deltas = list(ReviewVoteCounter.pop_pending().items())
+
+    flushed = 0
+    failed = {}
+    for start in range(0, len(deltas), batch_size):
+        batch = deltas[start : start + batch_size]
+        up = Case(
+            *[When(id=review_id, then=Value(up)) for review_id, (up, _) in batch],
+            output_field=IntegerField(),
+        )
+        down = Case(
+            *[When(id=review_id, then=Value(down)) for review_id, (_, down) in batch],
+            output_field=IntegerField(),
+        )
+        upvotes = Greatest(F("upvotes") + up, Value(0))
+        downvotes = Greatest(F("downvotes") + down, Value(0))
+        try:
+            with transaction.atomic():
+                Review.objects.filter(
+                    id__in=[review_id for review_id, _ in batch]
+                ).update(
+                    upvotes=upvotes,
+                    downvotes=downvotes,
+                    helpfulness=upvotes - downvotes,
+                )
+        except DatabaseError:
+            logger.exception("Could not flush vote deltas of %s reviews", len(batch))
+            failed.update(batch)
+            continue
+        flushed += len(batch)
+
+    if failed:
+        ReviewVoteCounter.record_many(failed)
+    return flushed
@@ -1,12 +1,22 @@
 import json
+from decimal import Decimal
+from importlib import import_module
+from unittest.mock import patch
 
 import pytest
+from django.apps import apps as django_apps
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.urls import reverse
 from rest_framework import status
 
 from products.models.product import Product
+from RadinGalleryAPI.pagination import OldestFirstPagination
 from reviews.models import Comment, Review, ReviewVote
+from reviews.ratings import reconcile_product_ratings
+from reviews.tasks import flush_review_vote_deltas
+from reviews.views import CommentListView, ReviewListView
+from reviews.votes import REDIS_CLIENT, VOTE_DELTAS_KEY, ReviewVoteCounter
 
 User = get_user_model()
 
@@ -85,6 +95,30 @@ def test_list_approved_reviews(api_client, product, review):
     assert response.data["results"][0]["title"] == "Great Product"
 
 
+@pytest.mark.django_db
+def test_list_reviews_cursor_pagination(api_client, product, review, another_user):
+    """Test keyset pagination of a product's reviews with ?cursor=."""
+    second = Review.objects.create(
+        user=another_user,
+        product=product,
+        title="Second",
+        body="Also good",
+        rating=4,
+        is_approved=True,
+    )
+    url = reverse("review-list", kwargs={"product_id": product.id})
+
+    with patch.object(OldestFirstPagination, "page_size", 1):
+        response = api_client.get(url, {"cursor": ""})
+        assert response.status_code == status.HTTP_200_OK
+        assert "count" not in response.data
+        assert [r["id"] for r in response.data["results"]] == [review.id]
+
+        response = api_client.get(response.data["next"])
+        assert [r["id"] for r in response.data["results"]] == [second.id]
+        assert response.data["next"] is None
+
+
 @pytest.mark.django_db
 def test_create_review(authenticated_user_client, product):
     """Test creating a new review for a product."""
@@ -129,6 +163,42 @@ def test_vote_review(authenticated_user_client, review):
     ).exists()
 
 
+@pytest.mark.django_db
+def test_list_reviews_include_comments(
+    api_client, product, review, another_user, django_assert_num_queries
+):
+    """Test embedding comment counts and the latest comments in the review list."""
+    quiet = Review.objects.create(
+        product=product,
+        user=another_user,
+        title="Quiet",
+        body="No comments",
+        rating=3,
+        is_approved=True,
+    )
+    comments = [
+        Comment.objects.create(user=another_user, review=review, body=f"Comment {i}")
+        for i in range(5)
+    ]
+
+    url = reverse("review-list", kwargs={"product_id": product.id})
+    # Count, reviews and one windowed comments query, whatever the page size
+    with django_assert_num_queries(3):
+        response = api_client.get(url, {"include": "comments"})
+    assert response.status_code == status.HTTP_200_OK
+    results = {r["id"]: r for r in response.data["results"]}
+    assert results[review.id]["comment_count"] == 5
+    assert [c["id"] for c in results[review.id]["comments"]] == [
+        c.id for c in comments[-3:]
+    ]
+    assert results[review.id]["comments"][0]["user_name"] == another_user.username
+    assert results[quiet.id]["comment_count"] == 0
+    assert results[quiet.id]["comments"] == []
+
+    response = api_client.get(url)
+    assert "comments" not in response.data["results"][0]
+
+
 # ------------------------
 # Test Cases for Comments
 # ------------------------
@@ -185,3 +255,352 @@ def test_admin_approve_review(authenticated_admin_client, review_unapproved):
     assert response.status_code == status.HTTP_200_OK
     review_unapproved.refresh_from_db()
     assert review_unapproved.is_approved is True
+
+
+@pytest.mark.django_db
+def test_admin_bulk_moderation_by_ids(
+    authenticated_admin_client, product, review, review_unapproved, another_user
+):
+    """Test bulk approval by ids reports an outcome per id."""
+    pending = Review.objects.create(
+        product=product,
+        user=another_user,
+        title="Pending",
+        body="Waiting",
+        rating=3,
+        is_approved=False,
+    )
+    url = reverse("admin-review-moderate")
+    payload = {
+        "is_approved": True,
+        "ids": [review.id, review_unapproved.id, pending.id, 999999],
+    }
+    response = authenticated_admin_client.post(url, payload, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["updated"] == 2
+    assert response.data["results"] == {
+        str(review.id): "unchanged",
+        str(review_unapproved.id): "updated",
+        str(pending.id): "updated",
+        "999999": "not_found",
+    }
+    assert not Review.objects.filter(is_approved=False).exists()
+
+    # One aggregate update per affected product, matching the reviews
+    product.refresh_from_db()
+    assert product.rating_count == 2
+    assert product.rating_histogram == {"1": 0, "2": 0, "3": 1, "4": 0, "5": 1}
+    assert product.rating_avg == Decimal("4.00")
+
+
+@pytest.mark.django_db
+def test_admin_bulk_moderation_by_filter(
+    authenticated_admin_client, product, review, review_unapproved
+):
+    """Test bulk rejection of the reviews matched by a filter."""
+    url = reverse("admin-review-moderate")
+    payload = {"is_approved": False, "filter": {"product": product.id}}
+    response = authenticated_admin_client.post(url, payload, format="json")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"] == {str(review.id): "updated"}
+
+    review.refresh_from_db()
+    review_unapproved.refresh_from_db()
+    assert review.is_approved is False
+    assert review_unapproved.is_approved is False
+    product.refresh_from_db()
+    assert product.rating_count == 0
+
+
+@pytest.mark.django_db
+def test_admin_approve_missing_review_is_not_found(authenticated_admin_client):
+    """Test a missing review is a 404 even with an invalid payload."""
+    url = reverse("admin-review-approve", kwargs={"review_id": 999999})
+    response = authenticated_admin_client.post(url, {}, format="json")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_admin_bulk_moderation_by_filter_is_limited(
+    authenticated_admin_client, product, settings
+):
+    """Test a filter is processed in batches up to the per-request limit."""
+    settings.REVIEW_MODERATION_MAX_FILTERED = 3
+    settings.REVIEW_MODERATION_BATCH_SIZE = 2
+    reviews = Review.objects.bulk_create(
+        [
+            Review(
+                product=product,
+                user=User.objects.create_user(
+                    username=f"reviewer{i}", email=f"reviewer{i}@example.com"
+                ),
+                title=f"Review {i}",
+                body="Body",
+                rating=4,
+                is_approved=False,
+            )
+            for i in range(5)
+        ]
+    )
+    url = reverse("admin-review-moderate")
+    payload = {"is_approved": True, "filter": {"product": product.id}}
+
+    response = authenticated_admin_client.post(url, payload, format="json")
+    assert response.data["updated"] == 3
+    assert response.data["has_more"] is True
+    assert set(response.data["results"]) == {str(r.id) for r in reviews[:3]}
+
+    # Repeating the request moves on to the remaining reviews
+    response = authenticated_admin_client.post(url, payload, format="json")
+    assert response.data["updated"] == 2
+    assert response.data["has_more"] is False
+    assert not Review.objects.filter(is_approved=False).exists()
+    product.refresh_from_db()
+    assert product.rating_count == 5
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {"is_approved": True},
+        {"is_approved": True, "ids": [1], "filter": {"rating": "5"}},
+        {"is_approved": True, "filter": {"title": "x"}},
+        {"is_approved": True, "filter": {"rating": "many"}},
+    ],
+)
+def test_admin_bulk_moderation_invalid(authenticated_admin_client, payload):
+    """Test the selection must be exactly one valid ids list or filter."""
+    url = reverse("admin-review-moderate")
+    response = authenticated_admin_client.post(url, payload, format="json")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+# ---------------------------------
+# Test Cases for Product Ratings
+# ---------------------------------
+
+
+@pytest.mark.django_db
+def test_product_rating_follows_review_lifecycle(
+    authenticated_admin_client, product, review, another_user
+):
+    """Test the product aggregates through create, approve, edit and delete."""
+    product.refresh_from_db()
+    assert product.rating_count == 1
+    assert product.rating_avg == Decimal("5.00")
+
+    pending = Review.objects.create(
+        user=another_user, product=product, title="Meh", body="Okay", rating=2
+    )
+    product.refresh_from_db()
+    assert product.rating_count == 1  # Unapproved reviews don't count
+
+    url = reverse("admin-review-approve", kwargs={"review_id": pending.id})
+    authenticated_admin_client.post(url, {"is_approved": True}, format="json")
+    product.refresh_from_db()
+    assert product.rating_count == 2
+    assert product.rating_avg == Decimal("3.50")
+    assert product.rating_histogram == {"1": 0, "2": 1, "3": 0, "4": 0, "5": 1}
+
+    pending.refresh_from_db()
+    pending.rating = 4
+    pending.save()
+    product.refresh_from_db()
+    assert product.rating_avg == Decimal("4.50")
+    assert product.rating_histogram == {"1": 0, "2": 0, "3": 0, "4": 1, "5": 1}
+
+    review.delete()
+    product.refresh_from_db()
+    assert product.rating_count == 1
+    assert product.rating_avg == Decimal("4.00")
+
+    pending.is_approved = False
+    pending.save()
+    product.refresh_from_db()
+    assert product.rating_count == 0
+    assert product.rating_avg == Decimal("0.00")
+
+
+@pytest.mark.django_db
+def test_reconcile_product_ratings(product, review):
+    """Test the nightly reconcile repairs drifted aggregates."""
+    Product.objects.filter(pk=product.pk).update(
+        rating_count=7, rating_avg=1, rating_1_count=7, rating_5_count=0
+    )
+
+    assert reconcile_product_ratings() == 1
+    product.refresh_from_db()
+    assert product.rating_count == 1
+    assert product.rating_avg == Decimal("5.00")
+    assert product.rating_histogram == {"1": 0, "2": 0, "3": 0, "4": 0, "5": 1}
+
+    assert reconcile_product_ratings() == 0
+
+
+@pytest.mark.django_db
+def test_product_list_ordered_by_rating(api_client, product, review, another_product):
+    """Test sorting the product list by average rating."""
+    url = reverse("product-list")
+    response = api_client.get(url, {"ordering": "-rating_avg"})
+    assert response.status_code == status.HTTP_200_OK
+    results = response.data["results"]
+    assert [p["id"] for p in results] == [product.id, another_product.id]
+    assert results[0]["rating_avg"] == "5.00"
+    assert results[0]["rating_count"] == 1
+
+
+# ------------------------
+# Test Cases for Vote Counters
+# ------------------------
+
+
+@pytest.fixture
+def clear_vote_deltas():
+    REDIS_CLIENT.delete(VOTE_DELTAS_KEY)
+    yield
+    REDIS_CLIENT.delete(VOTE_DELTAS_KEY)
+
+
+@pytest.mark.django_db
+def test_vote_flip_moves_pending_counter(
+    authenticated_user_client,
+    review,
+    clear_vote_deltas,
+    django_capture_on_commit_callbacks,
+):
+    """Test flipping a vote moves it between the counters instead of adding one."""
+    url = reverse("review-vote", kwargs={"review_id": review.id})
+    with django_capture_on_commit_callbacks(execute=True):
+        authenticated_user_client.post(url, {"is_upvote": True})
+    assert ReviewVoteCounter.get_pending([review.id]) == {review.id: (1, 0)}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = authenticated_user_client.post(url, {"is_upvote": False})
+    assert response.data["success"] == "Vote updated"
+    assert ReviewVoteCounter.get_pending([review.id]) == {review.id: (0, 1)}
+
+    # Repeating the same vote changes nothing
+    with django_capture_on_commit_callbacks(execute=True):
+        authenticated_user_client.post(url, {"is_upvote": False})
+    assert ReviewVoteCounter.get_pending([review.id]) == {review.id: (0, 1)}
+
+
+@pytest.mark.django_db
+def test_list_reviews_serves_pending_votes(
+    api_client, product, review, clear_vote_deltas
+):
+    """Test listed vote counts include the deltas not flushed yet."""
+    Review.objects.filter(pk=review.pk).update(upvotes=3, downvotes=1)
+    ReviewVoteCounter.record(review.id, None, True)
+
+    url = reverse("review-list", kwargs={"product_id": product.id})
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["results"][0]["upvotes"] == 4
+    assert response.data["results"][0]["downvotes"] == 1
+
+
+@pytest.mark.django_db
+def test_flush_review_vote_deltas(review, clear_vote_deltas):
+    """Test the flush task writes the pending deltas to the review columns."""
+    Review.objects.filter(pk=review.pk).update(upvotes=2, downvotes=0, helpfulness=2)
+    ReviewVoteCounter.record(review.id, True, False)
+    ReviewVoteCounter.record(review.id, None, True)
+
+    assert flush_review_vote_deltas() == 1
+    review.refresh_from_db()
+    assert (review.upvotes, review.downvotes, review.helpfulness) == (2, 1, 1)
+    assert ReviewVoteCounter.get_pending([review.id]) == {review.id: (0, 0)}
+
+
+@pytest.mark.django_db
+def test_flush_review_vote_deltas_clamps_at_zero(
+    review, review_unapproved, clear_vote_deltas
+):
+    """Test a flip of a vote never counted can't fail the flush of others."""
+    ReviewVoteCounter.record(review.id, True, False)
+    ReviewVoteCounter.record(review_unapproved.id, None, True)
+
+    assert flush_review_vote_deltas() == 2
+    review.refresh_from_db()
+    review_unapproved.refresh_from_db()
+    assert (review.upvotes, review.downvotes, review.helpfulness) == (0, 1, -1)
+    assert review_unapproved.upvotes == 1
+    assert REDIS_CLIENT.hgetall(VOTE_DELTAS_KEY) == {}
+
+
+@pytest.mark.django_db
+def test_backfill_review_vote_counters(review, user, another_user):
+    """Test the migration counts the votes cast before the counters existed."""
+    migration = import_module("reviews.migrations.0008_backfill_review_vote_counters")
+    ReviewVote.objects.create(review=review, user=user, is_upvote=True)
+    ReviewVote.objects.create(review=review, user=another_user, is_upvote=False)
+
+    migration.backfill_review_vote_counters(django_apps, connection.schema_editor())
+    review.refresh_from_db()
+    assert (review.upvotes, review.downvotes, review.helpfulness) == (1, 1, 0)
+
+
+@pytest.mark.django_db
+def test_list_reviews_most_helpful_first(api_client, product, review, another_user):
+    """Test ordering the reviews of a product by helpfulness."""
+    helpful = Review.objects.create(
+        product=product,
+        user=another_user,
+        title="Helpful",
+        body="Detailed",
+        rating=4,
+        is_approved=True,
+    )
+    Review.objects.filter(pk=helpful.pk).update(upvotes=5, helpfulness=5)
+
+    url = reverse("review-list", kwargs={"product_id": product.id})
+    response = api_client.get(url, {"ordering": "-helpfulness"})
+    assert response.status_code == status.HTTP_200_OK
+    assert [r["id"] for r in response.data["results"]] == [helpful.id, review.id]
+
+
+# ------------------------
+# Test Cases for Query Plans
+# ------------------------
+
+
+def get_index_name(model, fields):
+    return next(index.name for index in model._meta.indexes if index.fields == fields)
+
+
+@pytest.mark.django_db
+def test_review_list_uses_approved_index(product, review, explain_plan):
+    """Test the public review list reads the approved-only partial indexes."""
+    view = ReviewListView(kwargs={"product_id": product.id})
+    queryset = view.get_queryset()
+
+    plan = explain_plan(queryset.order_by("created_at"))
+    assert "reviews_approved_product_idx" in plan
+
+    plan = explain_plan(queryset.order_by("-helpfulness"))
+    assert "reviews_approved_helpful_idx" in plan
+
+
+@pytest.mark.django_db
+def test_moderation_queue_uses_pending_index(review_unapproved, explain_plan):
+    """Test listing pending reviews reads the pending-only partial index."""
+    plan = explain_plan(Review.objects.filter(is_approved=False).order_by("created_at"))
+    assert "reviews_pending_idx" in plan
+
+
+@pytest.mark.django_db
+def test_reviews_by_user_use_user_index(user, review, explain_plan):
+    """Test the author's reviews are read through an index on user."""
+    plan = explain_plan(Review.objects.filter(user=user))
+    # Either an Index Scan or a Bitmap Index Scan, depending on the planner
+    assert "reviews_review_user_id" in plan
+
+
+@pytest.mark.django_db
+def test_comment_list_uses_review_index(review, comment, explain_plan):
+    """Test the comments of a review are read in order from one index."""
+    view = CommentListView(kwargs={"review_id": review.id})
+    plan = explain_plan(view.get_queryset().order_by("created_at"))
+    assert get_index_name(Comment, ["review", "created_at"]) in plan
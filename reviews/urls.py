@@ -3,6 +3,7 @@ from django.urls import path
 from .views import (
     AdminReviewApprovalView,
     AdminReviewListView,
+    AdminReviewModerationView,
     CommentCreateView,
     CommentListView,
     ReviewCreateView,
@@ -54,6 +55,11 @@ urlpatterns = [
         AdminReviewListView.as_view(),
         name="admin-review-list",
     ),
+    path(
+        "admin/reviews/moderate/",
+        AdminReviewModerationView.as_view(),
+        name="admin-review-moderate",
+    ),
     path(
         "admin/reviews/<int:review_id>/approve/",
         AdminReviewApprovalView.as_view(),
@@ -1,14 +1,24 @@
+from django.conf import settings
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from drf_spectacular.utils import extend_schema
+from drf_spectacular.utils import OpenApiParameter, extend_schema
 from drf_spectacular.views import SpectacularAPIView
-from rest_framework import generics, permissions, status
+from rest_framework import filters, generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from products.models import Product
-
-from .models import Comment, Review, ReviewVote
-from .serializers import CommentSerializer, ReviewSerializer, ReviewVoteSerializer
+from RadinGalleryAPI.pagination import OldestFirstPagination
+
+from .models import Comment, Review
+from .moderation import NOT_FOUND, UPDATED, moderate_reviews
+from .serializers import (
+    CommentSerializer,
+    ReviewModerationSerializer,
+    ReviewSerializer,
+    ReviewVoteSerializer,
+)
+from .votes import cast_vote
 
 # ---------------------------- Create schema for swagger ----------------------------
 reviews_schema_view = SpectacularAPIView.as_view(urlconf="reviews.urls")
@@ -19,14 +29,33 @@ reviews_schema_view = SpectacularAPIView.as_view(urlconf="reviews.urls")
 # ----------------------
 
 
-@extend_schema(tags=["Review - List"])
+@extend_schema(
+    tags=["Review - List"],
+    parameters=[
+        OpenApiParameter(
+            name="include",
+            type=str,
+            required=False,
+            description=(
+                "Set to 'comments' to embed the comment count and latest "
+                "comments of each review"
+            ),
+        ),
+    ],
+)
 class ReviewListView(generics.ListAPIView):
     """
     List all approved reviews for a specific product
     """
 
+    throttle_scope = "catalog"
     serializer_class = ReviewSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = OldestFirstPagination
+
+    # ?ordering=-helpfulness lists the most helpful reviews first (indexed)
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ["created_at", "rating", "helpfulness"]
 
     def get_queryset(self):
         product_id = self.kwargs.get("product_id")
@@ -34,6 +63,12 @@ class ReviewListView(generics.ListAPIView):
             product_id=product_id, is_approved=True
         ).select_related("user", "product")
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        include = self.request.query_params.get("include", "").split(",")
+        context["include_comments"] = "comments" in include
+        return context
+
 
 @extend_schema(tags=["Review - Create"])
 class ReviewCreateView(generics.CreateAPIView):
@@ -83,10 +118,8 @@ class ReviewVoteView(APIView):
         }
         serializer = self.serializer_class(data=data)
         if serializer.is_valid():
-            vote, created = ReviewVote.objects.update_or_create(
-                user=request.user,
-                review=review,
-                defaults={"is_upvote": serializer.validated_data["is_upvote"]},
+            vote, created = cast_vote(
+                request.user, review, serializer.validated_data["is_upvote"]
             )
             message = "Vote created" if created else "Vote updated"
             return Response(
@@ -117,6 +150,7 @@ class CommentListView(generics.ListAPIView):
     List all comments for a specific review
     """
 
+    throttle_scope = "catalog"
     serializer_class = CommentSerializer
     permission_classes = [permissions.AllowAny]
 
@@ -140,6 +174,7 @@ class AdminReviewListView(generics.ListAPIView):
 
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAdminUser]
+    pagination_class = OldestFirstPagination
 
     def get_queryset(self):
         return Review.objects.all().select_related("user", "product")
@@ -154,16 +189,58 @@ class AdminReviewApprovalView(APIView):
     permission_classes = [permissions.IsAdminUser]
 
     def post(self, request, review_id):
-        review = get_object_or_404(Review, id=review_id)
+        reviews = Review.objects.filter(id=review_id)
+        if not reviews.exists():
+            raise Http404
         is_approved = request.data.get("is_approved")
         if not isinstance(is_approved, bool):
             return Response(
                 {"error": "Invalid value for 'is_approved'. Must be true or false."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        review.is_approved = is_approved
-        review.save()
+        if not moderate_reviews(reviews, is_approved):
+            # Deleted in the meantime
+            raise Http404
         return Response(
             {"success": f"Review {'approved' if is_approved else 'rejected'}"},
             status=status.HTTP_200_OK,
         )
+
+
+@extend_schema(tags=["Admin - Review"])
+class AdminReviewModerationView(APIView):
+    """
+    Approve or reject many reviews at once, by ids or by a filter.
+    A filter changes at most REVIEW_MODERATION_MAX_FILTERED reviews per
+    request; `has_more` tells whether repeating it would change more.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = ReviewModerationSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        queryset = serializer.get_queryset()
+        limit = settings.REVIEW_MODERATION_MAX_FILTERED
+        outcomes = moderate_reviews(
+            queryset, serializer.validated_data["is_approved"], limit=limit
+        )
+        for review_id in serializer.validated_data.get("ids", []):
+            outcomes.setdefault(review_id, NOT_FOUND)
+        has_more = (
+            "filter" in serializer.validated_data
+            and len(outcomes) >= limit
+            and queryset.filter(id__gt=max(outcomes)).exists()
+        )
+
+        return Response(
+            {
+                "updated": sum(outcome == UPDATED for outcome in outcomes.values()),
+                "has_more": has_more,
+                "results": {
+                    str(review_id): outcome for review_id, outcome in outcomes.items()
+                },
+            },
+            status=status.HTTP_200_OK,
+        )
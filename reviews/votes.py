@@ -0,0 +1,146 @@
+# This file contains the Redis-aggregated helpfulness counters of reviews.
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .models import ReviewVote
+
+REDIS_CLIENT = settings.REDIS_INSTANCE
+
+# Pending counter changes not yet flushed to Review, {"<review_id>:up|down": delta}
+VOTE_DELTAS_KEY = "review:votes:deltas"
+
+# Moves one vote between counters in a single step: ARGV is the review id,
+# the previous vote ("up", "down" or "" for none) and the new vote.
+RECORD_VOTE_SCRIPT = REDIS_CLIENT.register_script("""
+    local review_id = ARGV[1]
+    if ARGV[2] == ARGV[3] then
+        return 0
+    end
+    if ARGV[2] ~= '' then
+        redis.call('HINCRBY', KEYS[1], review_id .. ':' .. ARGV[2], -1)
+    end
+    if ARGV[3] ~= '' then
+        redis.call('HINCRBY', KEYS[1], review_id .. ':' .. ARGV[3], 1)
+    end
+    return 1
+    """)
+
+# Reads the pending deltas and clears them in one step for the flush task
+POP_VOTE_DELTAS_SCRIPT = REDIS_CLIENT.register_script("""
+    local deltas = redis.call('HGETALL', KEYS[1])
+    redis.call('DEL', KEYS[1])
+    return deltas
+    """)
+
+
+def _direction(is_upvote):
+    if is_upvote is None:
+        return ""
+    return "up" if is_upvote else "down"
+
+
+class ReviewVoteCounter:
+    """
+    Upvote/downvote counters of reviews.
+
+    Votes are counted in a Redis hash of pending deltas, which the flush task
+    writes back to Review.upvotes/downvotes in batches. The served count of a
+    review is therefore its columns plus its pending deltas.
+    """
+
+    @classmethod
+    def record(cls, review_id, previous, new):
+        """
+        Count a vote change; `previous` and `new` are is_upvote values
+        (None for no vote), so a flip moves one vote between the counters.
+        """
+        RECORD_VOTE_SCRIPT(
+            keys=[VOTE_DELTAS_KEY],
+            args=[review_id, _direction(previous), _direction(new)],
+        )
+
+    @classmethod
+    def record_many(cls, deltas):
+        """
+        Put back {review_id: (up delta, down delta)} deltas, e.g. after a
+        failed flush.
+        """
+        pipe = REDIS_CLIENT.pipeline(transaction=True)
+        for review_id, (up, down) in deltas.items():
+            if up:
+                pipe.hincrby(VOTE_DELTAS_KEY, f"{review_id}:up", up)
+            if down:
+                pipe.hincrby(VOTE_DELTAS_KEY, f"{review_id}:down", down)
+        pipe.execute()
+
+    @classmethod
+    def get_pending(cls, review_ids):
+        """
+        Returns {review_id: (up delta, down delta)} for the given reviews in
+        one round trip.
+        """
+        review_ids = list(review_ids)
+        if not review_ids:
+            return {}
+        fields = [
+            f"{review_id}:{direction}"
+            for review_id in review_ids
+            for direction in ("up", "down")
+        ]
+        values = REDIS_CLIENT.hmget(VOTE_DELTAS_KEY, fields)
+        return {
+            review_id: (int(values[2 * i] or 0), int(values[2 * i + 1] or 0))
+            for i, review_id in enumerate(review_ids)
+        }
+
+    @classmethod
+    def pop_pending(cls):
+        """
+        Atomically read and clear every pending delta.
+        Returns {review_id: (up delta, down delta)}.
+        """
+        flat = POP_VOTE_DELTAS_SCRIPT(keys=[VOTE_DELTAS_KEY])
+        deltas = {}
+        for field, value in zip(flat[::2], flat[1::2]):
+            review_id, direction = field.split(":")
+            up, down = deltas.get(int(review_id), (0, 0))
+            if direction == "up":
+                up += int(value)
+            else:
+                down += int(value)
+            deltas[int(review_id)] = (up, down)
+        return deltas
+
+
+def cast_vote(user, review, is_upvote):
+    """
+    Create or update the user's vote and count the change once committed.
+    The existing vote is locked, so concurrent requests of the same user
+    can't count a flip twice. Returns (vote, created).
+    """
+    with transaction.atomic():
+        votes = ReviewVote.objects.select_for_update().filter(user=user, review=review)
+        vote = votes.first()
+        created = vote is None
+        if created:
+            try:
+                with transaction.atomic():
+                    vote = ReviewVote.objects.create(
+                        user=user, review=review, is_upvote=is_upvote
+                    )
+                previous = None
+            except IntegrityError:
+                # A concurrent request created it first
+                created = False
+                vote = votes.first()
+        if not created:
+            previous = vote.is_upvote
+            if previous != is_upvote:
+                vote.is_upvote = is_upvote
+                vote.save(update_fields=["is_upvote"])
+
+        transaction.on_commit(
+            lambda: ReviewVoteCounter.record(review.id, previous, is_upvote)
+        )
+    return vote, created